@@ -1,10 +1,34 @@
 import re
+import time
 from datetime import datetime
 from manager.task_management import from_command, TaskManager  # TaskManager from task_management.py
+from manager.ingestion import DEFAULT_OWNER, ingest_messages
+from manager.operations.task_parser import parse_task_message
+from manager.operations.users import provision_users, read_user_file
+from manager.operations.cascade import DELETE_FILTERS
+from manager.db.integrity import check_integrity, format_report
+from manager.operations.notifications import NOTIFICATION_PAGE_SIZE, fetch_notifications, mark_notifications_read
+from manager.operations.recurring_tasks import list_upcoming_occurrences
+from manager.operations.analytics import DIMENSIONS, PERIODS, export_metrics_csv, get_metrics
+from manager import workload
+from manager.replica import get_read_replica, replica_from_env
+from manager.logging_config import log_context
 import logging
 task_manager = TaskManager()
+workload.capture_from_env()
+replica_from_env()
 
 def process_command(command: str) -> str:
+    started_at, began = time.time(), time.perf_counter()
+    task_match = re.match(r"/\w+ (\d+)", command)
+    with log_context(command=command.split(" ", 1)[0], task_id=task_match.group(1) if task_match else None):
+        result = _execute_command(command)
+    recorder = workload.active_recorder()
+    if recorder is not None:
+        recorder.record(started_at, command, result, time.perf_counter() - began)
+    return result
+
+def _execute_command(command: str) -> str:
     try:
         # Add Task
         if command.startswith("/add_task"):
@@ -16,6 +40,34 @@ def process_command(command: str) -> str:
             else:
                 return "Error: Invalid syntax for /add_task. Use: /add_task 'title' 'description' priority owner 'deadline'"
 
+        # Quick Add (free text; one task per line)
+        elif command.startswith("/quick"):
+            match = re.match(r"/quick\s+(.+)", command, re.DOTALL)
+            if match:
+                messages = match.group(1).splitlines()
+                if len(messages) > 1:
+                    report = ingest_messages(messages, task_manager=task_manager)
+                    rejected = "".join(f"\nline {r['line']}: {r['error']}" for r in report["rejected"])
+                    return f"Created {report['created']} tasks.{rejected}"
+                task = parse_task_message(messages[0], default_owner=DEFAULT_OWNER)
+                task_id = task_manager.create_task(task["title"], task["description"], task["priority"],
+                                                   task["owner"], task["deadline"])
+                due = f", due {task['deadline']}" if task["deadline"] else ""
+                return f"Task '{task['title']}' created with ID: {task_id} ({task['priority']}, {task['owner']}{due})"
+            else:
+                return "Error: Invalid syntax for /quick. Use: /quick free text, e.g. /quick review report @user2 next Friday 5pm"
+
+        # Provision Users (CSV with a user_id,name,role header, or JSON lines)
+        elif command.startswith("/provision_users"):
+            match = re.match(r"/provision_users (\S+)$", command)
+            if match:
+                report = provision_users(read_user_file(match.group(1)))
+                rejected = "".join(f"\nrecord {r['record']}: {r['error']}" for r in report["rejected"])
+                return (f"Provisioned {report['created']} users, {report['skipped']} already existed, "
+                        f"{len(report['rejected'])} rejected.{rejected}")
+            else:
+                return "Error: Invalid syntax for /provision_users. Use: /provision_users users.csv|users.jsonl"
+
         # Update Task Status
         elif command.startswith("/update_task"):
             match = re.match(r"/update_task (\w+) (\w+)", command)
@@ -36,6 +88,18 @@ def process_command(command: str) -> str:
             else:
                 return "Error: Invalid syntax for /delegate_task. Use: /delegate_task task_id owner"
 
+        # Bulk Delete by Filter (before compares against updated_at)
+        elif command.startswith("/delete_tasks"):
+            match = re.match(r"/delete_tasks((?: \w+='[^']*'| \w+=\S+)+)( all)?$", command)
+            filters = dict((key, value.strip("'")) for key, value in
+                           re.findall(r"(\w+)=('[^']*'|\S+)", match.group(1))) if match else {}
+            if match and filters and set(filters) <= set(DELETE_FILTERS):
+                deleted = task_manager.delete_tasks_where(include_archived=bool(match.group(2)), **filters)
+                return f"Deleted {deleted} tasks."
+            else:
+                return ("Error: Invalid syntax for /delete_tasks. Use: /delete_tasks "
+                        "[status=X] [owner=X] [tag=X] [before='YYYY-MM-DD HH:MM:SS'] [all]")
+
         # Delete Task
         elif command.startswith("/delete_task"):
             match = re.match(r"/delete_task (\w+)", command)
@@ -46,13 +110,79 @@ def process_command(command: str) -> str:
             else:
                 return "Error: Invalid syntax for /delete_task. Use: /delete_task task_id"
 
+        # Add Dependency (task_id cannot start before depends_on is done)
+        elif command.startswith("/add_dependency"):
+            match = re.match(r"/add_dependency (\d+) (\d+)$", command)
+            if match:
+                task_id, depends_on = match.groups()
+                return task_manager.add_dependency(int(task_id), int(depends_on))
+            else:
+                return "Error: Invalid syntax for /add_dependency. Use: /add_dependency task_id depends_on_task_id"
+
+        # Remove Dependency
+        elif command.startswith("/remove_dependency"):
+            match = re.match(r"/remove_dependency (\d+) (\d+)$", command)
+            if match:
+                task_id, depends_on = match.groups()
+                return task_manager.remove_dependency(int(task_id), int(depends_on))
+            else:
+                return "Error: Invalid syntax for /remove_dependency. Use: /remove_dependency task_id depends_on_task_id"
+
+        # Blockers / Blocking (add "all" for transitive dependencies)
+        elif command.startswith("/blockers") or command.startswith("/blocking"):
+            match = re.match(r"/(blockers|blocking) (\d+)( all)?$", command)
+            if match:
+                kind, task_id, transitive = match.groups()
+                lookup = task_manager.list_blockers if kind == "blockers" else task_manager.list_blocked
+                tasks = lookup(int(task_id), transitive=bool(transitive))
+                if tasks:
+                    return "\n".join([f"task_{t['task_id']}: {t['title']} (Owner: {t['owner']}) - {t['status']}, due {t['deadline']}"
+                                      for t in tasks])
+                return f"Task {task_id} has no open {'blockers' if kind == 'blockers' else 'dependents'}."
+            else:
+                return "Error: Invalid syntax. Use: /blockers task_id [all] or /blocking task_id [all]"
+
+        # Ready Tasks (open tasks with no open blockers)
+        elif command.startswith("/ready_tasks"):
+            tasks = task_manager.list_ready_tasks()
+            if tasks:
+                return "\n".join([f"task_{t['task_id']}: {t['title']} (Owner: {t['owner']}) - due {t['deadline']}"
+                                  for t in tasks])
+            return "No tasks are ready to start."
+
+        # Critical Path
+        elif command.startswith("/critical_path"):
+            match = re.match(r"/critical_path(?: (\d+))?$", command)
+            if match:
+                task_id = match.groups()[0]
+                path = task_manager.critical_path(int(task_id) if task_id else None)
+                if path:
+                    return "\n".join([f"{'!' if step['at_risk'] else ' '} task_{step['task_id']}: {step['title']} "
+                                      f"(due {step['deadline']}, finish by {step['latest_finish']})"
+                                      for step in path])
+                return "No open dependency chain found."
+            else:
+                return "Error: Invalid syntax for /critical_path. Use: /critical_path [task_id]"
+
         # List Tasks
         elif command.startswith("/list_tasks"):
-            tasks = task_manager.list_tasks()
+            tasks = task_manager.list_tasks(include_archived=command.strip().endswith(" all"))
             if tasks:
                 return "\n".join(tasks)
             return "No tasks found."
 
+        # Search Tasks (add "all" to include archived tasks)
+        elif command.startswith("/search_tasks"):
+            match = re.match(r"/search_tasks '(.+)'( all)?$", command)
+            if match:
+                term, include_archived = match.groups()
+                tasks = task_manager.search_tasks(term, include_archived=bool(include_archived))
+                if tasks:
+                    return "\n".join(tasks)
+                return f"No tasks matching '{term}'."
+            else:
+                return "Error: Invalid syntax for /search_tasks. Use: /search_tasks 'text' [all]"
+
         # List Overdue Tasks
         elif command.startswith("/overdue_tasks"):
             overdue_tasks = task_manager.list_overdue_tasks()
@@ -75,18 +205,117 @@ def process_command(command: str) -> str:
                     f"Status: {task['status']}\n"
                     f"Deadline: {task['deadline']}\n"
                     f"Created At: {task['created_at']}\n"
-                    f"Updated At: {task['updated_at']}")
+                    f"Updated At: {task['updated_at']}"
+                    + ("\nArchived: yes" if task['archived'] else ""))
                 return f"Task {task_id} not found."
             else:
                 return "Error: Invalid syntax for /task_details. Use: /task_details task_id"
 
-        # Notifications Placeholder
+        # List Notifications (newest first, one page at a time)
         elif command.startswith("/notifications"):
-             return "Feature not implemented yet. # Implement listing notifications"
+            match = re.match(r"/notifications (\w+)( unread)?(?: (\d+))?$", command)
+            if match:
+                recipient, unread, before_id = match.groups()
+                # One extra row tells whether another page follows
+                notifications = fetch_notifications(recipient, unread_only=bool(unread),
+                                                    before_id=int(before_id) if before_id else None,
+                                                    limit=NOTIFICATION_PAGE_SIZE + 1)
+                if notifications:
+                    page = notifications[:NOTIFICATION_PAGE_SIZE]
+                    lines = [f"#{n['notification_id']} [{'read' if n['read_at'] else 'unread'}] {n['timestamp']}: {n['message']}"
+                             for n in page]
+                    if len(notifications) > NOTIFICATION_PAGE_SIZE:
+                        lines.append(f"Next page: /notifications {recipient}{unread or ''} {page[-1]['notification_id']}")
+                    return "\n".join(lines)
+                return f"No notifications for {recipient}."
+            else:
+                return "Error: Invalid syntax for /notifications. Use: /notifications user_id [unread] [before_id]"
 
-        # Recurring Tasks Placeholder
+        # Mark Notifications Read
+        elif command.startswith("/read_notifications"):
+            match = re.match(r"/read_notifications (\w+)((?: \d+)*)$", command)
+            if match:
+                recipient, ids = match.groups()
+                notification_ids = [int(i) for i in ids.split()] or None
+                updated = mark_notifications_read(recipient, notification_ids)
+                return f"Marked {updated} notification(s) as read for {recipient}."
+            else:
+                return "Error: Invalid syntax for /read_notifications. Use: /read_notifications user_id [notification_id ...]"
+
+        # Upcoming Recurring Task Occurrences
         elif command.startswith("/recurring_tasks"):
-            return "Feature not implemented yet. # Implement recurring tasks list"
+            match = re.match(r"/recurring_tasks(?: (\d+))?$", command)
+            if match:
+                days = int(match.groups()[0] or 7)
+                occurrences = list_upcoming_occurrences(days)
+                if occurrences:
+                    return "\n".join([f"{o['occurrence']}: recurring_{o['recurring_task_id']} - {o['title']} ({o['rule']})"
+                                      for o in occurrences])
+                return f"No recurring tasks due in the next {days} days."
+            else:
+                return "Error: Invalid syntax for /recurring_tasks. Use: /recurring_tasks [days]"
+
+        # Metrics Export (CSV, into the export directory)
+        elif command.startswith("/metrics_export"):
+            match = re.match(r"/metrics_export (\S+)(?: (\w+))?(?: (\w+))?(?: (\d+))?$", command)
+            if match:
+                name, dimension, period, days = match.groups()
+                count, path = export_metrics_csv(name, dimension or "all", period or "weekly", int(days or 90))
+                return f"Exported {count} metric rows to {path}."
+            else:
+                return "Error: Invalid syntax for /metrics_export. Use: /metrics_export file_name [dimension] [daily|weekly] [days]"
+
+        # Metrics (throughput, lead/cycle time, on-time rate)
+        elif command.startswith("/metrics"):
+            match = re.match(r"/metrics(?: (\w+))?(?: (\w+))?(?: (\d+))?$", command)
+            if match and (match.group(1) or "all") in DIMENSIONS and (match.group(2) or "weekly") in PERIODS:
+                dimension, period, days = match.groups()
+                rows = get_metrics(dimension or "all", period or "weekly", int(days or 90))
+                if rows:
+                    hours = lambda value: "-" if value is None else f"{value}h"
+                    return "\n".join([f"{r['period']} {r['value']}: {r['throughput']} done, "
+                                      f"lead {hours(r['avg_lead_time_hours'])}, cycle {hours(r['avg_cycle_time_hours'])}, "
+                                      f"on time {'-' if r['on_time_rate'] is None else r['on_time_rate']}"
+                                      for r in rows])
+                return "No completed tasks in this period."
+            else:
+                return f"Error: Invalid syntax for /metrics. Use: /metrics [{'|'.join(DIMENSIONS)}] [daily|weekly] [days]"
+
+        # Task History (newest first; pass the printed cursor to get the next page)
+        elif command.startswith("/history"):
+            match = re.match(r"/history (\d+)(?: (\d+))?(?: '([^']+)')?$", command)
+            if match:
+                task_id, limit, cursor = match.groups()
+                events, next_cursor = task_manager.task_history(int(task_id), cursor, int(limit or 20))
+                if not events:
+                    return f"No history for task {task_id}."
+                lines = [f"{e['time']} [{e['source']}] {e['actor']}: {e['action']}"
+                         + (f" - {e['detail']}" if e["detail"] else "") for e in events]
+                if next_cursor:
+                    lines.append(f"More: /history {task_id} {limit or 20} '{next_cursor}'")
+                return "\n".join(lines)
+            else:
+                return "Error: Invalid syntax for /history. Use: /history task_id [limit] ['cursor']"
+
+        # Integrity Check (orphaned and dangling references)
+        elif command.startswith("/check_integrity"):
+            match = re.match(r"/check_integrity( repair)?$", command)
+            if match:
+                return format_report(check_integrity(repair=bool(match.group(1))))
+            else:
+                return "Error: Invalid syntax for /check_integrity. Use: /check_integrity [repair]"
+
+        # Read Replica Status
+        elif command.startswith("/replica_status"):
+            replica = get_read_replica()
+            if replica is None:
+                return "Read replica is disabled; reads go to the database file."
+            status = replica.status()
+            since_apply = status["seconds_since_last_apply"]
+            return (f"Read replica {'stale' if status['stale'] else 'up to date'}: "
+                    f"last full sync {status['seconds_since_full_sync']}s ago, "
+                    f"last write applied {'-' if since_apply is None else f'{since_apply}s'} ago, "
+                    f"{status['writes_applied_since_sync']} writes applied since.")
 
         # Unknown Command
         else:
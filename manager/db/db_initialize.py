@@ -1,31 +1,44 @@
 import sqlite3
 import logging
 from datetime import datetime
-from operations.tags import add_tag
-from operations.users import add_user
-# Database file path
-DB_PATH = "nesha_task_manager.db"
+from manager.operations.tags import add_tag
+from manager.operations.users import add_user, user_directory
+from manager.logging_config import setup_logging
+from manager.utils import get_db_path
+
+# Columns added to tables after their first release: (table, column, definition).
+# `create_tables` already includes them; `migrate_columns` upgrades older databases.
+ADDED_COLUMNS = [
+    ("Notifications", "event_count", "INTEGER NOT NULL DEFAULT 1"),
+    ("Notifications", "delivered_at", "DATETIME"),
+    ("Notifications", "read_at", "DATETIME"),
+    ("NotificationOutbox", "next_attempt_at", "DATETIME"),
+    ("RecurringTasks", "dtstart", "DATETIME"),
+    ("RecurringTasks", "occurrence_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("RecurringTasks", "active", "INTEGER NOT NULL DEFAULT 1"),
+    ("RecurringTasks", "ended_at", "DATETIME"),
+]
 
 # Custom exception for database operations
 class DatabaseError(Exception):
     pass
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("task_manager.log"),
-        logging.StreamHandler(),
-    ],
-)
-
 def drop_tables(cursor):
     """Drop all existing tables."""
     logging.warning("Dropping existing tables...")
+    cursor.execute("DROP TABLE IF EXISTS MetricsDaily;")
+    cursor.execute("DROP TABLE IF EXISTS TaskLifecycle;")
+    cursor.execute("DROP TABLE IF EXISTS MetricsState;")
+    cursor.execute("DROP TABLE IF EXISTS ArchivedNotifications;")
+    cursor.execute("DROP TABLE IF EXISTS ArchivedTaskResponses;")
+    cursor.execute("DROP TABLE IF EXISTS ArchivedTaskTags;")
+    cursor.execute("DROP TABLE IF EXISTS ArchivedTasks;")
     cursor.execute("DROP TABLE IF EXISTS TaskResponses;")
+    cursor.execute("DROP TABLE IF EXISTS NotificationOutbox;")
     cursor.execute("DROP TABLE IF EXISTS Notifications;")
+    cursor.execute("DROP TABLE IF EXISTS RecurringOccurrences;")
     cursor.execute("DROP TABLE IF EXISTS RecurringTasks;")
+    cursor.execute("DROP TABLE IF EXISTS TaskDependencies;")
     cursor.execute("DROP TABLE IF EXISTS TaskTags;")
     cursor.execute("DROP TABLE IF EXISTS Tags;")
     cursor.execute("DROP TABLE IF EXISTS AuditLogs;")
@@ -99,6 +112,18 @@ def create_tables(cursor):
         );
     """)
 
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TaskDependencies (
+            task_id INTEGER NOT NULL,
+            depends_on INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (task_id, depends_on),
+            CHECK (task_id != depends_on),
+            FOREIGN KEY (task_id) REFERENCES Tasks(task_id),
+            FOREIGN KEY (depends_on) REFERENCES Tasks(task_id)
+        ) WITHOUT ROWID;
+    """)
+
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS Notifications (
             notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -106,39 +131,192 @@ def create_tables(cursor):
             recipient TEXT NOT NULL,
             message TEXT NOT NULL,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            event_count INTEGER NOT NULL DEFAULT 1,
+            delivered_at DATETIME,
+            read_at DATETIME,
             FOREIGN KEY (task_id) REFERENCES Tasks(task_id),
             FOREIGN KEY (recipient) REFERENCES Users(user_id)
         );
     """)
 
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS NotificationOutbox (
+            outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            claimed_by TEXT,
+            claimed_at DATETIME,
+            next_attempt_at DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (recipient) REFERENCES Users(user_id)
+        );
+    """)
+
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS RecurringTasks (
             recurring_task_id INTEGER PRIMARY KEY AUTOINCREMENT,
             template_task_id TEXT NOT NULL,
             interval TEXT NOT NULL,
             next_occurrence DATETIME NOT NULL,
+            dtstart DATETIME,
+            occurrence_count INTEGER NOT NULL DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 1,
+            ended_at DATETIME,
             FOREIGN KEY (template_task_id) REFERENCES Tasks(task_id)
         );
     """)
 
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS RecurringOccurrences (
+            recurring_task_id INTEGER NOT NULL,
+            occurrence DATETIME NOT NULL,
+            PRIMARY KEY (recurring_task_id, occurrence),
+            FOREIGN KEY (recurring_task_id) REFERENCES RecurringTasks(recurring_task_id)
+        );
+    """)
+
+def create_archive_tables(cursor):
+    """Create the cold tier for closed tasks and the rows that belong to them."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ArchivedTasks (
+            task_id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority TEXT NOT NULL DEFAULT 'low',
+            owner TEXT NOT NULL,
+            status TEXT,
+            deadline DATETIME,
+            created_at DATETIME,
+            updated_at DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ArchivedTaskTags (
+            task_id TEXT NOT NULL,
+            tag_id INTEGER NOT NULL
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ArchivedTaskResponses (
+            response_id INTEGER PRIMARY KEY,
+            task_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            response_time DATETIME,
+            comments TEXT
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ArchivedNotifications (
+            notification_id INTEGER PRIMARY KEY,
+            task_id TEXT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp DATETIME,
+            event_count INTEGER NOT NULL DEFAULT 1,
+            delivered_at DATETIME,
+            read_at DATETIME
+        );
+    """)
+
+def create_metrics_tables(cursor):
+    """Create the incrementally maintained analytics rollups."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MetricsState (
+            source TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TaskLifecycle (
+            task_id INTEGER PRIMARY KEY,
+            accepted_at DATETIME,
+            completed_at DATETIME,
+            verified_at DATETIME,
+            counted INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MetricsDaily (
+            day DATE NOT NULL,
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            with_deadline INTEGER NOT NULL DEFAULT 0,
+            on_time INTEGER NOT NULL DEFAULT 0,
+            lead_time_hours REAL NOT NULL DEFAULT 0,
+            cycle_time_hours REAL NOT NULL DEFAULT 0,
+            cycle_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value, day)
+        );
+    """)
+
 def create_indexes(cursor):
     """Create indexes for performance optimization."""
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON Tasks (status);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON Tasks (deadline);")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_deadline ON Tasks (status, deadline);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON Tasks (status, updated_at);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_tags_task ON TaskTags (task_id);")
+    # Task timelines: (task_id, time) plus the implicit rowid covers the history page scan
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_responses_timeline ON TaskResponses (task_id, response_time);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_timeline ON Notifications (task_id, timestamp);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_timeline ON AuditLogs (entity, entity_id, timestamp);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_dependencies_depends_on ON TaskDependencies (depends_on, task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_template ON RecurringTasks (template_task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archived_task_tags_task ON ArchivedTaskTags (task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archived_task_responses_timeline ON ArchivedTaskResponses (task_id, response_time);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archived_notifications_timeline ON ArchivedNotifications (task_id, timestamp);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_lifecycle_pending ON TaskLifecycle (counted, task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_daily_day ON MetricsDaily (day, dimension);")
+    # Exhausted rules stay in the table but are never due
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_due ON RecurringTasks (next_occurrence) WHERE active = 1;")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_occurrences_time ON RecurringOccurrences (occurrence, recurring_task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON NotificationOutbox (status, outbox_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_claimed_by ON NotificationOutbox (claimed_by);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_task ON NotificationOutbox (task_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_recipient ON Notifications (recipient, notification_id);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_unread ON Notifications (recipient, read_at, notification_id);")
+
+    # Superseded by the timeline indexes, which lead with the same column
+    for index in ("idx_task_responses_task", "idx_notifications_task",
+                  "idx_archived_task_responses_task", "idx_archived_notifications_task"):
+        cursor.execute(f"DROP INDEX IF EXISTS {index};")
+    # Superseded by the partial idx_recurring_due
+    cursor.execute("DROP INDEX IF EXISTS idx_recurring_next_occurrence;")
+
+def migrate_columns(cursor):
+    """Add columns introduced after a table was first created."""
+    for table, column, definition in ADDED_COLUMNS:
+        cursor.execute(f"PRAGMA table_info({table});")
+        if column not in {row[1] for row in cursor.fetchall()}:
+            logging.info(f"Adding column {table}.{column}")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
 
 def initialize_schema(force: bool = False):
     """Initialize the database schema."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
 
             # Drop tables if force=True
             if force:
                 drop_tables(cursor)
 
-            # Create tables and indexes
+            # Create tables, upgrade older ones and create indexes
             create_tables(cursor)
+            create_archive_tables(cursor)
+            create_metrics_tables(cursor)
+            migrate_columns(cursor)
             create_indexes(cursor)
 
             connection.commit()
@@ -150,7 +328,7 @@ def initialize_schema(force: bool = False):
 def populate_data():
     """Add default users and sample tasks."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
 
             # Add default users
@@ -179,9 +357,12 @@ def populate_data():
 def initialize_db(force: bool = False):
     """Initialize the database schema and populate it with data."""
     initialize_schema(force=force)
+    # A forced rebuild drops the Users table out from under the cache
+    user_directory.invalidate()
     populate_data()
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         initialize_db(force=True)  # Set force=True to reset the database
     except DatabaseError as e:
@@ -0,0 +1,169 @@
+"""Find, and optionally remove, rows that reference tasks, users, tags or rules that no longer exist.
+
+Foreign keys are declared in the schema but not enforced, so orphans can build up.
+Each table is scanned in keyset-ordered chunks, so memory stays flat and repairs
+commit in short transactions. From the command line:
+
+    python -m manager.db.integrity --db nesha_task_manager.db --repair
+"""
+import argparse
+import logging
+import sqlite3
+import sys
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from manager.utils import DB_PATH, get_db_path
+from manager.operations.cascade import TASK_REFERENCES
+from manager.replica import resync_replica
+
+# Rows read per chunk
+INTEGRITY_CHUNK_SIZE = 5000
+# Orphaned values kept per check for the report
+SAMPLE_SIZE = 10
+
+_TASK_EXISTS = ("EXISTS (SELECT 1 FROM Tasks p WHERE p.task_id = c.{column})"
+                " OR EXISTS (SELECT 1 FROM ArchivedTasks p WHERE p.task_id = c.{column})")
+
+class IntegrityCheck(NamedTuple):
+    table: str
+    column: str
+    # Condition that holds when the row's reference resolves
+    parent: str
+    # Whether repair may delete orphaned rows; dangling user references are only reported
+    repairable: bool = True
+    # Keyset used to walk the table; WITHOUT ROWID tables use their primary key
+    keys: Sequence[str] = ("rowid",)
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}.{self.column}"
+
+def _user_check(table: str, column: str) -> IntegrityCheck:
+    return IntegrityCheck(table, column, f"EXISTS (SELECT 1 FROM Users p WHERE p.user_id = c.{column})",
+                          repairable=False)
+
+# Rows deleted by one check can orphan rows checked later (RecurringTasks before RecurringOccurrences)
+CHECKS: List[IntegrityCheck] = [
+    IntegrityCheck(table, column, _TASK_EXISTS.format(column=column),
+                   keys=("task_id", "depends_on") if table == "TaskDependencies" else ("rowid",))
+    for table, column, _ in TASK_REFERENCES
+] + [
+    IntegrityCheck("RecurringOccurrences", "recurring_task_id",
+                   "EXISTS (SELECT 1 FROM RecurringTasks p WHERE p.recurring_task_id = c.recurring_task_id)"),
+    IntegrityCheck("TaskTags", "tag_id", "EXISTS (SELECT 1 FROM Tags p WHERE p.tag_id = c.tag_id)"),
+    IntegrityCheck("ArchivedTaskTags", "tag_id", "EXISTS (SELECT 1 FROM Tags p WHERE p.tag_id = c.tag_id)"),
+    _user_check("Tasks", "owner"),
+    _user_check("ArchivedTasks", "owner"),
+    _user_check("TaskResponses", "user_id"),
+    _user_check("Notifications", "recipient"),
+    _user_check("NotificationOutbox", "recipient"),
+]
+
+ProgressCallback = Callable[[str, int, int], None]
+
+def run_check(connection: sqlite3.Connection, check: IntegrityCheck, repair: bool = False,
+              chunk_size: int = INTEGRITY_CHUNK_SIZE,
+              progress: Optional[ProgressCallback] = None) -> dict:
+    """Scan one table for rows whose reference does not resolve, deleting them if `repair` is set."""
+    cursor = connection.cursor()
+    keys = ", ".join(f"c.{key}" for key in check.keys)
+    key_params = ", ".join("?" for _ in check.keys)
+    total = cursor.execute(f"SELECT COUNT(*) FROM {check.table}").fetchone()[0]
+    scan = f"""
+        SELECT {keys}, c.{check.column}, {check.parent}
+        FROM {check.table} c
+        WHERE c.{check.column} IS NOT NULL {{after}}
+        ORDER BY {keys}
+        LIMIT ?
+    """
+    delete = f"DELETE FROM {check.table} WHERE ({', '.join(check.keys)}) = ({key_params})"
+
+    scanned, orphans, repaired, sample = 0, 0, 0, []
+    last_key = None
+    while True:
+        if last_key is None:
+            rows = cursor.execute(scan.format(after=""), (chunk_size,)).fetchall()
+        else:
+            rows = cursor.execute(scan.format(after=f"AND ({keys}) > ({key_params})"),
+                                  (*last_key, chunk_size)).fetchall()
+        if not rows:
+            break
+        width = len(check.keys)
+        last_key = rows[-1][:width]
+        missing = [row for row in rows if not row[width + 1]]
+        scanned += len(rows)
+        orphans += len(missing)
+        sample.extend(row[width] for row in missing[:SAMPLE_SIZE - len(sample)])
+        if repair and check.repairable and missing:
+            cursor.executemany(delete, [row[:width] for row in missing])
+            connection.commit()
+            repaired += len(missing)
+        if progress:
+            progress(check.name, scanned, total)
+
+    if orphans:
+        logging.warning(f"{check.name}: {orphans} rows reference missing rows"
+                        f"{f', {repaired} deleted' if repaired else ''}.")
+    return {
+        "check": check.name,
+        "scanned": scanned,
+        "orphans": orphans,
+        "repaired": repaired,
+        "repairable": check.repairable,
+        "sample": sample,
+    }
+
+def check_integrity(repair: bool = False, chunk_size: int = INTEGRITY_CHUNK_SIZE,
+                    progress: Optional[ProgressCallback] = None, db_path: Optional[str] = None,
+                    checks: Optional[Sequence[str]] = None) -> List[dict]:
+    """Run the integrity checks (all, or those named in `checks`) and return one report per check."""
+    selected = [check for check in CHECKS if checks is None or check.name in checks]
+    path = db_path or get_db_path()
+    try:
+        with sqlite3.connect(path) as connection:
+            reports = [run_check(connection, check, repair, chunk_size, progress) for check in selected]
+        # Repairs delete rows across many tables; reload the read replica rather than apply them
+        if path == get_db_path() and any(report["repaired"] for report in reports):
+            resync_replica()
+        return reports
+    except Exception as e:
+        logging.error(f"Integrity check failed: {e}")
+        raise
+
+def format_report(reports: List[dict]) -> str:
+    lines = []
+    for report in reports:
+        if not report["orphans"]:
+            continue
+        action = f"{report['repaired']} deleted" if report["repaired"] else \
+            ("repairable" if report["repairable"] else "report only")
+        sample = ", ".join(str(value) for value in report["sample"])
+        lines.append(f"{report['check']}: {report['orphans']} of {report['scanned']} rows dangling "
+                     f"({action}); e.g. {sample}")
+    scanned = sum(report["scanned"] for report in reports)
+    return "\n".join(lines + [f"Checked {scanned} rows in {len(reports)} checks, "
+                              f"{sum(report['orphans'] for report in reports)} dangling."])
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Find and repair orphaned rows in the task database.")
+    parser.add_argument("--db", default=DB_PATH, help="Database file")
+    parser.add_argument("--repair", action="store_true", help="Delete orphaned rows")
+    parser.add_argument("--chunk-size", type=int, default=INTEGRITY_CHUNK_SIZE)
+    parser.add_argument("--check", action="append", choices=[check.name for check in CHECKS],
+                        help="Run only this check (repeatable)")
+    args = parser.parse_args(argv)
+
+    current = []
+
+    def progress(name: str, scanned: int, total: int) -> None:
+        if current and current[-1] != name:
+            print(file=sys.stderr)
+        current[:] = [name]
+        print(f"\r{name}: {scanned}/{total}", end="", file=sys.stderr, flush=True)
+
+    reports = check_integrity(args.repair, args.chunk_size, progress, args.db, args.check)
+    print(file=sys.stderr)
+    print(format_report(reports))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import logging
-from manager.utils import DB_PATH, SYSTEM_USER_ID, UserRole, log_action, DatabaseError
-from ..operations.users import add_user
-from ..operations.tags import add_tag
-from .db_initialize import check_existing_tables
+from manager.utils import DB_PATH, SYSTEM_USER_ID, UserRole, check_existing_tables, log_action, DatabaseError
+from manager.operations.users import add_user
+from manager.operations.tags import add_tag
 
 def initialize_system_data() -> None:
     """Initialize essential system data."""
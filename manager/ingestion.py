@@ -0,0 +1,97 @@
+"""Turn free-text messages into tasks in bulk.
+
+Messages are parsed with `operations.task_parser` and inserted through
+`TaskManager.create_tasks_bulk` in batches. From the command line, one message per line:
+
+    python -m manager.ingestion messages.txt --owner user1
+    cat messages.txt | python -m manager.ingestion - --dry-run
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from manager.operations.task_parser import parse_task_message
+from manager.operations.users import user_directory
+from manager.task_management import TaskManager
+
+# Parsed messages inserted per transaction
+INGEST_BATCH_SIZE = 500
+DEFAULT_OWNER = "user1"
+
+def parse_messages(messages: Iterable[str], default_owner: str = DEFAULT_OWNER):
+    """Yield (line_number, message, parsed task or None, error or None) for non-blank messages."""
+    for line_number, message in enumerate(messages, start=1):
+        message = message.strip()
+        if not message:
+            continue
+        try:
+            yield line_number, message, parse_task_message(message, now=datetime.now(),
+                                                           default_owner=default_owner), None
+        except ValueError as e:
+            yield line_number, message, None, str(e)
+
+def ingest_messages(messages: Iterable[str], default_owner: str = DEFAULT_OWNER,
+                    batch_size: int = INGEST_BATCH_SIZE,
+                    task_manager: Optional[TaskManager] = None) -> dict:
+    """Parse a stream of messages and create their tasks in batches.
+
+    Messages that cannot be parsed or name an unknown owner are skipped and reported
+    in `rejected`.
+    """
+    task_manager = task_manager or TaskManager()
+    task_ids: List[int] = []
+    rejected: List[dict] = []
+    batch: List[tuple] = []
+
+    def flush():
+        task_ids.extend(task_manager.create_tasks_bulk(batch))
+        logging.info(f"Ingested a batch of {len(batch)} tasks.")
+        batch.clear()
+
+    for line_number, message, task, error in parse_messages(messages, default_owner):
+        if not error and not user_directory.exists(task["owner"]):
+            error = f"User {task['owner']} not found."
+        if error:
+            rejected.append({"line": line_number, "message": message, "error": error})
+            continue
+        batch.append((task["title"], task["description"], task["priority"], task["owner"], task["deadline"]))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if rejected:
+        logging.warning(f"Rejected {len(rejected)} messages during ingestion.")
+    return {"created": len(task_ids), "task_ids": task_ids, "rejected": rejected}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create tasks from free-text messages, one per line.")
+    parser.add_argument("paths", nargs="*", default=["-"], help="Message files ('-' for stdin)")
+    parser.add_argument("--owner", default=DEFAULT_OWNER, help="Owner for messages that do not name one")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Print the parsed tasks without saving them")
+    args = parser.parse_args(argv)
+
+    def lines():
+        for path in args.paths:
+            if path == "-":
+                yield from sys.stdin
+            else:
+                with open(path, encoding="utf-8") as handle:
+                    yield from handle
+
+    if args.dry_run:
+        for line_number, message, task, error in parse_messages(lines(), args.owner):
+            print(json.dumps({"line": line_number, **(task or {"message": message, "error": error})}))
+        return
+
+    report = ingest_messages(lines(), default_owner=args.owner, batch_size=args.batch_size)
+    for entry in report["rejected"]:
+        print(f"line {entry['line']}: {entry['error']} ({entry['message']})", file=sys.stderr)
+    print(f"Created {report['created']} tasks, rejected {len(report['rejected'])} messages.")
+
+if __name__ == "__main__":
+    main()
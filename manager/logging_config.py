@@ -0,0 +1,169 @@
+"""Application logging: non-blocking queue handlers, rotation, JSON records and rate limits.
+
+Callers only enqueue records; a single listener thread formats them and does the file
+and console I/O, so a slow disk never adds latency to a command.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+LOG_FILE = "task_manager.log"
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Size-based rotation defaults
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Records below WARNING allowed per call site per second, with a burst allowance
+INFO_RATE_PER_SECOND = 20.0
+INFO_BURST = 100
+
+# Fields attached to every record logged while a command is being processed
+_log_context: contextvars.ContextVar = contextvars.ContextVar("gary_log_context", default={})
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Attach fields (e.g. command, task_id) to every record logged inside the block."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+class ContextFilter(logging.Filter):
+    """Copy the current log context onto the record in the calling thread, before it is queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for records below WARNING.
+
+    High-volume info lines (one per notification, one per task) are thinned out;
+    the next record let through from that call site reports how many were dropped.
+    """
+
+    def __init__(self, rate: float = INFO_RATE_PER_SECOND, burst: int = INFO_BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [float(self.burst), now, 0])
+            tokens, last, suppressed = bucket
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                bucket[:] = [tokens, now, suppressed + 1]
+                return False
+            bucket[:] = [tokens - 1, now, 0]
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, level and any context fields."""
+
+    CONTEXT_FIELDS = ("command", "task_id", "recipient", "suppressed")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in self.CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps a record's traceback apart from its message.
+
+    The stock `prepare` appends the traceback to the message and clears `exc_info`, so
+    the JsonFormatter on the listener side never saw an exception. Here the traceback is
+    formatted in the calling thread into `exc_text`, which the formatters read instead.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+def setup_logging(log_path: str = LOG_FILE, level: int = logging.INFO, json_format: bool = True,
+                  rotation: str = "size", max_bytes: int = MAX_LOG_BYTES,
+                  backup_count: int = LOG_BACKUP_COUNT, when: str = "midnight",
+                  console: bool = True, info_rate: Optional[float] = INFO_RATE_PER_SECOND) -> None:
+    """Configure the root logger once for the whole application.
+
+    `rotation` is "size" (`max_bytes`) or "time" (`when`, as in TimedRotatingFileHandler).
+    Pass `info_rate=None` to disable rate limiting.
+    """
+    root = logging.getLogger()
+    if any(getattr(handler, "gary_listener", None) for handler in root.handlers):
+        return
+
+    if rotation == "time":
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_path, when=when, backupCount=backup_count, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    handlers = [file_handler]
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    queue_handler = TracebackQueueHandler(queue.Queue(-1))
+    queue_handler.addFilter(ContextFilter())
+    if info_rate is not None:
+        queue_handler.addFilter(RateLimitFilter(rate=info_rate))
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    queue_handler.gary_listener = listener
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        listener = getattr(handler, "gary_listener", None)
+        if listener is not None:
+            listener.stop()
+            for target in listener.handlers:
+                target.close()
+            handler.gary_listener = None
+            root.removeHandler(handler)
@@ -1,34 +1,43 @@
 import logging
-from db.db_initialize import initialize_db
-from utils import DatabaseError
+from datetime import datetime
+from manager.db.db_initialize import initialize_db
+from manager.utils import DatabaseError
+from manager.logging_config import setup_logging
 from apscheduler.schedulers.background import BackgroundScheduler
-from operations.recurring_tasks import process_recurring_tasks
-
-def setup_logging():
-    """Configure logging for the application."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('task_manager.log'),
-            logging.StreamHandler()
-        ]
-    )
+from manager.operations.recurring_tasks import process_recurring_tasks, refresh_occurrences
+from manager.operations.archive import archive_closed_tasks
+from manager.operations.analytics import refresh_metrics
+from manager.operations.notification_dispatch import NotificationDispatcher, LogSink, release_stale_claims
+from manager.replica import enable_read_replica
 
 def initialize_scheduler():
     """Initialize the scheduler for recurring tasks."""
     scheduler = BackgroundScheduler()
     scheduler.add_job(process_recurring_tasks, 'interval', hours=1)  # Runs every hour
+    scheduler.add_job(refresh_occurrences, 'interval', hours=1)  # Keep the upcoming-occurrence window filled
+    # Fold new transitions into the metric rollups, starting now; /metrics only reads the rollups
+    scheduler.add_job(refresh_metrics, 'interval', minutes=15, next_run_time=datetime.now())
+    scheduler.add_job(archive_closed_tasks, 'interval', days=1)  # Move old closed tasks to the archive tier
+    scheduler.add_job(release_stale_claims, 'interval', minutes=5)  # Requeue abandoned notification claims
     scheduler.start()
     logging.info("Scheduler initialized.")
 
-def initialize_application(dev_mode: bool = False) -> None:
+def initialize_notification_dispatcher(workers: int = 2) -> NotificationDispatcher:
+    """Start the background workers that deliver queued notifications."""
+    dispatcher = NotificationDispatcher(sinks=[LogSink()], workers=workers)
+    dispatcher.start()
+    return dispatcher
+
+def initialize_application(dev_mode: bool = False, read_replica: bool = False) -> None:
     """Initialize the entire application."""
     try:
         setup_logging()
         initialize_db(force=dev_mode)  # Initialize schema and populate data
+        if read_replica:
+            enable_read_replica()  # Serve reads from an in-memory copy of the database
         
         initialize_scheduler()  # Initialize the recurring task scheduler
+        initialize_notification_dispatcher()  # Deliver queued notifications in the background
         
         logging.info("Application initialized successfully.")
     except DatabaseError as e:
@@ -0,0 +1,220 @@
+# operations/analytics.py
+import csv
+import os
+import sqlite3
+import logging
+from typing import List, Optional, Tuple
+from manager.utils import get_db_path
+
+DIMENSIONS = ("all", "owner", "priority", "tag")
+PERIODS = {"daily": "%Y-%m-%d", "weekly": "%Y-W%W"}
+
+# Directory that metric exports are written into; GARY_EXPORT_DIR overrides the default
+EXPORT_DIR_ENV_VAR = "GARY_EXPORT_DIR"
+DEFAULT_EXPORT_DIR = "exports"
+
+# Transition actions (lower case) mapped to the TaskLifecycle column they set
+LIFECYCLE_ACTIONS = {
+    "accepted": "accepted_at",
+    "completed": "completed_at",
+    "verified": "verified_at",
+}
+
+# New rows read from each source per refresh, in id order
+REFRESH_BATCH_SIZE = 5000
+
+# Event sources: (high-water-mark key, query for rows after the mark returning id, task_id, action, time)
+EVENT_SOURCES = [
+    ("TaskResponses", """
+        SELECT response_id, task_id, lower(action), response_time
+        FROM TaskResponses
+        WHERE response_id > ?
+        ORDER BY response_id
+        LIMIT ?
+    """),
+    ("AuditLogs", """
+        SELECT log_id, entity_id, action, timestamp
+        FROM AuditLogs
+        WHERE log_id > ? AND entity = 'Tasks'
+        ORDER BY log_id
+        LIMIT ?
+    """),
+]
+
+def _ingest_events(cursor) -> int:
+    """Fold transitions recorded since the last refresh into TaskLifecycle."""
+    ingested = 0
+    for source, query in EVENT_SOURCES:
+        cursor.execute("SELECT last_id FROM MetricsState WHERE source = ?", (source,))
+        row = cursor.fetchone()
+        last_id = row[0] if row else 0
+        while True:
+            cursor.execute(query, (last_id, REFRESH_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for action, column in LIFECYCLE_ACTIONS.items():
+                events = [(int(row[1]), row[3]) for row in rows if row[2] == action and str(row[1]).isdigit()]
+                # Keep the earliest time seen for each transition
+                cursor.executemany(f"""
+                    INSERT INTO TaskLifecycle (task_id, {column}) VALUES (?, ?)
+                    ON CONFLICT(task_id) DO UPDATE SET
+                        {column} = CASE WHEN {column} IS NULL OR excluded.{column} < {column}
+                                        THEN excluded.{column} ELSE {column} END
+                """, events)
+                ingested += len(events)
+        cursor.execute("""
+            INSERT INTO MetricsState (source, last_id) VALUES (?, ?)
+            ON CONFLICT(source) DO UPDATE SET last_id = excluded.last_id
+        """, (source, last_id))
+    return ingested
+
+def _roll_up(cursor) -> int:
+    """Add tasks finished since the last refresh to MetricsDaily."""
+    cursor.execute("DROP TABLE IF EXISTS temp.metrics_batch")
+    cursor.execute("""
+        CREATE TEMP TABLE metrics_batch AS
+        SELECT l.task_id,
+               date(COALESCE(l.completed_at, l.verified_at)) AS day,
+               t.owner, t.priority,
+               (julianday(COALESCE(l.completed_at, l.verified_at)) - julianday(t.created_at)) * 24 AS lead_hours,
+               (julianday(COALESCE(l.completed_at, l.verified_at)) - julianday(l.accepted_at)) * 24 AS cycle_hours,
+               t.deadline IS NOT NULL AS has_deadline,
+               COALESCE(COALESCE(l.completed_at, l.verified_at) <= t.deadline, 0) AS on_time
+        FROM TaskLifecycle l
+        JOIN (
+            SELECT task_id, owner, priority, created_at, deadline FROM Tasks
+            UNION ALL
+            SELECT task_id, owner, priority, created_at, deadline FROM ArchivedTasks
+        ) t ON t.task_id = l.task_id
+        WHERE l.counted = 0 AND COALESCE(l.completed_at, l.verified_at) IS NOT NULL
+    """)
+    batch_size = cursor.execute("SELECT COUNT(*) FROM metrics_batch").fetchone()[0]
+
+    dimension_sources = {
+        "all": ("'all'", "metrics_batch b"),
+        "owner": ("b.owner", "metrics_batch b"),
+        "priority": ("lower(b.priority)", "metrics_batch b"),
+        "tag": ("g.name", """metrics_batch b
+            JOIN (SELECT task_id, tag_id FROM TaskTags UNION ALL SELECT task_id, tag_id FROM ArchivedTaskTags) tt
+                ON tt.task_id = b.task_id
+            JOIN Tags g ON g.tag_id = tt.tag_id"""),
+    }
+    for dimension, (value, source) in dimension_sources.items():
+        cursor.execute(f"""
+            INSERT INTO MetricsDaily (day, dimension, value, completed, with_deadline, on_time,
+                                      lead_time_hours, cycle_time_hours, cycle_count)
+            SELECT b.day, '{dimension}', {value}, COUNT(*), SUM(b.has_deadline), SUM(b.on_time),
+                   TOTAL(b.lead_hours), TOTAL(b.cycle_hours), COUNT(b.cycle_hours)
+            FROM {source}
+            WHERE 1 = 1
+            GROUP BY b.day, {value}
+            ON CONFLICT(dimension, value, day) DO UPDATE SET
+                completed = completed + excluded.completed,
+                with_deadline = with_deadline + excluded.with_deadline,
+                on_time = on_time + excluded.on_time,
+                lead_time_hours = lead_time_hours + excluded.lead_time_hours,
+                cycle_time_hours = cycle_time_hours + excluded.cycle_time_hours,
+                cycle_count = cycle_count + excluded.cycle_count
+        """)
+
+    cursor.execute("UPDATE TaskLifecycle SET counted = 1 WHERE task_id IN (SELECT task_id FROM metrics_batch)")
+    # Transitions of deleted tasks can still be ingested from the audit log; retire them
+    # so they are not rescanned on every refresh
+    cursor.execute("""
+        UPDATE TaskLifecycle SET counted = 1
+        WHERE counted = 0 AND task_id NOT IN (SELECT task_id FROM Tasks UNION ALL SELECT task_id FROM ArchivedTasks)
+    """)
+    cursor.execute("DROP TABLE temp.metrics_batch")
+    return batch_size
+
+def refresh_metrics() -> dict:
+    """Bring the rollups up to date with rows added since the last refresh."""
+    try:
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            events = _ingest_events(cursor)
+            finished = _roll_up(cursor)
+            connection.commit()
+        if events or finished:
+            logging.info(f"Metrics refreshed: {events} transitions, {finished} finished tasks.")
+        return {"transitions": events, "finished_tasks": finished}
+    except Exception as e:
+        logging.error(f"Failed to refresh metrics: {e}")
+        raise
+
+def _validate_metric_query(dimension: str, period: str) -> None:
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Invalid dimension: {dimension}. Must be one of {list(DIMENSIONS)}")
+    if period not in PERIODS:
+        raise ValueError(f"Invalid period: {period}. Must be one of {list(PERIODS)}")
+
+def get_metrics(dimension: str = "all", period: str = "weekly", days: int = 90,
+                value: Optional[str] = None) -> List[dict]:
+    """Throughput, lead time, cycle time and on-time rate per period from the rollups.
+
+    Times are averages in hours; the on-time rate only counts tasks with a deadline.
+    """
+    _validate_metric_query(dimension, period)
+    try:
+        query = f"""
+            SELECT strftime('{PERIODS[period]}', day) AS bucket, value,
+                   SUM(completed), SUM(with_deadline), SUM(on_time),
+                   SUM(lead_time_hours), SUM(cycle_time_hours), SUM(cycle_count)
+            FROM MetricsDaily
+            WHERE dimension = ? AND day >= date('now', ?)
+        """
+        params: list = [dimension, f"-{int(days)} days"]
+        if value is not None:
+            query += " AND value = ?"
+            params.append(value)
+        query += " GROUP BY bucket, value ORDER BY bucket, value"
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        return [
+            {
+                "period": row[0],
+                "dimension": dimension,
+                "value": row[1],
+                "throughput": row[2],
+                "avg_lead_time_hours": round(row[5] / row[2], 2) if row[2] else None,
+                "avg_cycle_time_hours": round(row[6] / row[7], 2) if row[7] else None,
+                "on_time_rate": round(row[4] / row[3], 3) if row[3] else None,
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        logging.error(f"Failed to read metrics: {e}")
+        raise
+
+def export_path(name: str) -> str:
+    """Resolve a file name inside the export directory, rejecting names that would leave it."""
+    if not name or os.path.isabs(name) or ".." in name.replace("\\", "/").split("/"):
+        raise ValueError(f"Invalid export file name: {name}. Use a relative name without '..'.")
+    export_dir = os.path.realpath(os.environ.get(EXPORT_DIR_ENV_VAR) or DEFAULT_EXPORT_DIR)
+    path = os.path.realpath(os.path.join(export_dir, name))
+    if os.path.commonpath([export_dir, path]) != export_dir:
+        raise ValueError(f"Invalid export file name: {name}. It resolves outside {export_dir}.")
+    return path
+
+def export_metrics_csv(name: str, dimension: str = "all", period: str = "weekly",
+                       days: int = 90) -> Tuple[int, str]:
+    """Write `get_metrics` rows to a CSV file in the export directory.
+
+    Returns the number of rows written and the path of the file.
+    """
+    _validate_metric_query(dimension, period)
+    path = export_path(name)
+    rows = get_metrics(dimension, period, days)
+    fields = ["period", "dimension", "value", "throughput", "avg_lead_time_hours",
+              "avg_cycle_time_hours", "on_time_rate"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    logging.info(f"Exported {len(rows)} metric rows to {path}")
+    return len(rows), path
@@ -0,0 +1,98 @@
+# operations/archive.py
+import sqlite3
+import logging
+from typing import List
+from manager.utils import CLOSED_STATUSES, SYSTEM_USER_ID, get_db_path
+from manager.operations.cascade import task_id_match
+from manager.replica import replica_write, replicate_many
+
+# Closed tasks untouched for this many days are moved to the archive tier
+ARCHIVE_AFTER_DAYS = 30
+# Tasks moved per transaction
+ARCHIVE_BATCH_SIZE = 500
+
+# (hot table, archive table, columns) for every table whose rows follow a task into the archive
+ARCHIVED_TABLES = [
+    ("Tasks", "ArchivedTasks",
+     "task_id, title, description, priority, owner, status, deadline, created_at, updated_at"),
+    ("TaskTags", "ArchivedTaskTags", "task_id, tag_id"),
+    ("TaskResponses", "ArchivedTaskResponses",
+     "response_id, task_id, user_id, action, response_time, comments"),
+    ("Notifications", "ArchivedNotifications",
+     "notification_id, task_id, recipient, message, timestamp, event_count, delivered_at, read_at"),
+]
+# (table, column, column is TEXT) for rows that are dropped rather than archived with a task:
+# dependencies on or of an archived task and its undelivered notifications
+DROPPED_REFERENCES = [
+    ("TaskDependencies", "task_id", False),
+    ("TaskDependencies", "depends_on", False),
+    ("NotificationOutbox", "task_id", True),
+]
+
+def _replicate_archived(task_ids: List[int]) -> None:
+    """Move an archived batch's rows to the archive tables of the read replica, if one is enabled."""
+    text_ids = [str(task_id) for task_id in task_ids]
+    changes = []
+    for hot_table, archive_table, _ in ARCHIVED_TABLES:
+        keys = task_ids if hot_table == "Tasks" else text_ids
+        changes += [(hot_table, "task_id", keys), (archive_table, "task_id", keys)]
+    changes += [(table, column, text_ids if is_text else task_ids) for table, column, is_text in DROPPED_REFERENCES]
+    replicate_many(changes)
+
+@replica_write
+def archive_closed_tasks(older_than_days: int = ARCHIVE_AFTER_DAYS,
+                         batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move closed tasks and their tags, responses and notifications to the archive tables.
+
+    Each batch is copied and deleted in one transaction, dropping the tasks' dependencies
+    and queued notifications. Templates of recurring tasks stay in the hot table.
+    Returns the number of tasks archived.
+    """
+    status_placeholders = ", ".join("?" for _ in CLOSED_STATUSES)
+    total = 0
+    try:
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (task_id INTEGER PRIMARY KEY)")
+            while True:
+                cursor.execute("DELETE FROM archive_batch")
+                cursor.execute(f"""
+                    INSERT INTO archive_batch (task_id)
+                    SELECT task_id FROM Tasks
+                    WHERE LOWER(status) IN ({status_placeholders})
+                      AND updated_at < datetime('now', ?)
+                      AND task_id NOT IN (SELECT template_task_id FROM RecurringTasks WHERE active = 1)
+                    ORDER BY task_id
+                    LIMIT ?
+                """, (*(status.lower() for status in CLOSED_STATUSES), f"-{int(older_than_days)} days", batch_size))
+                if cursor.rowcount <= 0:
+                    connection.rollback()
+                    break
+
+                for hot_table, archive_table, columns in ARCHIVED_TABLES:
+                    cursor.execute(f"""
+                        INSERT OR REPLACE INTO {archive_table} ({columns})
+                        SELECT {columns} FROM {hot_table}
+                        WHERE task_id IN (SELECT task_id FROM archive_batch)
+                    """)
+                for table, column, is_text in DROPPED_REFERENCES:
+                    cursor.execute(f"DELETE FROM {table} WHERE {task_id_match(column, is_text, 'archive_batch')}")
+                for hot_table, _, _ in reversed(ARCHIVED_TABLES):
+                    cursor.execute(f"DELETE FROM {hot_table} WHERE task_id IN (SELECT task_id FROM archive_batch)")
+                cursor.execute("""
+                    INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+                    SELECT 'Tasks', CAST(task_id AS TEXT), 'archived', ? FROM archive_batch
+                """, (SYSTEM_USER_ID,))
+
+                task_ids = [row[0] for row in cursor.execute("SELECT task_id FROM archive_batch")]
+                connection.commit()
+                _replicate_archived(task_ids)
+                archived = len(task_ids)
+                total += archived
+                logging.info(f"Archived a batch of {archived} closed tasks.")
+            cursor.execute("DROP TABLE IF EXISTS temp.archive_batch")
+        logging.info(f"Archived {total} closed tasks older than {older_than_days} days.")
+        return total
+    except Exception as e:
+        logging.error(f"Failed to archive closed tasks: {e}")
+        raise
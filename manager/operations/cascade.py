@@ -0,0 +1,160 @@
+# operations/cascade.py
+import sqlite3
+import logging
+from typing import Iterable, List, Optional, Tuple
+from manager.utils import SYSTEM_USER_ID, get_db_path
+from manager.replica import replica_write, replicate_many
+
+# Tasks deleted per transaction by filter-based deletes
+DELETE_BATCH_SIZE = 500
+
+# (table, column, column is TEXT) for every column that holds a task id. TEXT columns are
+# matched against CAST(task_id AS TEXT) so that their indexes stay usable.
+TASK_REFERENCES = [
+    ("TaskTags", "task_id", True),
+    ("TaskResponses", "task_id", True),
+    ("Notifications", "task_id", True),
+    ("NotificationOutbox", "task_id", True),
+    ("TaskDependencies", "task_id", False),
+    ("TaskDependencies", "depends_on", False),
+    ("TaskLifecycle", "task_id", False),
+    ("RecurringTasks", "template_task_id", True),
+    ("ArchivedTaskTags", "task_id", True),
+    ("ArchivedTaskResponses", "task_id", True),
+    ("ArchivedNotifications", "task_id", True),
+]
+TASK_TABLES = ("Tasks", "ArchivedTasks")
+
+# Filters accepted by delete_tasks_where, mapped to their condition on the task row
+DELETE_FILTERS = {
+    "status": "t.status = ?",
+    "owner": "t.owner = ?",
+    "before": "t.updated_at < ?",
+    "tag": """t.task_id IN (
+        SELECT tt.task_id FROM (SELECT task_id, tag_id FROM TaskTags
+                                UNION ALL SELECT task_id, tag_id FROM ArchivedTaskTags) tt
+        JOIN Tags g ON g.tag_id = tt.tag_id
+        WHERE g.name = ?)""",
+}
+
+def task_id_match(column: str, is_text: bool, source: str = "delete_batch") -> str:
+    """SQL condition matching `column` against the task ids in a temp table."""
+    key = "CAST(task_id AS TEXT)" if is_text else "task_id"
+    return f"{column} IN (SELECT {key} FROM {source})"
+
+def _cascade_batch(cursor, performed_by: str) -> Tuple[int, List[int]]:
+    """Delete the tasks listed in temp.delete_batch and every row that references them.
+
+    Returns the number of tasks deleted and the ids of the recurrence rules removed with them.
+    """
+    cursor.execute(f"""
+        SELECT recurring_task_id FROM RecurringTasks WHERE {task_id_match('template_task_id', True)}
+    """)
+    recurring_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"""
+        DELETE FROM RecurringOccurrences WHERE recurring_task_id IN (
+            SELECT recurring_task_id FROM RecurringTasks
+            WHERE {task_id_match('template_task_id', True)})
+    """)
+    for table, column, is_text in TASK_REFERENCES:
+        cursor.execute(f"DELETE FROM {table} WHERE {task_id_match(column, is_text)}")
+    deleted = 0
+    for table in TASK_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE {task_id_match('task_id', False)}")
+        deleted += cursor.rowcount
+    cursor.execute("""
+        INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+        SELECT 'Tasks', CAST(task_id AS TEXT), 'deleted', ? FROM delete_batch
+    """, (performed_by,))
+    return deleted, recurring_ids
+
+def _replicate_deleted(task_ids: List[int], recurring_ids: List[int]) -> None:
+    """Drop the deleted rows from the read replica, if one is enabled, in one replica transaction."""
+    text_ids = [str(task_id) for task_id in task_ids]
+    changes = [(table, "task_id", task_ids) for table in TASK_TABLES]
+    changes += [(table, column, text_ids if is_text else task_ids) for table, column, is_text in TASK_REFERENCES]
+    changes.append(("RecurringOccurrences", "recurring_task_id", recurring_ids))
+    replicate_many(changes)
+
+@replica_write
+def delete_tasks(task_ids: Iterable[int], performed_by: str = SYSTEM_USER_ID,
+                 connection: Optional[sqlite3.Connection] = None) -> int:
+    """Delete tasks, hot or archived, with their tags, responses, notifications, dependencies,
+    recurrence rules and lifecycle rows in one transaction. Returns the number of tasks deleted.
+
+    Runs on `connection` when one is given instead of the application database; the read
+    replica is then left alone.
+    """
+    task_ids = [int(task_id) for task_id in task_ids]
+    if not task_ids:
+        return 0
+    own_connection = connection is None
+    try:
+        with sqlite3.connect(get_db_path()) if own_connection else connection as connection:
+            cursor = connection.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS delete_batch (task_id INTEGER PRIMARY KEY)")
+            cursor.execute("DELETE FROM delete_batch")
+            cursor.executemany("INSERT OR IGNORE INTO delete_batch (task_id) VALUES (?)",
+                               [(task_id,) for task_id in task_ids])
+            cursor.execute("""
+                DELETE FROM delete_batch WHERE task_id NOT IN (
+                    SELECT task_id FROM Tasks UNION ALL SELECT task_id FROM ArchivedTasks)
+            """)
+            deleted, recurring_ids = _cascade_batch(cursor, performed_by)
+            cursor.execute("DELETE FROM delete_batch")
+            connection.commit()
+        if own_connection:
+            _replicate_deleted(task_ids, recurring_ids)
+        return deleted
+    except Exception as e:
+        logging.error(f"Failed to delete tasks: {e}")
+        raise
+
+@replica_write
+def delete_tasks_where(include_archived: bool = False, performed_by: str = SYSTEM_USER_ID,
+                       batch_size: int = DELETE_BATCH_SIZE, **filters) -> int:
+    """Delete every task matching all of the given filters (status, owner, tag, before).
+
+    `before` compares against updated_at. Tasks are deleted in batches, each with its
+    dependent rows in one transaction. Returns the number of tasks deleted.
+    """
+    unknown = set(filters) - set(DELETE_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {sorted(unknown)}. Must be among {list(DELETE_FILTERS)}")
+    filters = {name: value for name, value in filters.items() if value is not None}
+    if not filters:
+        raise ValueError("At least one filter is required.")
+
+    conditions = " AND ".join(DELETE_FILTERS[name] for name in filters)
+    source = "SELECT task_id, status, owner, updated_at FROM Tasks"
+    if include_archived:
+        source += " UNION ALL SELECT task_id, status, owner, updated_at FROM ArchivedTasks"
+    total = 0
+    try:
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS delete_batch (task_id INTEGER PRIMARY KEY)")
+            while True:
+                cursor.execute("DELETE FROM delete_batch")
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO delete_batch (task_id)
+                    SELECT t.task_id FROM ({source}) t
+                    WHERE {conditions}
+                    ORDER BY t.task_id
+                    LIMIT ?
+                """, (*filters.values(), batch_size))
+                if cursor.rowcount <= 0:
+                    connection.rollback()
+                    break
+                task_ids = [row[0] for row in cursor.execute("SELECT task_id FROM delete_batch")]
+                deleted, recurring_ids = _cascade_batch(cursor, performed_by)
+                total += deleted
+                cursor.execute("DELETE FROM delete_batch")
+                connection.commit()
+                _replicate_deleted(task_ids, recurring_ids)
+            cursor.execute("DROP TABLE IF EXISTS temp.delete_batch")
+        logging.info(f"Deleted {total} tasks matching {filters}.")
+        return total
+    except Exception as e:
+        logging.error(f"Failed to delete tasks matching {filters}: {e}")
+        raise
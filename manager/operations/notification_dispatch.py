@@ -0,0 +1,228 @@
+# operations/notification_dispatch.py
+import sqlite3
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+from manager.utils import SYSTEM_USER_ID, get_db_path
+from manager.replica import replica_write, replicate, replicate_many
+
+# Outbox rows claimed by a worker in one go
+OUTBOX_BATCH_SIZE = 200
+# Pending events for one recipient in a batch that get merged into a digest
+DIGEST_THRESHOLD = 3
+# Deliveries are retried this many times before an outbox row is marked failed
+MAX_DELIVERY_ATTEMPTS = 5
+# Delay before the first retry of a failed delivery; it doubles with every further attempt
+RETRY_BACKOFF_SECONDS = 30
+# Claims older than this are considered abandoned by a dead worker
+CLAIM_TIMEOUT_SECONDS = 300
+# Seconds an idle worker waits before polling the outbox again
+POLL_INTERVAL_SECONDS = 2.0
+
+class NotificationSink(ABC):
+    """Delivery target for notifications. Subclasses implement `deliver`."""
+
+    @abstractmethod
+    def deliver(self, notification: dict) -> None:
+        """Deliver one notification or digest; raising marks it for a retry."""
+
+class LogSink(NotificationSink):
+    """Deliver notifications to the application log."""
+
+    def deliver(self, notification: dict) -> None:
+        logging.info(f"Notification sent to {notification['recipient']}: {notification['message']}",
+                     extra={"recipient": notification["recipient"], "task_id": notification["task_id"]})
+
+class FileSink(NotificationSink):
+    """Append notifications to a local file, one line per notification."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, notification: dict) -> None:
+        message = notification["message"].replace("\n", " | ")
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(f"{notification['recipient']}\t{notification['task_id'] or ''}\t{message}\n")
+
+@replica_write
+def claim_batch(worker_id: str, batch_size: int = OUTBOX_BATCH_SIZE) -> List[tuple]:
+    """Claim up to `batch_size` pending outbox rows whose retry delay has passed for a worker."""
+    claim_token = f"{worker_id}:{uuid.uuid4().hex}"
+    with sqlite3.connect(get_db_path()) as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+            UPDATE NotificationOutbox
+            SET status = 'claimed', claimed_by = ?, claimed_at = CURRENT_TIMESTAMP
+            WHERE outbox_id IN (
+                SELECT outbox_id FROM NotificationOutbox
+                WHERE status = 'pending'
+                  AND (next_attempt_at IS NULL OR next_attempt_at <= CURRENT_TIMESTAMP)
+                ORDER BY outbox_id
+                LIMIT ?
+            )
+        """, (claim_token, batch_size))
+        connection.commit()
+        cursor.execute("""
+            SELECT outbox_id, task_id, recipient, message, attempts
+            FROM NotificationOutbox
+            WHERE claimed_by = ? AND status = 'claimed'
+            ORDER BY outbox_id
+        """, (claim_token,))
+        rows = cursor.fetchall()
+    replicate("NotificationOutbox", "outbox_id", [row[0] for row in rows])
+    return rows
+
+def coalesce(rows: Sequence[tuple], digest_threshold: int = DIGEST_THRESHOLD) -> List[dict]:
+    """Group claimed outbox rows per recipient, merging bursts into digests."""
+    by_recipient: "OrderedDict[str, List[tuple]]" = OrderedDict()
+    for row in rows:
+        by_recipient.setdefault(row[2], []).append(row)
+
+    notifications = []
+    for recipient, events in by_recipient.items():
+        if len(events) >= digest_threshold:
+            task_ids = {event[1] for event in events}
+            notifications.append({
+                "recipient": recipient,
+                "task_id": task_ids.pop() if len(task_ids) == 1 else None,
+                "message": f"{len(events)} updates:\n" + "\n".join(f"- {event[3]}" for event in events),
+                "event_count": len(events),
+                "outbox_ids": [event[0] for event in events],
+                "attempts": max(event[4] for event in events),
+            })
+        else:
+            notifications.extend({
+                "recipient": recipient,
+                "task_id": event[1],
+                "message": event[3],
+                "event_count": 1,
+                "outbox_ids": [event[0]],
+                "attempts": event[4],
+            } for event in events)
+    return notifications
+
+@replica_write
+def deliver_batch(rows: Sequence[tuple], sinks: Sequence[NotificationSink]) -> int:
+    """Deliver claimed rows through the sinks and record the outcome in one transaction.
+
+    Failed rows go back to pending with an exponentially growing retry delay, and are
+    marked failed after MAX_DELIVERY_ATTEMPTS attempts.
+    """
+    delivered, failed = [], []
+    for notification in coalesce(rows):
+        try:
+            for sink in sinks:
+                sink.deliver(notification)
+            delivered.append(notification)
+        except Exception as e:
+            logging.error(f"Delivery to {notification['recipient']} failed: {e}")
+            failed.append(notification)
+
+    with sqlite3.connect(get_db_path()) as connection:
+        cursor = connection.cursor()
+        cursor.executemany("""
+            INSERT INTO Notifications (task_id, recipient, message, event_count, delivered_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, [(n["task_id"], n["recipient"], n["message"], n["event_count"]) for n in delivered])
+        cursor.executemany("""
+            INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+            VALUES ('Notifications', ?, 'notification_sent', ?)
+        """, [(n["task_id"] or 'general', SYSTEM_USER_ID) for n in delivered])
+        cursor.executemany("DELETE FROM NotificationOutbox WHERE outbox_id = ?",
+                           [(outbox_id,) for n in delivered for outbox_id in n["outbox_ids"]])
+        cursor.executemany("""
+            UPDATE NotificationOutbox
+            SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                attempts = attempts + 1, claimed_by = NULL, claimed_at = NULL,
+                next_attempt_at = datetime('now', ?)
+            WHERE outbox_id = ?
+        """, [(MAX_DELIVERY_ATTEMPTS, f"+{RETRY_BACKOFF_SECONDS * 2 ** n['attempts']} seconds", outbox_id)
+              for n in failed for outbox_id in n["outbox_ids"]])
+        connection.commit()
+    replicate_many([("Notifications", "recipient", sorted({n["recipient"] for n in delivered})),
+                    ("NotificationOutbox", "outbox_id", [row[0] for row in rows])])
+    return sum(n["event_count"] for n in delivered)
+
+@replica_write
+def release_stale_claims(timeout_seconds: int = CLAIM_TIMEOUT_SECONDS) -> int:
+    """Return rows claimed by workers that died mid-batch to the pending state."""
+    with sqlite3.connect(get_db_path()) as connection:
+        cursor = connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            SELECT outbox_id FROM NotificationOutbox
+            WHERE status = 'claimed' AND claimed_at < datetime('now', ?)
+        """, (f"-{int(timeout_seconds)} seconds",))
+        outbox_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany("""
+            UPDATE NotificationOutbox
+            SET status = 'pending', claimed_by = NULL, claimed_at = NULL
+            WHERE outbox_id = ?
+        """, [(outbox_id,) for outbox_id in outbox_ids])
+        connection.commit()
+    replicate("NotificationOutbox", "outbox_id", outbox_ids)
+    return len(outbox_ids)
+
+def dispatch_pending(sinks: Optional[Sequence[NotificationSink]] = None,
+                     batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Drain the outbox in the calling thread. Returns the number of events delivered."""
+    sinks = sinks or [LogSink()]
+    worker_id = f"inline-{threading.get_ident()}"
+    total = 0
+    try:
+        while True:
+            rows = claim_batch(worker_id, batch_size)
+            if not rows:
+                break
+            total += deliver_batch(rows, sinks)
+        return total
+    except Exception as e:
+        logging.error(f"Failed to dispatch notifications: {e}")
+        raise
+
+class NotificationDispatcher:
+    """Pool of background workers that drain the notification outbox."""
+
+    def __init__(self, sinks: Optional[Sequence[NotificationSink]] = None, workers: int = 2,
+                 batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.sinks = list(sinks or [LogSink()])
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        release_stale_claims()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"worker-{index}",),
+                                      name=f"notification-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"Notification dispatcher started with {self.workers} workers.")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logging.info("Notification dispatcher stopped.")
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                rows = claim_batch(worker_id, self.batch_size)
+                if rows:
+                    delivered = deliver_batch(rows, self.sinks)
+                    logging.debug(f"{worker_id} delivered {delivered} notification events.")
+                    continue
+            except Exception as e:
+                logging.error(f"Notification worker {worker_id} failed: {e}")
+            self._stop.wait(self.poll_interval)
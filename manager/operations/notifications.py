@@ -1,35 +1,108 @@
 # operations/notifications.py
 import sqlite3
 import logging
-from manager.utils import log_action, DB_PATH
+from typing import Iterable, List, Optional, Tuple
+from manager.utils import get_db_path
+from manager.replica import read_connection, replica_write, replicate
+
+# Default page size for notification fetches
+NOTIFICATION_PAGE_SIZE = 50
 
 def send_notification(task_id: str, recipient: str, message: str) -> None:
-    """Log a notification in the database."""
+    """Queue a notification in the outbox for delivery by the dispatcher."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                INSERT INTO Notifications (task_id, recipient, message)
+                INSERT INTO NotificationOutbox (task_id, recipient, message)
                 VALUES (?, ?, ?)
             """, (task_id, recipient, message))
             connection.commit()
+    except Exception as e:
+        logging.error(f"Failed to queue notification: {e}")
+        raise
 
-        log_action('Notifications', task_id or 'general', 'notification_sent', 'system')
-        logging.info(f"Notification sent to {recipient}: {message}")
+def send_notifications(events: Iterable[Tuple[str, str, str]]) -> int:
+    """Queue many (task_id, recipient, message) notifications in one transaction."""
+    try:
+        events = list(events)
+        if not events:
+            return 0
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.executemany("""
+                INSERT INTO NotificationOutbox (task_id, recipient, message)
+                VALUES (?, ?, ?)
+            """, events)
+            connection.commit()
+        return len(events)
     except Exception as e:
-        logging.error(f"Failed to send notification: {e}")
+        logging.error(f"Failed to queue notifications: {e}")
         raise
 
-def fetch_notifications(recipient: str) -> list:
-    """Fetch notifications for a specific recipient."""
+def fetch_notifications(recipient: str, unread_only: bool = False,
+                        before_id: Optional[int] = None,
+                        limit: int = NOTIFICATION_PAGE_SIZE) -> List[dict]:
+    """Fetch one page of delivered notifications for a recipient, newest first.
+
+    Pass the last `notification_id` of a page as `before_id` to get the next page.
+    """
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        query = """
+            SELECT notification_id, task_id, message, timestamp, event_count, delivered_at, read_at
+            FROM Notifications
+            WHERE recipient = ?
+        """
+        params: list = [recipient]
+        if unread_only:
+            query += " AND read_at IS NULL"
+        if before_id is not None:
+            query += " AND notification_id < ?"
+            params.append(before_id)
+        query += " ORDER BY notification_id DESC LIMIT ?"
+        params.append(limit)
+
+        with read_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute("""
-                SELECT * FROM Notifications WHERE recipient = ? ORDER BY timestamp DESC
-            """, (recipient,))
-            notifications = cursor.fetchall()
-        return notifications
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        return [
+            {
+                "notification_id": row[0],
+                "task_id": row[1],
+                "message": row[2],
+                "timestamp": row[3],
+                "event_count": row[4],
+                "delivered_at": row[5],
+                "read_at": row[6],
+            }
+            for row in rows
+        ]
     except Exception as e:
         logging.error(f"Failed to fetch notifications for {recipient}: {e}")
         raise
+
+@replica_write
+def mark_notifications_read(recipient: str, notification_ids: Optional[List[int]] = None) -> int:
+    """Mark notifications as read; all unread ones for the recipient if no ids are given."""
+    try:
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            if notification_ids is None:
+                cursor.execute("""
+                    UPDATE Notifications SET read_at = CURRENT_TIMESTAMP
+                    WHERE recipient = ? AND read_at IS NULL
+                """, (recipient,))
+                updated = cursor.rowcount
+            else:
+                cursor.executemany("""
+                    UPDATE Notifications SET read_at = CURRENT_TIMESTAMP
+                    WHERE recipient = ? AND notification_id = ? AND read_at IS NULL
+                """, [(recipient, notification_id) for notification_id in notification_ids])
+                updated = cursor.rowcount
+            connection.commit()
+        replicate("Notifications", "recipient", [recipient])
+        return updated
+    except Exception as e:
+        logging.error(f"Failed to mark notifications read for {recipient}: {e}")
+        raise
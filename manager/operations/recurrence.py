@@ -0,0 +1,373 @@
+# operations/recurrence.py
+import calendar
+import re
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from itertools import product
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8: rules with a time zone are rejected
+    ZoneInfo = None
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Intervals accepted before recurrence rules were introduced
+LEGACY_INTERVALS = {
+    'daily': 'FREQ=DAILY',
+    'weekly': 'FREQ=WEEKLY',
+    'monthly': 'FREQ=MONTHLY',
+}
+
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+
+# Periods (days, weeks, months, years) scanned before a rule is treated as exhausted,
+# so that impossible rules such as "every February 30th" terminate
+MAX_PERIODS = 2000
+
+CRON_MONTHS = {name: index for index, name in enumerate(
+    ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], start=1)}
+CRON_DAYS = {name: index for index, name in enumerate(['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT'])}
+
+_BYDAY_PATTERN = re.compile(r'^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$')
+_CRON_TZ_PATTERN = re.compile(r'^CRON_TZ=(\S+)\s+(.*)$')
+
+def _nth(items: list, position: int):
+    """Return the 1-based (or negative, from the end) `position` of `items`, or None."""
+    index = position - 1 if position > 0 else position
+    return items[index] if -len(items) <= index < len(items) else None
+
+def _load_timezone(name: str):
+    if ZoneInfo is None:
+        raise ValueError("Time zones in recurrence rules require Python 3.9 or newer.")
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        raise ValueError(f"Unknown time zone: {name}")
+
+class RecurrenceRule(ABC):
+    """Base class for recurrence rules.
+
+    All datetimes passed in and returned are naive UTC, like the timestamps SQLite
+    stores. Rules with a time zone are evaluated in local wall time.
+    """
+
+    def __init__(self, tz=None, count: Optional[int] = None, until: Optional[datetime] = None):
+        self.tz = tz
+        self.count = count
+        self.until = until
+
+    def next_after(self, after: datetime, dtstart: datetime, generated: int = 0) -> Optional[datetime]:
+        """Return the first occurrence strictly after `after`, or None once the rule is exhausted.
+
+        `generated` is the number of occurrences already produced, used for COUNT.
+        """
+        if self.count is not None and generated >= self.count:
+            return None
+        local_after = self._to_local(max(after, dtstart - timedelta(seconds=1)))
+        candidate = self._next_local(local_after, self._to_local(dtstart))
+        if candidate is None:
+            return None
+        candidate = self._to_utc(candidate)
+        if self.until is not None and candidate > self.until:
+            return None
+        return candidate
+
+    @abstractmethod
+    def _next_local(self, after: datetime, dtstart: datetime) -> Optional[datetime]:
+        """Return the first local occurrence strictly after `after`, or None if there is none."""
+
+    def _to_local(self, value: datetime) -> datetime:
+        if self.tz is None:
+            return value
+        return value.replace(tzinfo=timezone.utc).astimezone(self.tz).replace(tzinfo=None)
+
+    def _to_utc(self, value: datetime) -> datetime:
+        if self.tz is None:
+            return value
+        return value.replace(tzinfo=self.tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+class RRule(RecurrenceRule):
+    """Subset of RFC 5545 RRULE: FREQ, INTERVAL, COUNT, UNTIL, BYMONTH, BYMONTHDAY,
+    BYDAY (with ordinals for MONTHLY/YEARLY), BYSETPOS, BYHOUR, BYMINUTE and a TZID extension."""
+
+    def __init__(self, freq: str, interval: int = 1, byday: Tuple[Tuple[int, int], ...] = (),
+                 bymonthday: Tuple[int, ...] = (), bymonth: Tuple[int, ...] = (),
+                 bysetpos: Tuple[int, ...] = (), byhour: Tuple[int, ...] = (),
+                 byminute: Tuple[int, ...] = (), **kwargs):
+        super().__init__(**kwargs)
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.bymonth = bymonth
+        self.bysetpos = bysetpos
+        self.byhour = byhour
+        self.byminute = byminute
+
+    def _next_local(self, after: datetime, dtstart: datetime) -> Optional[datetime]:
+        times = [time(hour, minute, dtstart.second) for hour, minute in product(
+            sorted(self.byhour or (dtstart.hour,)), sorted(self.byminute or (dtstart.minute,)))]
+        period = self._first_period(after.date(), dtstart.date())
+        for _ in range(MAX_PERIODS):
+            for day in self._dates_in_period(period, dtstart.date()):
+                if day < after.date():
+                    continue
+                for at in times:
+                    candidate = datetime.combine(day, at)
+                    if candidate > after and candidate >= dtstart:
+                        return candidate
+            period += self.interval
+        return None
+
+    def _first_period(self, after: date, start: date) -> int:
+        """Index of the interval-aligned period that contains `after`, counted from dtstart."""
+        if self.freq == 'DAILY':
+            elapsed = (after - start).days
+        elif self.freq == 'WEEKLY':
+            elapsed = ((after - timedelta(days=after.weekday())) - (start - timedelta(days=start.weekday()))).days // 7
+        elif self.freq == 'MONTHLY':
+            elapsed = (after.year * 12 + after.month) - (start.year * 12 + start.month)
+        else:
+            elapsed = after.year - start.year
+        return max(0, elapsed // self.interval * self.interval)
+
+    def _dates_in_period(self, period: int, start: date) -> List[date]:
+        if self.freq == 'DAILY':
+            days = [start + timedelta(days=period)]
+            days = [day for day in days if self._matches_filters(day)]
+        elif self.freq == 'WEEKLY':
+            monday = start - timedelta(days=start.weekday()) + timedelta(weeks=period)
+            weekdays = sorted({weekday for _, weekday in self.byday} or {start.weekday()})
+            days = [monday + timedelta(days=weekday) for weekday in weekdays]
+            days = [day for day in days if not self.bymonth or day.month in self.bymonth]
+        elif self.freq == 'MONTHLY':
+            year, month = divmod(start.year * 12 + start.month - 1 + period, 12)
+            days = self._dates_in_month(year, month + 1, start)
+            days = [day for day in days if not self.bymonth or day.month in self.bymonth]
+        else:
+            year = start.year + period
+            days = []
+            for month in sorted(self.bymonth or (start.month,)):
+                days.extend(self._dates_in_month(year, month, start))
+        if self.bysetpos:
+            days = sorted({day for day in (_nth(days, pos) for pos in self.bysetpos) if day is not None})
+        return days
+
+    def _matches_filters(self, day: date) -> bool:
+        if self.bymonth and day.month not in self.bymonth:
+            return False
+        if self.byday and day.weekday() not in {weekday for _, weekday in self.byday}:
+            return False
+        if self.bymonthday:
+            last = calendar.monthrange(day.year, day.month)[1]
+            if day.day not in {d if d > 0 else last + d + 1 for d in self.bymonthday}:
+                return False
+        return True
+
+    def _dates_in_month(self, year: int, month: int, start: date) -> List[date]:
+        last = calendar.monthrange(year, month)[1]
+        by_monthday = {d if d > 0 else last + d + 1 for d in self.bymonthday}
+        by_weekday = set()
+        for ordinal, weekday in self.byday:
+            first = (weekday - calendar.weekday(year, month, 1)) % 7 + 1
+            matches = list(range(first, last + 1, 7))
+            if ordinal == 0:
+                by_weekday.update(matches)
+            elif _nth(matches, ordinal) is not None:
+                by_weekday.add(_nth(matches, ordinal))
+        if self.bymonthday and self.byday:
+            days = by_monthday & by_weekday
+        elif self.bymonthday or self.byday:
+            days = by_monthday | by_weekday
+        else:
+            days = {start.day}
+        return [date(year, month, day) for day in sorted(days) if 1 <= day <= last]
+
+class CronRule(RecurrenceRule):
+    """Five-field cron expression (minute hour day-of-month month day-of-week)."""
+
+    def __init__(self, minutes: FrozenSet[int], hours: FrozenSet[int], monthdays: FrozenSet[int],
+                 months: FrozenSet[int], weekdays: FrozenSet[int], restrict_monthday: bool,
+                 restrict_weekday: bool, **kwargs):
+        super().__init__(**kwargs)
+        self.months = months
+        self.monthdays = monthdays
+        self.weekdays = weekdays
+        self.restrict_monthday = restrict_monthday
+        self.restrict_weekday = restrict_weekday
+        self.times = [time(hour, minute) for hour, minute in product(sorted(hours), sorted(minutes))]
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        monthday_ok = day.day in self.monthdays
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: when both day fields are restricted, either may match
+        if self.restrict_monthday and self.restrict_weekday:
+            return monthday_ok or weekday_ok
+        return monthday_ok and weekday_ok
+
+    def _next_local(self, after: datetime, dtstart: datetime) -> Optional[datetime]:
+        day = after.date()
+        for _ in range(MAX_PERIODS):
+            if self._day_matches(day):
+                for at in self.times:
+                    candidate = datetime.combine(day, at)
+                    if candidate > after:
+                        return candidate
+            day += timedelta(days=1)
+        return None
+
+def _parse_int_list(value: str, key: str, low: int, high: int) -> Tuple[int, ...]:
+    try:
+        numbers = tuple(int(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError(f"Invalid {key} value: {value}")
+    for number in numbers:
+        if not (low <= abs(number) <= high) or (low > 0 and number == 0):
+            raise ValueError(f"{key} value out of range: {number}")
+    return numbers
+
+def _parse_until(value: str, tz) -> datetime:
+    for fmt in ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S', '%Y%m%d', DATETIME_FORMAT):
+        try:
+            until = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt == '%Y%m%d':
+            until = until.replace(hour=23, minute=59, second=59)
+        if tz is not None and not fmt.endswith('Z'):
+            until = until.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+        return until
+    raise ValueError(f"Invalid UNTIL value: {value}")
+
+def _parse_rrule(rule: str) -> RRule:
+    parts: Dict[str, str] = {}
+    for part in rule.split(';'):
+        if not part:
+            continue
+        key, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid rule part: {part}")
+        parts[key.strip().upper()] = value.strip()
+
+    freq = parts.pop('FREQ', '').upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported FREQ: {freq or '(missing)'}. Must be one of {list(FREQUENCIES)}")
+    tz = _load_timezone(parts.pop('TZID')) if 'TZID' in parts else None
+    kwargs = {'tz': tz}
+
+    interval = int(parts.pop('INTERVAL', '1'))
+    if interval < 1:
+        raise ValueError("INTERVAL must be a positive integer.")
+    if 'COUNT' in parts:
+        kwargs['count'] = int(parts.pop('COUNT'))
+    if 'UNTIL' in parts:
+        kwargs['until'] = _parse_until(parts.pop('UNTIL'), tz)
+
+    byday = []
+    for item in filter(None, parts.pop('BYDAY', '').upper().split(',')):
+        match = _BYDAY_PATTERN.match(item)
+        if not match:
+            raise ValueError(f"Invalid BYDAY value: {item}")
+        ordinal = int(match.group(1) or 0)
+        if ordinal and freq not in ('MONTHLY', 'YEARLY'):
+            raise ValueError("BYDAY ordinals are only supported with FREQ=MONTHLY or FREQ=YEARLY.")
+        if not -5 <= ordinal <= 5:
+            raise ValueError(f"BYDAY ordinal out of range: {item}")
+        byday.append((ordinal, WEEKDAYS[match.group(2)]))
+
+    for key, name, low, high in (('BYMONTHDAY', 'bymonthday', 1, 31), ('BYMONTH', 'bymonth', 1, 12),
+                                 ('BYSETPOS', 'bysetpos', 1, 366), ('BYHOUR', 'byhour', 0, 23),
+                                 ('BYMINUTE', 'byminute', 0, 59)):
+        if key in parts:
+            kwargs[name] = _parse_int_list(parts.pop(key), key, low, high)
+    for name in ('bymonth', 'byhour', 'byminute'):
+        if any(number < 0 for number in kwargs.get(name, ())):
+            raise ValueError(f"{name.upper()} does not accept negative values.")
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    return RRule(freq, interval=interval, byday=tuple(byday), **kwargs)
+
+def _parse_cron_field(field: str, low: int, high: int, names: Dict[str, int]) -> FrozenSet[int]:
+    values = set()
+    for part in field.upper().split(','):
+        expression, _, step = part.partition('/')
+        step_size = int(step) if step else 1
+        if expression == '*':
+            start, end = low, high
+        else:
+            first, _, last = expression.partition('-')
+            start = names[first] if first in names else int(first)
+            end = (names[last] if last in names else int(last)) if last else (high if step else start)
+        if step_size < 1 or not (low <= start <= high and low <= end <= high):
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step_size))
+    return frozenset(values)
+
+def _parse_cron(expression: str, tz=None) -> CronRule:
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expressions need 5 fields, got {len(fields)}: {expression}")
+    try:
+        weekdays = _parse_cron_field(fields[4], 0, 7, CRON_DAYS)
+        return CronRule(
+            minutes=_parse_cron_field(fields[0], 0, 59, {}),
+            hours=_parse_cron_field(fields[1], 0, 23, {}),
+            monthdays=_parse_cron_field(fields[2], 1, 31, {}),
+            months=_parse_cron_field(fields[3], 1, 12, CRON_MONTHS),
+            weekdays=frozenset(day % 7 for day in weekdays),
+            restrict_monthday=fields[2] != '*',
+            restrict_weekday=fields[4] != '*',
+            tz=tz,
+        )
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid cron expression: {expression}")
+
+@lru_cache(maxsize=4096)
+def parse_rule(rule: str) -> RecurrenceRule:
+    """Parse a legacy interval, an RRULE or a cron expression.
+
+    Examples: 'weekly', 'FREQ=MONTHLY;BYDAY=2TU;BYHOUR=9;TZID=Europe/Berlin',
+    'RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20261231', '0 9 * * 1-5',
+    'CRON_TZ=America/New_York 30 8 1 * *'.
+    """
+    text = rule.strip()
+    if text.lower() in LEGACY_INTERVALS:
+        return _parse_rrule(LEGACY_INTERVALS[text.lower()])
+    if text.upper().startswith('RRULE:'):
+        return _parse_rrule(text[6:])
+    if '=' in text and not text.startswith('CRON_TZ='):
+        return _parse_rrule(text)
+    match = _CRON_TZ_PATTERN.match(text)
+    if match:
+        return _parse_cron(match.group(2), _load_timezone(match.group(1)))
+    return _parse_cron(text)
+
+@lru_cache(maxsize=16384)
+def expand_occurrences(rule: str, dtstart: str, after: str, limit: int,
+                       generated: int = 0, until: Optional[str] = None) -> Tuple[str, ...]:
+    """Return up to `limit` occurrences strictly after `after` (and not after `until`).
+
+    Arguments and results are '%Y-%m-%d %H:%M:%S' UTC strings so results can be memoized.
+    """
+    parsed = parse_rule(rule)
+    start = datetime.strptime(dtstart, DATETIME_FORMAT)
+    current = datetime.strptime(after, DATETIME_FORMAT)
+    end = datetime.strptime(until, DATETIME_FORMAT) if until else None
+    occurrences = []
+    while len(occurrences) < limit:
+        current = parsed.next_after(current, start, generated + len(occurrences))
+        if current is None or (end is not None and current > end):
+            break
+        occurrences.append(current.strftime(DATETIME_FORMAT))
+    return tuple(occurrences)
+
+def next_occurrence(rule: str, dtstart: str, after: str, generated: int = 0) -> Optional[str]:
+    """Return the next occurrence strictly after `after`, or None once the rule is exhausted."""
+    occurrences = expand_occurrences(rule, dtstart, after, 1, generated)
+    return occurrences[0] if occurrences else None
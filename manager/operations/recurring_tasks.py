@@ -1,75 +1,202 @@
 # operations/recurring_tasks.py
 import sqlite3
 import logging
-from utils import log_action, DB_PATH
-from datetime import datetime, timedelta
+from typing import List, Optional
+from manager.utils import log_action, get_db_path
+from manager.replica import replica_write, replicate_many
+from manager.operations.recurrence import DATETIME_FORMAT, expand_occurrences, next_occurrence as next_rule_occurrence, parse_rule
+from datetime import datetime, timedelta, timezone
+
+# Days of upcoming occurrences kept in RecurringOccurrences
+RECURRENCE_WINDOW_DAYS = 30
+# Cap per rule so that minutely cron rules don't flood the window
+MAX_OCCURRENCES_PER_RULE = 200
+
 def schedule_recurring_task(template_task_id: str, interval: str, next_occurrence: str) -> None:
-    """Add a recurring task."""
+    """Add a recurring task.
+
+    `interval` is 'daily'/'weekly'/'monthly', an RRULE or a cron expression (see
+    `operations.recurrence.parse_rule`). `next_occurrence` anchors the rule; the first
+    occurrence is the first time at or after it that matches the rule.
+    """
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        parse_rule(interval)  # Validate before storing
+        dtstart = datetime.strptime(next_occurrence, DATETIME_FORMAT)
+        first_occurrence = next_rule_occurrence(
+            interval, next_occurrence, (dtstart - timedelta(seconds=1)).strftime(DATETIME_FORMAT))
+        if first_occurrence is None:
+            raise ValueError(f"Recurrence rule '{interval}' has no occurrences after {next_occurrence}.")
+
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                INSERT INTO RecurringTasks (template_task_id, interval, next_occurrence)
-                VALUES (?, ?, ?)
-            """, (template_task_id, interval, next_occurrence))
+                INSERT INTO RecurringTasks (template_task_id, interval, next_occurrence, dtstart)
+                VALUES (?, ?, ?, ?)
+            """, (template_task_id, interval, first_occurrence, next_occurrence))
             recurring_task_id = cursor.lastrowid
             connection.commit()
 
+        refresh_occurrences([recurring_task_id])
         log_action('RecurringTasks', str(recurring_task_id), 'recurring_task_added', 'system')
         logging.info(f"Recurring task {recurring_task_id} scheduled successfully.")
     except Exception as e:
         logging.error(f"Failed to schedule recurring task: {e}")
         raise
 
+@replica_write
 def process_recurring_tasks():
-    """Process recurring tasks and create new tasks if their next occurrence is due."""
+    """Process recurring tasks and create new tasks if their next occurrence is due.
+
+    New tasks get a 'create' audit entry in the same transaction, like bulk-created ones.
+    """
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
+            # Holding the write lock keeps the AUTOINCREMENT ids of the new tasks contiguous
+            cursor.execute("BEGIN IMMEDIATE")
 
-            # Fetch all recurring tasks where next_occurrence is due
+            # Fetch all due recurring tasks together with their template task
             cursor.execute("""
-                SELECT recurring_task_id, template_task_id, interval, next_occurrence
-                FROM RecurringTasks
-                WHERE next_occurrence <= datetime('now')
+                SELECT r.recurring_task_id, r.template_task_id, r.interval, r.next_occurrence,
+                       COALESCE(r.dtstart, r.next_occurrence), r.occurrence_count,
+                       t.task_id, t.title, t.description, t.priority, t.owner
+                FROM RecurringTasks r
+                LEFT JOIN Tasks t ON t.task_id = r.template_task_id
+                WHERE r.active = 1 AND r.next_occurrence <= datetime('now')
             """)
             recurring_tasks = cursor.fetchall()
 
+            new_tasks, advanced, exhausted = [], [], []
             for task in recurring_tasks:
-                recurring_task_id, template_task_id, interval, next_occurrence = task
-
-                # Fetch template task details
-                cursor.execute("SELECT * FROM Tasks WHERE task_id = ?", (template_task_id,))
-                template_task = cursor.fetchone()
-                if not template_task:
+                (recurring_task_id, template_task_id, interval, next_occurrence,
+                 dtstart, occurrence_count, found, *template) = task
+                if found is None:
                     logging.warning(f"Template task {template_task_id} not found. Skipping.")
                     continue
 
+                # Calculate the next occurrence from the rule
+                try:
+                    following = next_rule_occurrence(interval, dtstart, next_occurrence, occurrence_count + 1)
+                except ValueError as e:
+                    logging.error(f"Invalid rule for recurring task {recurring_task_id}: {e}")
+                    continue
+
                 # Create a new task based on the template
-                new_task_id = f"{template_task_id}_{next_occurrence.replace(' ', '_')}"
-                cursor.execute("""
-                    INSERT INTO Tasks (task_id, title, description, priority, owner, status, deadline, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, 'Pending', NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                """, (new_task_id, *template_task[1:5]))
-
-                # Calculate and update the next_occurrence
-                next_occurrence_dt = datetime.strptime(next_occurrence, '%Y-%m-%d %H:%M:%S')
-                if interval == 'daily':
-                    next_occurrence_dt += timedelta(days=1)
-                elif interval == 'weekly':
-                    next_occurrence_dt += timedelta(weeks=1)
-                elif interval == 'monthly':
-                    next_occurrence_dt += timedelta(days=30)  # Approximation
-
-                cursor.execute("""
-                    UPDATE RecurringTasks
-                    SET next_occurrence = ?
-                    WHERE recurring_task_id = ?
-                """, (next_occurrence_dt.strftime('%Y-%m-%d %H:%M:%S'), recurring_task_id))
+                new_tasks.append(tuple(template))
+                if following is None:
+                    exhausted.append((occurrence_count + 1, recurring_task_id))
+                else:
+                    advanced.append((following, occurrence_count + 1, recurring_task_id))
+
+            cursor.executemany("""
+                INSERT INTO Tasks (title, description, priority, owner, status, deadline, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'Pending', NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """, new_tasks)
+            task_ids = []
+            if new_tasks:
+                last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                task_ids = list(range(last_id - len(new_tasks) + 1, last_id + 1))
+            cursor.executemany("""
+                INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+                VALUES ('Tasks', ?, 'create', 'system')
+            """, [(str(task_id),) for task_id in task_ids])
+            cursor.executemany("""
+                UPDATE RecurringTasks
+                SET next_occurrence = ?, occurrence_count = ?
+                WHERE recurring_task_id = ?
+            """, advanced)
+            # Exhausted rules are kept, with their history, but never come due again
+            cursor.executemany("""
+                UPDATE RecurringTasks
+                SET active = 0, ended_at = CURRENT_TIMESTAMP, occurrence_count = ?
+                WHERE recurring_task_id = ?
+            """, exhausted)
+            cursor.execute("DELETE FROM RecurringOccurrences WHERE occurrence <= datetime('now')")
 
             connection.commit()
-        logging.info("Processed all due recurring tasks.")
+
+        for _, recurring_task_id in exhausted:
+            log_action('RecurringTasks', str(recurring_task_id), 'recurring_task_completed', 'system')
+        recurring_task_ids = [task[0] for task in recurring_tasks]
+        replicate_many([("Tasks", "task_id", task_ids),
+                        ("RecurringTasks", "recurring_task_id", recurring_task_ids),
+                        ("RecurringOccurrences", "recurring_task_id", recurring_task_ids)])
+        logging.info(f"Processed {len(new_tasks)} due recurring tasks.")
     except Exception as e:
         logging.error(f"Failed to process recurring tasks: {e}")
         raise
 
+def refresh_occurrences(recurring_task_ids: Optional[List[int]] = None,
+                        window_days: int = RECURRENCE_WINDOW_DAYS) -> int:
+    """Precompute upcoming occurrences into RecurringOccurrences.
+
+    Refreshes every rule when `recurring_task_ids` is None. Returns the number of
+    occurrences stored.
+    """
+    try:
+        until = (datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=window_days)).strftime(DATETIME_FORMAT)
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            query = """
+                SELECT recurring_task_id, interval, next_occurrence,
+                       COALESCE(dtstart, next_occurrence), occurrence_count
+                FROM RecurringTasks
+                WHERE active = 1
+            """
+            if recurring_task_ids is None:
+                cursor.execute(query)
+            else:
+                placeholders = ", ".join("?" for _ in recurring_task_ids)
+                cursor.execute(f"{query} AND recurring_task_id IN ({placeholders})", recurring_task_ids)
+            rules = cursor.fetchall()
+
+            rows = []
+            for recurring_task_id, interval, next_occurrence, dtstart, occurrence_count in rules:
+                if next_occurrence > until:
+                    continue
+                rows.append((recurring_task_id, next_occurrence))
+                try:
+                    upcoming = expand_occurrences(interval, dtstart, next_occurrence, MAX_OCCURRENCES_PER_RULE - 1,
+                                                  occurrence_count + 1, until)
+                except ValueError as e:
+                    logging.error(f"Invalid rule for recurring task {recurring_task_id}: {e}")
+                    continue
+                rows.extend((recurring_task_id, occurrence) for occurrence in upcoming)
+
+            if recurring_task_ids is None:
+                cursor.execute("DELETE FROM RecurringOccurrences")
+            else:
+                cursor.executemany("DELETE FROM RecurringOccurrences WHERE recurring_task_id = ?",
+                                   [(recurring_task_id,) for recurring_task_id in recurring_task_ids])
+            cursor.executemany("""
+                INSERT OR IGNORE INTO RecurringOccurrences (recurring_task_id, occurrence)
+                VALUES (?, ?)
+            """, rows)
+            connection.commit()
+        return len(rows)
+    except Exception as e:
+        logging.error(f"Failed to refresh recurring task occurrences: {e}")
+        raise
+
+def list_upcoming_occurrences(days: int = 7, limit: int = 100) -> List[dict]:
+    """List precomputed occurrences due within the next `days` days, soonest first."""
+    try:
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT o.recurring_task_id, o.occurrence, r.interval, r.template_task_id, t.title
+                FROM RecurringOccurrences o
+                JOIN RecurringTasks r ON r.recurring_task_id = o.recurring_task_id
+                LEFT JOIN Tasks t ON t.task_id = r.template_task_id
+                WHERE o.occurrence > datetime('now') AND o.occurrence <= datetime('now', ?)
+                ORDER BY o.occurrence, o.recurring_task_id
+                LIMIT ?
+            """, (f"+{int(days)} days", limit))
+            return [
+                {"recurring_task_id": row[0], "occurrence": row[1], "rule": row[2],
+                 "template_task_id": row[3], "title": row[4]}
+                for row in cursor.fetchall()
+            ]
+    except Exception as e:
+        logging.error(f"Failed to list upcoming occurrences: {e}")
+        raise
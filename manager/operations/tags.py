@@ -1,12 +1,12 @@
 import sqlite3
 import logging
-from utils import DB_PATH, DatabaseError, log_action, db_error_handler
+from manager.utils import get_db_path, DatabaseError, log_action, db_error_handler
 
 @db_error_handler
 def add_tag(name: str) -> int:
     """Add a new tag to the database."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
             
             # Check if tag exists
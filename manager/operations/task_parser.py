@@ -0,0 +1,178 @@
+# operations/task_parser.py
+import calendar
+import re
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DEFAULT_PRIORITY = 'low'
+# Deadlines given as a day without a time of day are due at the end of that day
+END_OF_DAY = time(23, 59, 59)
+
+WEEKDAYS = {name: index for index, name in enumerate(
+    ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])}
+NUMBER_WORDS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+                'six': 6, 'seven': 7, 'ten': 10}
+# "priority 1" is the most urgent
+PRIORITY_LEVELS = {'1': 'high', '2': 'medium', '3': 'low', 'urgent': 'high', 'asap': 'high',
+                   'high': 'high', 'medium': 'medium', 'normal': 'medium', 'low': 'low'}
+
+_TIME = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2}|noon"
+_DATE_PATTERN = re.compile(rf"""
+    \b(?:
+        (?P<iso>\d{{4}}-\d{{2}}-\d{{2}})(?:[ T](?P<iso_time>\d{{1,2}}:\d{{2}}(?::\d{{2}})?))?
+      | in\s+(?P<amount>\d+|{'|'.join(NUMBER_WORDS)})\s+(?P<unit>minute|hour|day|week|month)s?
+      | (?:(?:at\s+)?(?P<lead_time>{_TIME}),?\s+)?(?:
+            (?P<day>today|tomorrow|eod)
+          | (?:(?P<which>next|this|on)\s+)?(?P<weekday>{'|'.join(WEEKDAYS)})
+        )
+      | (?:at\s+)?(?P<time_only>{_TIME})
+    )\b
+    (?:,?\s*(?:at\s+)?(?P<time>{_TIME})\b)?
+""", re.IGNORECASE | re.VERBOSE)
+_TIME_PATTERN = re.compile(r"^(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?(?::(?P<second>\d{2}))?\s*(?P<meridiem>am|pm)?$")
+_HAS_DEADLINE_WORD = re.compile(r"\bdeadline\b", re.IGNORECASE)
+_PRIORITY_PATTERN = re.compile(
+    r"(?:\bpriority\s*:?\s*(?P<level>high|medium|normal|low|[1-3])\b"
+    r"|\b(?P<before>high|medium|normal|low)\s+priority\b"
+    r"|(?:^|\s)!(?P<bang>high|medium|low|urgent)\b"
+    r"|\b(?P<urgent>urgent|asap)\b)", re.IGNORECASE)
+# An owner needs an explicit marker: "assign to", "owner:" or "@"
+_OWNER_PATTERN = re.compile(
+    r"(?:\bassign(?:ed)?\s+(?:it\s+)?to\s+@?|\bowner\s*:\s*@?|(?<![\w@])@)(?P<owner>\w+)", re.IGNORECASE)
+_TITLE_PATTERN = re.compile(
+    r"\b(?:task|reminder)\s+to\s+(?P<title>.+?)"
+    r"(?=,|;|\.\s|\.$|\s+with\b|\s+due\b|\s+by\b|\s+deadline\b|\s+priority\b|\s+assign|\s+in\s+\d|\s+@|$)",
+    re.IGNORECASE)
+_LEADING_VERB_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:(?:create|add|make|new)\s+(?:a\s+)?(?:task|reminder)\s*:?\s*|remind\s+(?:me\s+)?to\s+)",
+    re.IGNORECASE)
+_FILLER_PATTERN = re.compile(r"\b(?:deadline|due(?:\s+(?:on|by|at|in))?|by|with|and)\s*:?\s*$", re.IGNORECASE)
+_SEPARATORS_PATTERN = re.compile(r"\s*[,;]\s*(?:[,;]\s*)*")
+
+def _cut_spans(text: str, spans: list, start: int = 0, end: Optional[int] = None) -> str:
+    """Return text[start:end] without the recognized phrases in `spans` and the filler words before them."""
+    end = len(text) if end is None else end
+    remainder, position = [], start
+    for span_start, span_end in sorted(spans):
+        if position <= span_start < end:
+            remainder.append(_FILLER_PATTERN.sub('', text[position:span_start]))
+            position = min(span_end, end)
+    remainder.append(text[position:end])
+    return ' '.join(part.strip() for part in remainder if part.strip())
+
+def _parse_time(text: str) -> time:
+    text = text.strip().lower()
+    if text == 'noon':
+        return time(12, 0)
+    match = _TIME_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid time of day: {text}")
+    hour, minute, second = int(match['hour']), int(match['minute'] or 0), int(match['second'] or 0)
+    if match['meridiem']:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid time of day: {text}")
+        hour = hour % 12 + (12 if match['meridiem'] == 'pm' else 0)
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"Invalid time of day: {text}")
+    return time(hour, minute, second)
+
+def _add_months(value: datetime, months: int) -> datetime:
+    year, month = divmod(value.year * 12 + value.month - 1 + months, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return value.replace(year=year, month=month + 1, day=day)
+
+@lru_cache(maxsize=1024)
+def resolve_date(phrase: str, reference: datetime) -> datetime:
+    """Resolve a date phrase matched by the date pattern against `reference`.
+
+    "next <weekday>" is the first such day after today and "this"/"on <weekday>" may be
+    today. Days without a time of day resolve to the end of the day. Callers pass a
+    reference truncated to the minute so that bursts of messages share cached results.
+    """
+    match = _DATE_PATTERN.fullmatch(phrase)
+    if not match:
+        raise ValueError(f"Unrecognized date: {phrase}")
+    # "5pm tomorrow" and "tomorrow at 5pm" mean the same
+    time_of_day = match['time'] or match['lead_time']
+    at = _parse_time(time_of_day) if time_of_day else None
+
+    if match['iso']:
+        day = datetime.strptime(match['iso'], '%Y-%m-%d')
+        if match['iso_time']:
+            at = _parse_time(match['iso_time'])
+        return datetime.combine(day.date(), at or END_OF_DAY)
+    if match['amount']:
+        amount = NUMBER_WORDS.get(match['amount'].lower()) or int(match['amount'])
+        unit = match['unit'].lower()
+        if unit in ('minute', 'hour'):
+            return reference + timedelta(**{unit + 's': amount})
+        target = _add_months(reference, amount) if unit == 'month' else \
+            reference + timedelta(days=amount * (7 if unit == 'week' else 1))
+        return datetime.combine(target.date(), at or END_OF_DAY)
+    if match['day']:
+        offset = 1 if match['day'].lower() == 'tomorrow' else 0
+        return datetime.combine(reference.date() + timedelta(days=offset), at or END_OF_DAY)
+    if match['weekday']:
+        weekday = WEEKDAYS[match['weekday'].lower()]
+        offset = (weekday - reference.weekday()) % 7
+        if offset == 0 and (match['which'] or '').lower() == 'next':
+            offset = 7
+        return datetime.combine(reference.date() + timedelta(days=offset), at or END_OF_DAY)
+
+    # A bare time of day is today, or tomorrow once it has passed
+    at = _parse_time(match['time_only'])
+    candidate = datetime.combine(reference.date(), at)
+    return candidate if candidate > reference else candidate + timedelta(days=1)
+
+def parse_task_message(message: str, now: Optional[datetime] = None,
+                       default_owner: Optional[str] = None) -> dict:
+    """Extract title, priority, owner and deadline from a free-text message.
+
+    Recognizes phrases such as "task to review the report, priority high, assign it to
+    user2, deadline next Friday 5pm" or "call the vendor @user3 in 3 days !urgent".
+    Raises ValueError when the message names a deadline that cannot be understood.
+    """
+    text = message.strip()
+    reference = (now or datetime.now()).replace(second=0, microsecond=0)
+    spans = []
+
+    deadline = None
+    date_match = _DATE_PATTERN.search(text)
+    if date_match:
+        deadline = resolve_date(date_match.group(0).lower(), reference)
+        spans.append(date_match.span())
+    elif _HAS_DEADLINE_WORD.search(text):
+        raise ValueError("Invalid deadline. Use e.g. 'tomorrow 5pm', 'next Friday', 'in 3 days' "
+                         "or 'YYYY-MM-DD HH:MM:SS'.")
+
+    priority = DEFAULT_PRIORITY
+    priority_match = _PRIORITY_PATTERN.search(text)
+    if priority_match:
+        level = next(group for group in priority_match.groups() if group)
+        priority = PRIORITY_LEVELS[level.lower()]
+        spans.append(priority_match.span())
+
+    owner = default_owner
+    owner_match = _OWNER_PATTERN.search(text)
+    if owner_match:
+        owner = owner_match['owner']
+        spans.append(owner_match.span())
+
+    title_match = _TITLE_PATTERN.search(text)
+    if title_match:
+        title = _cut_spans(text, spans, *title_match.span('title'))
+    else:
+        # Whatever is left once the recognized phrases are cut out
+        title = _LEADING_VERB_PATTERN.sub('', _cut_spans(text, spans))
+        title = _SEPARATORS_PATTERN.sub(', ', title)
+    title = title.strip(' ,;:.!-') or "Untitled Task"
+
+    return {
+        "title": title,
+        "description": text,
+        "priority": priority,
+        "owner": owner,
+        "deadline": deadline.strftime(DATETIME_FORMAT) if deadline else None,
+    }
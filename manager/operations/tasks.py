@@ -1,12 +1,12 @@
 import sqlite3
 import logging
-from utils import DB_PATH, DatabaseError, TaskStatus, log_action
-from operations.notifications import send_notification
+from manager.utils import get_db_path, DatabaseError, TaskStatus, log_action
+from manager.operations.notifications import send_notification
 
 def accept_task(task_id: str, user_id: str, comments: str = None) -> None:
     """Accept a task."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
 
             cursor.execute("SELECT status FROM Tasks WHERE task_id = ?", (task_id,))
@@ -42,7 +42,7 @@ def accept_task(task_id: str, user_id: str, comments: str = None) -> None:
 def verify_task_with_prompt(task_id: str, user_id: str) -> None:
     """Verify a task with feedback prompt."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
 
             cursor.execute("SELECT status FROM Tasks WHERE task_id = ?", (task_id,))
@@ -1,36 +1,240 @@
+import csv
+import json
 import sqlite3
 import logging
-from utils import DB_PATH, DatabaseError, UserRole, log_action
-from utils import db_error_handler
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from manager.utils import SYSTEM_USER_ID, get_db_path, DatabaseError, UserRole, log_action
+from manager.utils import db_error_handler
+
+# Users inserted per transaction during bulk provisioning
+PROVISION_BATCH_SIZE = 1000
+# Seconds a lookup of an unknown user is remembered before the table is checked again
+NEGATIVE_CACHE_SECONDS = 5.0
+# Unknown user ids remembered at most; the oldest are dropped beyond this
+NEGATIVE_CACHE_SIZE = 10000
+
+class UserDirectory:
+    """In-memory map of user_id to (name, role), loaded once and kept current by the writers in this module.
+
+    A lookup that misses the cache checks the table, so users added by other processes
+    are picked up without a full reload. Ids that are not in the table either are
+    remembered for NEGATIVE_CACHE_SECONDS, so repeated lookups of a bad id do not each
+    query the database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, negative_ttl: float = NEGATIVE_CACHE_SECONDS):
+        # None follows get_db_path()
+        self.db_path = db_path
+        self.negative_ttl = negative_ttl
+        self._users: Optional[Dict[str, Tuple[str, str]]] = None
+        # user_id -> time.monotonic() after which the id is looked up again; insertion ordered
+        self._unknown: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Forget every cached user; the next lookup reloads the table."""
+        with self._lock:
+            self._users = None
+            self._unknown.clear()
+
+    def refresh(self) -> int:
+        """Reload every user from the database. Returns the number of users loaded."""
+        with sqlite3.connect(self.db_path or get_db_path()) as connection:
+            rows = connection.execute("SELECT user_id, name, role FROM Users").fetchall()
+        with self._lock:
+            self._users = {user_id: (name, role) for user_id, name, role in rows}
+            self._unknown.clear()
+        logging.info(f"User directory loaded {len(rows)} users.")
+        return len(rows)
+
+    def add(self, users: Iterable[Tuple[str, str, str]]) -> None:
+        """Record (user_id, name, role) rows that were just committed."""
+        with self._lock:
+            if self._users is not None:
+                for user_id, name, role in users:
+                    self._users[user_id] = (name, role)
+                    self._unknown.pop(user_id, None)
+                return
+        self.refresh()
+
+    def get(self, user_id: str) -> Optional[Tuple[str, str]]:
+        """Return (name, role) for a user, or None if the user does not exist."""
+        users = self._users
+        if users is None:
+            self.refresh()
+            users = self._users or {}
+        user = users.get(user_id)
+        if user is None:
+            now = time.monotonic()
+            if self._unknown.get(user_id, 0.0) > now:
+                return None
+            with sqlite3.connect(self.db_path or get_db_path()) as connection:
+                row = connection.execute("SELECT user_id, name, role FROM Users WHERE user_id = ?",
+                                         (user_id,)).fetchone()
+            if row:
+                self.add([row])
+                user = row[1:]
+            else:
+                with self._lock:
+                    self._unknown.pop(user_id, None)
+                    self._unknown[user_id] = now + self.negative_ttl
+                    if len(self._unknown) > NEGATIVE_CACHE_SIZE:
+                        del self._unknown[next(iter(self._unknown))]
+        return user
+
+    def exists(self, user_id: str) -> bool:
+        return self.get(user_id) is not None
+
+    def role_of(self, user_id: str) -> Optional[str]:
+        user = self.get(user_id)
+        return user[1] if user else None
+
+    def missing(self, user_ids: Iterable[str]) -> List[str]:
+        """Return the ids among `user_ids` that do not exist, in first-seen order."""
+        return [user_id for user_id in dict.fromkeys(user_ids) if not self.exists(user_id)]
+
+class ScopedUserDirectory:
+    """One UserDirectory per database path, picked by `get_db_path()` in the calling context.
+
+    Threads inside `use_database` (such as workload replay workers) see the users of
+    their own database rather than those cached for another one.
+    """
+
+    def __init__(self):
+        self._directories: Dict[str, UserDirectory] = {}
+        self._lock = threading.Lock()
+
+    def current(self) -> UserDirectory:
+        path = get_db_path()
+        directory = self._directories.get(path)
+        if directory is None:
+            with self._lock:
+                directory = self._directories.setdefault(path, UserDirectory(path))
+        return directory
+
+    def invalidate(self) -> None:
+        self.current().invalidate()
+
+    def refresh(self) -> int:
+        return self.current().refresh()
+
+    def add(self, users: Iterable[Tuple[str, str, str]]) -> None:
+        self.current().add(users)
+
+    def get(self, user_id: str) -> Optional[Tuple[str, str]]:
+        return self.current().get(user_id)
+
+    def exists(self, user_id: str) -> bool:
+        return self.current().exists(user_id)
+
+    def role_of(self, user_id: str) -> Optional[str]:
+        return self.current().role_of(user_id)
+
+    def missing(self, user_ids: Iterable[str]) -> List[str]:
+        return self.current().missing(user_ids)
+
+user_directory = ScopedUserDirectory()
+
+def _validate_role(role: str) -> UserRole:
+    try:
+        return UserRole(role)
+    except ValueError:
+        raise ValueError(f"Invalid role: {role}. Must be one of {[r.value for r in UserRole]}")
 
 @db_error_handler
 def add_user(user_id: str, name: str, role: str) -> None:
     """Add a new user to the database."""
     try:
         # Validate role
-        try:
-            role_enum = UserRole(role)
-        except ValueError:
-            raise ValueError(f"Invalid role: {role}. Must be one of {[r.value for r in UserRole]}")
+        role_enum = _validate_role(role)
 
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
-            
-            # Check if user exists
-            cursor.execute("SELECT user_id FROM Users WHERE user_id = ?", (user_id,))
-            if cursor.fetchone():
+            try:
+                cursor.execute("""
+                    INSERT INTO Users (user_id, name, role)
+                    VALUES (?, ?, ?)
+                """, (user_id, name, role_enum.value))
+            except sqlite3.IntegrityError:
                 raise DatabaseError(f"User {user_id} already exists.")
 
-            cursor.execute("""
-                INSERT INTO Users (user_id, name, role)
-                VALUES (?, ?, ?)
-            """, (user_id, name, role_enum.value))
-            
             connection.commit()
-            
+
+        user_directory.add([(user_id, name, role_enum.value)])
         log_action('Users', user_id, 'creation', 'system')
         logging.info(f"User '{name}' added successfully.")
-            
+
     except Exception as e:
         logging.error(f"Failed to add user: {str(e)}")
         raise
+
+def read_user_file(path: str) -> Iterable[dict]:
+    """Yield user records from a CSV file with a header row or from a JSON-lines file."""
+    with open(path, encoding="utf-8", newline="") as handle:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+
+def provision_users(records: Iterable[dict], performed_by: str = SYSTEM_USER_ID,
+                    batch_size: int = PROVISION_BATCH_SIZE) -> dict:
+    """Create users from records with user_id, name and role keys, in batches.
+
+    Each batch is inserted with one audit entry per user in a single transaction.
+    Existing users are skipped; records with a missing field or an unknown role are
+    rejected. Returns counts of created and skipped users and the rejected records.
+    """
+    created, skipped, rejected = 0, 0, []
+
+    def flush(batch):
+        with sqlite3.connect(get_db_path()) as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS provision_batch
+                (user_id TEXT PRIMARY KEY, name TEXT NOT NULL, role TEXT NOT NULL)
+            """)
+            cursor.execute("DELETE FROM provision_batch")
+            # The first record wins when a file repeats a user_id
+            cursor.executemany("INSERT OR IGNORE INTO provision_batch (user_id, name, role) VALUES (?, ?, ?)", batch)
+            cursor.execute("DELETE FROM provision_batch WHERE user_id IN (SELECT user_id FROM Users)")
+            cursor.execute("INSERT INTO Users (user_id, name, role) SELECT user_id, name, role FROM provision_batch")
+            cursor.execute("""
+                INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+                SELECT 'Users', user_id, 'creation', ? FROM provision_batch
+            """, (performed_by,))
+            new_users = cursor.execute("SELECT user_id, name, role FROM provision_batch").fetchall()
+            cursor.execute("DELETE FROM provision_batch")
+            connection.commit()
+        user_directory.add(new_users)
+        return len(new_users)
+
+    try:
+        batch = []
+        for line_number, record in enumerate(records, start=1):
+            user_id = str(record.get("user_id") or "").strip()
+            name = str(record.get("name") or "").strip()
+            try:
+                if not user_id or not name:
+                    raise ValueError("user_id and name are required")
+                role = _validate_role(str(record.get("role") or "").strip()).value
+            except ValueError as e:
+                rejected.append({"record": line_number, "user_id": user_id, "error": str(e)})
+                continue
+            batch.append((user_id, name, role))
+            if len(batch) >= batch_size:
+                added = flush(batch)
+                created, skipped = created + added, skipped + len(batch) - added
+                batch = []
+        if batch:
+            added = flush(batch)
+            created, skipped = created + added, skipped + len(batch) - added
+
+        logging.info(f"Provisioned {created} users ({skipped} already existed, {len(rejected)} rejected).")
+        return {"created": created, "skipped": skipped, "rejected": rejected}
+    except Exception as e:
+        logging.error(f"Failed to provision users: {e}")
+        raise
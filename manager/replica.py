@@ -0,0 +1,239 @@
+"""Optional in-memory read replica of the task database.
+
+When enabled, read paths (`TaskManager` listings and lookups, notification fetches)
+query an in-memory copy loaded with the SQLite backup API instead of the database
+file, so they never wait on the write lock or on disk. Writes made through
+`TaskManager` re-read the affected rows from disk and apply them to the copy right
+after they commit, as do the scheduler jobs, the notification workers and the
+archive job. Writes too broad to apply row by row (integrity repairs) reload the
+copy. Writes made elsewhere (other processes, direct SQL) are picked up by a
+background refresher that reloads the copy when the file has changed.
+
+The copy is one in-memory connection, so reads through it are serialized: one query
+runs at a time, and an apply waits for the current query to finish. The replica only
+serves its own database: code running inside `use_database` with another path reads
+and writes that file directly.
+"""
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Tuple
+
+from manager.utils import get_db_path
+
+REPLICA_ENV_VAR = "GARY_READ_REPLICA"
+# Seconds between checks for writes that did not go through the TaskManager write path
+REFRESH_INTERVAL_SECONDS = 5.0
+# The copy is reloaded at least this often, which bounds staleness from outside writes
+# that land between a TaskManager write and its apply
+MAX_SYNC_AGE_SECONDS = 60.0
+
+_replica = None
+# data_version seen by the current thread before its replicated write began
+_write_state = threading.local()
+
+class ReadReplica:
+    """In-memory copy of the database, kept fresh by row-level apply and periodic reloads."""
+
+    def __init__(self, source_path: Optional[str] = None, refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+                 max_sync_age: float = MAX_SYNC_AGE_SECONDS):
+        self.source_path = source_path or get_db_path()
+        self.refresh_interval = refresh_interval
+        self.max_sync_age = max_sync_age
+        self._lock = threading.RLock()
+        self._watch_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Long-lived connection whose PRAGMA data_version changes whenever another connection commits
+        self._watch = sqlite3.connect(self.source_path, check_same_thread=False)
+        self._synced_version = None
+        self.last_full_sync = 0.0
+        self.last_apply = 0.0
+        self.writes_applied = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.resync()
+
+    def _data_version(self) -> int:
+        with self._watch_lock:
+            return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def resync(self) -> None:
+        """Reload the whole copy. The backup runs into a new connection, so readers are not blocked."""
+        fresh = sqlite3.connect(":memory:", check_same_thread=False)
+        version = self._data_version()
+        with sqlite3.connect(self.source_path) as source:
+            source.backup(fresh)
+        with self._lock:
+            previous, self._connection = self._connection, fresh
+            self._synced_version = version
+            self.last_full_sync = time.time()
+            self.writes_applied = 0
+        if previous is not None:
+            previous.close()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """The in-memory connection, held exclusively for the duration of the block."""
+        with self._lock:
+            yield self._connection
+
+    def apply(self, table: str, key_column: str, keys: Iterable) -> None:
+        """Replace the replica's rows of `table` whose `key_column` is in `keys` with the committed ones."""
+        self.apply_many([(table, key_column, keys)])
+
+    def apply_many(self, changes: Iterable[Tuple[str, str, Iterable]]) -> None:
+        """Apply several (table, key_column, keys) changes from one write in a single replica transaction.
+
+        The copy is only marked current if nothing else committed between the last sync and
+        the start of this write (see `replica_write`); otherwise the refresher reloads it.
+        """
+        changes = [(table, key_column, list(keys)) for table, key_column, keys in changes]
+        changes = [change for change in changes if change[2]]
+        if not changes:
+            return
+        fetched = []
+        with sqlite3.connect(self.source_path) as source:
+            for table, key_column, keys in changes:
+                placeholders = ", ".join("?" for _ in keys)
+                cursor = source.execute(f"SELECT * FROM {table} WHERE {key_column} IN ({placeholders})", keys)
+                columns = [description[0] for description in cursor.description]
+                fetched.append((table, key_column, keys, placeholders, columns, cursor.fetchall()))
+        version = self._data_version()
+        with self._lock:
+            for table, key_column, keys, placeholders, columns, rows in fetched:
+                self._connection.execute(f"DELETE FROM {table} WHERE {key_column} IN ({placeholders})", keys)
+                if rows:
+                    self._connection.executemany(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' for _ in columns)})",
+                        rows)
+            self._connection.commit()
+            baseline = getattr(_write_state, "baseline", None)
+            if baseline is not None and baseline == self._synced_version:
+                # Only this write moved data_version since the copy was last current
+                self._synced_version = version
+                _write_state.baseline = version
+            self.last_apply = time.time()
+            self.writes_applied += 1
+
+    def has_unapplied_writes(self) -> bool:
+        return self._data_version() != self._synced_version
+
+    def status(self) -> dict:
+        """Staleness report: `stale` means the file changed since the copy was last brought up to date."""
+        now = time.time()
+        return {
+            "stale": self.has_unapplied_writes(),
+            "seconds_since_full_sync": round(now - self.last_full_sync, 3),
+            "seconds_since_last_apply": round(now - self.last_apply, 3) if self.last_apply else None,
+            "writes_applied_since_sync": self.writes_applied,
+        }
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="read-replica-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                if self.has_unapplied_writes() or time.time() - self.last_full_sync > self.max_sync_age:
+                    self.resync()
+            except Exception as e:
+                logging.error(f"Read replica refresh failed: {e}")
+
+def enable_read_replica(refresh_interval: float = REFRESH_INTERVAL_SECONDS) -> ReadReplica:
+    """Load the replica and route reads to it."""
+    global _replica
+    disable_read_replica()
+    _replica = ReadReplica(refresh_interval=refresh_interval)
+    _replica.start()
+    logging.info("In-memory read replica enabled.")
+    return _replica
+
+def disable_read_replica() -> None:
+    global _replica
+    if _replica is not None:
+        _replica.stop()
+        _replica = None
+
+def get_read_replica() -> Optional[ReadReplica]:
+    return _replica
+
+def _active_replica() -> Optional[ReadReplica]:
+    """The replica, if one is enabled for the database the current context uses."""
+    replica = _replica
+    if replica is not None and replica.source_path == get_db_path():
+        return replica
+    return None
+
+def replica_from_env() -> None:
+    """Enable the replica when GARY_READ_REPLICA is set to a true value."""
+    if os.environ.get(REPLICA_ENV_VAR, "").lower() in ("1", "true", "yes") and _replica is None:
+        enable_read_replica()
+
+@contextmanager
+def read_connection() -> Iterator[sqlite3.Connection]:
+    """Connection for read-only queries: the replica when enabled, else the database file."""
+    replica = _active_replica()
+    if replica is not None:
+        with replica.reader() as connection:
+            yield connection
+    else:
+        with sqlite3.connect(get_db_path()) as connection:
+            yield connection
+
+def replica_write(func):
+    """Decorator for write paths that end with `replicate`.
+
+    Records data_version before the write starts, so that `apply` can tell the write's
+    own commits from ones made by other connections. Nested writes keep the outer baseline.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        replica = _active_replica()
+        if replica is None or getattr(_write_state, "baseline", None) is not None:
+            return func(*args, **kwargs)
+        _write_state.baseline = replica._data_version()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _write_state.baseline = None
+    return wrapper
+
+def replicate(table: str, key_column: str, keys: Iterable) -> None:
+    """Apply committed rows to the replica, if one is enabled."""
+    replicate_many([(table, key_column, keys)])
+
+def resync_replica() -> None:
+    """Reload the replica, if one is enabled, after a write that is not applied row by row."""
+    replica = _active_replica()
+    if replica is not None:
+        try:
+            replica.resync()
+        except Exception as e:
+            # The periodic refresher will reload the copy
+            logging.error(f"Failed to reload read replica: {e}")
+
+def replicate_many(changes: Iterable[Tuple[str, str, Iterable]]) -> None:
+    """Apply the (table, key_column, keys) changes of one write to the replica together, if one is enabled."""
+    replica = _active_replica()
+    if replica is not None:
+        changes = list(changes)
+        try:
+            replica.apply_many(changes)
+        except Exception as e:
+            # The periodic refresher will reload the copy
+            logging.error(f"Failed to apply {', '.join(dict.fromkeys(change[0] for change in changes))} "
+                          f"write to read replica: {e}")
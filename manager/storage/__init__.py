@@ -0,0 +1,5 @@
+from manager.storage.base import StorageEngine
+from manager.storage.memory_engine import MemoryEngine
+from manager.storage.sqlite_engine import SQLiteEngine
+
+__all__ = ["StorageEngine", "MemoryEngine", "SQLiteEngine"]
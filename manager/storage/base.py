@@ -0,0 +1,165 @@
+# storage/base.py
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from manager.utils import UserRole
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+DEFAULT_PAGE_SIZE = 50
+# Task columns that update_task may change
+UPDATABLE_TASK_FIELDS = ("title", "description", "priority", "owner", "status", "deadline")
+
+def utc_now() -> str:
+    """Current time in the naive UTC format SQLite's CURRENT_TIMESTAMP uses."""
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+class FakeClock:
+    """Clock for tests and benchmarks: starts at a fixed time and advances one second per reading."""
+
+    def __init__(self, start: str = "2025-01-01 09:00:00"):
+        self.current = datetime.strptime(start, TIMESTAMP_FORMAT)
+
+    def __call__(self) -> str:
+        self.current += timedelta(seconds=1)
+        return self.current.strftime(TIMESTAMP_FORMAT)
+
+def validate_role(role: str) -> str:
+    try:
+        return UserRole(role).value
+    except ValueError:
+        raise ValueError(f"Invalid role: {role}. Must be one of {[r.value for r in UserRole]}")
+
+class StorageEngine(ABC):
+    """Storage for tasks, tags, users, notifications, recurring rules and the audit log.
+
+    Records are returned as plain dicts and task ids are always ints. Timestamps are
+    strings in TIMESTAMP_FORMAT taken from `clock`, so runs can be made deterministic.
+    Lists are ordered by id unless a method says otherwise. Operations on a missing
+    row return False or None; duplicates and invalid references raise ValueError.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], str]] = None):
+        self.clock = clock or utc_now
+
+    def close(self) -> None:
+        """Release resources held by the engine."""
+
+    # Tasks
+
+    @abstractmethod
+    def create_task(self, title: str, description: Optional[str], priority: str, owner: str,
+                    deadline: Optional[str] = None, status: str = "Pending") -> int:
+        """Insert a task and return its id. Ids increase and are never reused."""
+
+    @abstractmethod
+    def get_task(self, task_id: int) -> Optional[dict]:
+        """Return task_id, title, description, priority, owner, status, deadline, created_at and updated_at."""
+
+    @abstractmethod
+    def update_task(self, task_id: int, **fields) -> bool:
+        """Change any of UPDATABLE_TASK_FIELDS and stamp updated_at."""
+
+    @abstractmethod
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task with its tags, responses, notifications and recurring rules."""
+
+    @abstractmethod
+    def list_tasks(self, status: Optional[str] = None, owner: Optional[str] = None,
+                   tag: Optional[str] = None) -> List[dict]:
+        """Tasks matching every given filter."""
+
+    @abstractmethod
+    def list_overdue_tasks(self, now: str) -> List[dict]:
+        """Open tasks with a deadline before `now`, ordered by deadline then id."""
+
+    @abstractmethod
+    def add_response(self, task_id: int, user_id: str, action: str, comments: Optional[str] = None) -> int:
+        """Record a user's response to a task and return the response id."""
+
+    @abstractmethod
+    def list_responses(self, task_id: int) -> List[dict]:
+        """Return response_id, task_id, user_id, action, response_time and comments."""
+
+    # Tags
+
+    @abstractmethod
+    def add_tag(self, name: str) -> int:
+        """Create a tag and return its id."""
+
+    @abstractmethod
+    def get_tag_id(self, name: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def tag_task(self, task_id: int, tag_id: int) -> bool:
+        """Attach a tag; False if the task already has it."""
+
+    @abstractmethod
+    def untag_task(self, task_id: int, tag_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def task_tags(self, task_id: int) -> List[str]:
+        """Names of the task's tags, sorted."""
+
+    # Users
+
+    @abstractmethod
+    def add_user(self, user_id: str, name: str, role: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> Optional[dict]:
+        """Return user_id, name, role and created_at."""
+
+    @abstractmethod
+    def list_users(self, role: Optional[str] = None) -> List[dict]:
+        """Users ordered by user_id."""
+
+    # Notifications
+
+    @abstractmethod
+    def add_notification(self, task_id: Optional[int], recipient: str, message: str) -> int:
+        pass
+
+    @abstractmethod
+    def fetch_notifications(self, recipient: str, unread_only: bool = False, before_id: Optional[int] = None,
+                            limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+        """One page of notification_id, task_id, message, timestamp and read_at, newest first."""
+
+    @abstractmethod
+    def mark_notifications_read(self, recipient: str, notification_ids: Optional[List[int]] = None) -> int:
+        """Mark the given (or all) unread notifications read; returns how many changed."""
+
+    # Recurring tasks
+
+    @abstractmethod
+    def add_recurring(self, template_task_id: int, interval: str, next_occurrence: str) -> int:
+        pass
+
+    @abstractmethod
+    def get_recurring(self, recurring_task_id: int) -> Optional[dict]:
+        """Return recurring_task_id, template_task_id, interval and next_occurrence."""
+
+    @abstractmethod
+    def due_recurring(self, now: str) -> List[dict]:
+        """Rules whose next occurrence is at or before `now`, ordered by next_occurrence then id."""
+
+    @abstractmethod
+    def reschedule_recurring(self, recurring_task_id: int, next_occurrence: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete_recurring(self, recurring_task_id: int) -> bool:
+        pass
+
+    # Audit
+
+    @abstractmethod
+    def log_action(self, entity: str, entity_id: str, action: str, performed_by: str) -> int:
+        pass
+
+    @abstractmethod
+    def audit_entries(self, entity: str, entity_id: str) -> List[dict]:
+        """Return log_id, entity, entity_id, action, timestamp and performed_by."""
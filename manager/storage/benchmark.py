@@ -0,0 +1,85 @@
+"""Time a fixed workload against each storage engine.
+
+    python -m manager.storage.benchmark
+    python -m manager.storage.benchmark --engine memory --tasks 20000
+
+The engines' behaviour is pinned down by tests/test_storage_conformance.py.
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from manager.storage.base import FakeClock, StorageEngine
+from manager.storage.memory_engine import MemoryEngine
+from manager.storage.sqlite_engine import SQLiteEngine
+
+EngineFactory = Callable[[Callable[[], str]], StorageEngine]
+
+# Tasks created by the benchmark unless told otherwise
+BENCHMARK_TASKS = 5000
+
+def benchmark(factory: EngineFactory, tasks: int = BENCHMARK_TASKS) -> Dict[str, float]:
+    """Time a fixed workload against a fresh engine; returns seconds per phase."""
+    engine = factory(FakeClock())
+    timings: Dict[str, float] = {}
+    owners = [f"user{n}" for n in range(1, 21)]
+    statuses = ("Pending", "In Progress", "Completed")
+
+    def timed(phase: str, work: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        work()
+        timings[phase] = time.perf_counter() - started
+
+    try:
+        tag_ids = [engine.add_tag(f"tag{n}") for n in range(10)]
+        task_ids: List[int] = []
+        timed("create_task", lambda: task_ids.extend(
+            engine.create_task(f"task {n}", None, "low", owners[n % len(owners)],
+                               f"2025-01-{n % 28 + 1:02d} 12:00:00", statuses[n % len(statuses)])
+            for n in range(tasks)))
+        timed("tag_task", lambda: [engine.tag_task(task_id, tag_ids[task_id % len(tag_ids)])
+                                   for task_id in task_ids])
+        timed("add_notification", lambda: [engine.add_notification(task_id, owners[task_id % len(owners)], "due")
+                                           for task_id in task_ids])
+        timed("get_task", lambda: [engine.get_task(task_id) for task_id in task_ids])
+        timed("list_tasks", lambda: [engine.list_tasks(status="Pending", owner=owner, tag="tag1")
+                                     for owner in owners])
+        timed("list_overdue_tasks", lambda: [engine.list_overdue_tasks(f"2025-01-{day:02d} 00:00:00")
+                                             for day in range(1, 29)])
+        timed("fetch_notifications", lambda: [engine.fetch_notifications(owner, unread_only=True)
+                                              for owner in owners])
+        timed("update_task", lambda: [engine.update_task(task_id, status="Completed") for task_id in task_ids])
+        timed("delete_task", lambda: [engine.delete_task(task_id) for task_id in task_ids[::10]])
+    finally:
+        engine.close()
+    return timings
+
+def memory_factory(clock: Callable[[], str]) -> StorageEngine:
+    return MemoryEngine(clock=clock)
+
+def sqlite_factory(directory: str) -> EngineFactory:
+    """Factory that gives every engine its own database file in `directory`."""
+    created = []
+
+    def factory(clock: Callable[[], str]) -> StorageEngine:
+        created.append(None)
+        return SQLiteEngine(os.path.join(directory, f"engine-{len(created)}.db"), create_schema=True, clock=clock)
+    return factory
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time a fixed workload against the storage engines.")
+    parser.add_argument("--engine", action="append", choices=["memory", "sqlite"],
+                        help="Engine to time (repeatable; default both)")
+    parser.add_argument("--tasks", type=int, default=BENCHMARK_TASKS, help="Tasks in the workload")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        factories = {"memory": memory_factory, "sqlite": sqlite_factory(directory)}
+        for name in args.engine or list(factories):
+            for phase, seconds in benchmark(factories[name], args.tasks).items():
+                print(f"{name:<7} {phase:<20} {seconds * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
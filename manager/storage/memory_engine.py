@@ -0,0 +1,320 @@
+# storage/memory_engine.py
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from manager.utils import CLOSED_STATUSES
+from manager.storage.base import DEFAULT_PAGE_SIZE, UPDATABLE_TASK_FIELDS, StorageEngine, validate_role
+
+# Statuses are stored as typed, so closed ones are matched case-insensitively
+_CLOSED_LOWER = frozenset(status.lower() for status in CLOSED_STATUSES)
+
+class MemoryEngine(StorageEngine):
+    """Storage engine that keeps everything in process memory.
+
+    Rows live in dicts keyed by id. Lookups the SQLite schema serves from indexes use
+    secondary structures here: sets per status, owner and tag, a sorted deadline list
+    for overdue scans, and a heap of recurring rules ordered by next occurrence.
+    Returned rows are copies, so callers cannot change stored state.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], str]] = None):
+        super().__init__(clock)
+        self._lock = threading.RLock()
+        # Last id handed out per table; like AUTOINCREMENT, ids are never reused
+        self._last_id: Dict[str, int] = defaultdict(int)
+
+        self._tasks: Dict[int, dict] = {}
+        self._by_status: Dict[str, Set[int]] = defaultdict(set)
+        self._by_owner: Dict[str, Set[int]] = defaultdict(set)
+        # (deadline, task_id) for every task with a deadline, kept sorted
+        self._deadlines: List[Tuple[str, int]] = []
+        self._responses: Dict[int, dict] = {}
+        self._responses_by_task: Dict[int, List[int]] = defaultdict(list)
+
+        self._tags: Dict[int, str] = {}
+        self._tag_ids: Dict[str, int] = {}
+        self._task_tags: Dict[int, Set[int]] = defaultdict(set)
+        self._tag_tasks: Dict[int, Set[int]] = defaultdict(set)
+
+        self._users: Dict[str, dict] = {}
+
+        self._notifications: Dict[int, dict] = {}
+        # Ascending notification ids per recipient and per task
+        self._inbox: Dict[str, List[int]] = defaultdict(list)
+        self._notifications_by_task: Dict[int, List[int]] = defaultdict(list)
+
+        self._recurring: Dict[int, dict] = {}
+        self._recurring_by_template: Dict[int, Set[int]] = defaultdict(set)
+        # (next_occurrence, recurring_task_id); entries that no longer match the rule are skipped
+        self._schedule: List[Tuple[str, int]] = []
+
+        self._audit: Dict[int, dict] = {}
+        self._audit_by_entity: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+
+    def _next_id(self, table: str) -> int:
+        self._last_id[table] += 1
+        return self._last_id[table]
+
+    # Tasks
+
+    def _index_task(self, task: dict) -> None:
+        self._by_status[task["status"]].add(task["task_id"])
+        self._by_owner[task["owner"]].add(task["task_id"])
+        if task["deadline"] is not None:
+            insort(self._deadlines, (task["deadline"], task["task_id"]))
+
+    def _unindex_task(self, task: dict) -> None:
+        self._by_status[task["status"]].discard(task["task_id"])
+        self._by_owner[task["owner"]].discard(task["task_id"])
+        if task["deadline"] is not None:
+            entry = (task["deadline"], task["task_id"])
+            position = bisect_left(self._deadlines, entry)
+            if position < len(self._deadlines) and self._deadlines[position] == entry:
+                del self._deadlines[position]
+
+    def create_task(self, title, description, priority, owner, deadline=None, status="Pending"):
+        with self._lock:
+            task_id = self._next_id("Tasks")
+            now = self.clock()
+            task = {"task_id": task_id, "title": title, "description": description, "priority": priority,
+                    "owner": owner, "status": status, "deadline": deadline, "created_at": now, "updated_at": now}
+            self._tasks[task_id] = task
+            self._index_task(task)
+            return task_id
+
+    def get_task(self, task_id):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def update_task(self, task_id, **fields):
+        unknown = set(fields) - set(UPDATABLE_TASK_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update task fields: {sorted(unknown)}")
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            self._unindex_task(task)
+            task.update(fields, updated_at=self.clock())
+            self._index_task(task)
+            return True
+
+    def delete_task(self, task_id):
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is not None:
+                self._unindex_task(task)
+            # Dependent rows go even when the task itself is already gone, as in SQLite
+            for tag_id in self._task_tags.pop(task_id, set()):
+                self._tag_tasks[tag_id].discard(task_id)
+            for response_id in self._responses_by_task.pop(task_id, []):
+                del self._responses[response_id]
+            for notification_id in self._notifications_by_task.pop(task_id, []):
+                notification = self._notifications.pop(notification_id)
+                self._inbox[notification["recipient"]].remove(notification_id)
+            for recurring_task_id in list(self._recurring_by_template.get(task_id, ())):
+                self.delete_recurring(recurring_task_id)
+            return task is not None
+
+    def list_tasks(self, status=None, owner=None, tag=None):
+        with self._lock:
+            candidates = []
+            if status is not None:
+                candidates.append(self._by_status.get(status, set()))
+            if owner is not None:
+                candidates.append(self._by_owner.get(owner, set()))
+            if tag is not None:
+                tag_id = self._tag_ids.get(tag)
+                candidates.append(self._tag_tasks.get(tag_id, set()) if tag_id is not None else set())
+            if candidates:
+                candidates.sort(key=len)
+                task_ids = set(candidates[0]).intersection(*candidates[1:])
+            else:
+                task_ids = self._tasks.keys()
+            return [dict(self._tasks[task_id]) for task_id in sorted(task_ids)]
+
+    def list_overdue_tasks(self, now):
+        with self._lock:
+            end = bisect_left(self._deadlines, (now,))
+            return [dict(self._tasks[task_id]) for _, task_id in self._deadlines[:end]
+                    if (self._tasks[task_id]["status"] or "").lower() not in _CLOSED_LOWER]
+
+    def add_response(self, task_id, user_id, action, comments=None):
+        with self._lock:
+            response_id = self._next_id("TaskResponses")
+            self._responses[response_id] = {"response_id": response_id, "task_id": task_id, "user_id": user_id,
+                                            "action": action, "response_time": self.clock(), "comments": comments}
+            self._responses_by_task[task_id].append(response_id)
+            return response_id
+
+    def list_responses(self, task_id):
+        with self._lock:
+            return [dict(self._responses[response_id]) for response_id in self._responses_by_task.get(task_id, [])]
+
+    # Tags
+
+    def add_tag(self, name):
+        with self._lock:
+            if name in self._tag_ids:
+                raise ValueError(f"Tag '{name}' already exists.")
+            tag_id = self._next_id("Tags")
+            self._tags[tag_id] = name
+            self._tag_ids[name] = tag_id
+            return tag_id
+
+    def get_tag_id(self, name):
+        with self._lock:
+            return self._tag_ids.get(name)
+
+    def tag_task(self, task_id, tag_id):
+        with self._lock:
+            if task_id not in self._tasks:
+                raise ValueError(f"Task {task_id} not found.")
+            if tag_id not in self._tags:
+                raise ValueError(f"Tag {tag_id} not found.")
+            if tag_id in self._task_tags[task_id]:
+                return False
+            self._task_tags[task_id].add(tag_id)
+            self._tag_tasks[tag_id].add(task_id)
+            return True
+
+    def untag_task(self, task_id, tag_id):
+        with self._lock:
+            if tag_id not in self._task_tags.get(task_id, ()):
+                return False
+            self._task_tags[task_id].discard(tag_id)
+            self._tag_tasks[tag_id].discard(task_id)
+            return True
+
+    def task_tags(self, task_id):
+        with self._lock:
+            return sorted(self._tags[tag_id] for tag_id in self._task_tags.get(task_id, ()))
+
+    # Users
+
+    def add_user(self, user_id, name, role):
+        role = validate_role(role)
+        with self._lock:
+            if user_id in self._users:
+                raise ValueError(f"User {user_id} already exists.")
+            self._users[user_id] = {"user_id": user_id, "name": name, "role": role, "created_at": self.clock()}
+
+    def get_user(self, user_id):
+        with self._lock:
+            user = self._users.get(user_id)
+            return dict(user) if user else None
+
+    def list_users(self, role=None):
+        with self._lock:
+            return [dict(self._users[user_id]) for user_id in sorted(self._users)
+                    if role is None or self._users[user_id]["role"] == role]
+
+    # Notifications
+
+    def add_notification(self, task_id, recipient, message):
+        with self._lock:
+            notification_id = self._next_id("Notifications")
+            self._notifications[notification_id] = {"notification_id": notification_id, "task_id": task_id,
+                                                    "recipient": recipient, "message": message,
+                                                    "timestamp": self.clock(), "read_at": None}
+            self._inbox[recipient].append(notification_id)
+            if task_id is not None:
+                self._notifications_by_task[task_id].append(notification_id)
+            return notification_id
+
+    def fetch_notifications(self, recipient, unread_only=False, before_id=None, limit=DEFAULT_PAGE_SIZE):
+        with self._lock:
+            inbox = self._inbox.get(recipient, [])
+            end = len(inbox) if before_id is None else bisect_left(inbox, before_id)
+            page = []
+            for position in range(end - 1, -1, -1):
+                if len(page) >= limit:
+                    break
+                notification = self._notifications[inbox[position]]
+                if unread_only and notification["read_at"] is not None:
+                    continue
+                page.append({key: notification[key]
+                             for key in ("notification_id", "task_id", "message", "timestamp", "read_at")})
+            return page
+
+    def mark_notifications_read(self, recipient, notification_ids=None):
+        with self._lock:
+            now = self.clock()
+            candidates = self._inbox.get(recipient, []) if notification_ids is None else set(notification_ids)
+            changed = 0
+            for notification_id in candidates:
+                notification = self._notifications.get(notification_id)
+                if notification and notification["recipient"] == recipient and notification["read_at"] is None:
+                    notification["read_at"] = now
+                    changed += 1
+            return changed
+
+    # Recurring tasks
+
+    def add_recurring(self, template_task_id, interval, next_occurrence):
+        with self._lock:
+            if template_task_id not in self._tasks:
+                raise ValueError(f"Template task {template_task_id} not found.")
+            recurring_task_id = self._next_id("RecurringTasks")
+            self._recurring[recurring_task_id] = {"recurring_task_id": recurring_task_id,
+                                                  "template_task_id": template_task_id, "interval": interval,
+                                                  "next_occurrence": next_occurrence}
+            self._recurring_by_template[template_task_id].add(recurring_task_id)
+            heapq.heappush(self._schedule, (next_occurrence, recurring_task_id))
+            return recurring_task_id
+
+    def get_recurring(self, recurring_task_id):
+        with self._lock:
+            rule = self._recurring.get(recurring_task_id)
+            return dict(rule) if rule else None
+
+    def _is_current(self, entry: Tuple[str, int]) -> bool:
+        rule = self._recurring.get(entry[1])
+        return rule is not None and rule["next_occurrence"] == entry[0]
+
+    def due_recurring(self, now):
+        with self._lock:
+            due = []
+            while self._schedule and self._schedule[0][0] <= now:
+                entry = heapq.heappop(self._schedule)
+                # Rescheduled rules can leave a duplicate behind; keep only one live entry
+                if self._is_current(entry) and (not due or due[-1] != entry):
+                    due.append(entry)
+            for entry in due:
+                heapq.heappush(self._schedule, entry)
+            return [dict(self._recurring[recurring_task_id]) for _, recurring_task_id in due]
+
+    def reschedule_recurring(self, recurring_task_id, next_occurrence):
+        with self._lock:
+            rule = self._recurring.get(recurring_task_id)
+            if rule is None:
+                return False
+            rule["next_occurrence"] = next_occurrence
+            heapq.heappush(self._schedule, (next_occurrence, recurring_task_id))
+            return True
+
+    def delete_recurring(self, recurring_task_id):
+        with self._lock:
+            rule = self._recurring.pop(recurring_task_id, None)
+            if rule is None:
+                return False
+            self._recurring_by_template[rule["template_task_id"]].discard(recurring_task_id)
+            return True
+
+    # Audit
+
+    def log_action(self, entity, entity_id, action, performed_by):
+        with self._lock:
+            log_id = self._next_id("AuditLogs")
+            self._audit[log_id] = {"log_id": log_id, "entity": entity, "entity_id": entity_id, "action": action,
+                                   "timestamp": self.clock(), "performed_by": performed_by}
+            self._audit_by_entity[(entity, entity_id)].append(log_id)
+            return log_id
+
+    def audit_entries(self, entity, entity_id):
+        with self._lock:
+            return [dict(self._audit[log_id]) for log_id in self._audit_by_entity.get((entity, entity_id), [])]
@@ -0,0 +1,279 @@
+# storage/sqlite_engine.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from manager.utils import CLOSED_STATUSES, get_db_path
+from manager.operations.cascade import delete_tasks
+from manager.replica import read_connection
+from manager.storage.base import DEFAULT_PAGE_SIZE, UPDATABLE_TASK_FIELDS, StorageEngine, validate_role
+
+_TASK_COLUMNS = "task_id, title, description, priority, owner, status, deadline, created_at, updated_at"
+# Closed statuses lower-cased, for comparisons against LOWER(status); commands store statuses as typed
+_CLOSED_LOWER = ", ".join(f"'{status.lower()}'" for status in CLOSED_STATUSES)
+
+class SQLiteEngine(StorageEngine):
+    """Storage engine over the application's SQLite schema.
+
+    Without a `db_path` the engine follows `get_db_path()` like the rest of the
+    application: each operation opens its own connection, and reads go through the
+    read replica when it is enabled. With a `db_path` it keeps one connection for its
+    lifetime, so that ":memory:" databases work; pass `create_schema=True` for a
+    database that has not been initialized.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, create_schema: bool = False,
+                 clock: Optional[Callable[[], str]] = None):
+        super().__init__(clock)
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, check_same_thread=False) if db_path else None
+        self._lock = threading.RLock()
+        if create_schema:
+            from manager.db.db_initialize import (create_archive_tables, create_indexes, create_metrics_tables,
+                                                  create_tables, migrate_columns)
+            with self._connect() as connection:
+                cursor = connection.cursor()
+                create_tables(cursor)
+                create_archive_tables(cursor)
+                create_metrics_tables(cursor)
+                migrate_columns(cursor)
+                create_indexes(cursor)
+
+    @property
+    def follows_application_database(self) -> bool:
+        return self._connection is None
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for one write transaction, committed when the block exits cleanly."""
+        if self._connection is None:
+            with sqlite3.connect(get_db_path()) as connection:
+                yield connection
+        else:
+            with self._lock, self._connection:
+                yield self._connection
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        if self._connection is None:
+            with read_connection() as connection:
+                yield connection
+        else:
+            with self._lock:
+                yield self._connection
+
+    def _query(self, sql: str, params=()) -> List[dict]:
+        with self._reader() as connection:
+            cursor = connection.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _write(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._connect() as connection:
+            return connection.execute(sql, params)
+
+    # Tasks
+
+    def create_task(self, title, description, priority, owner, deadline=None, status="Pending"):
+        now = self.clock()
+        return self._write("""
+            INSERT INTO Tasks (title, description, priority, owner, status, deadline, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (title, description, priority, owner, status, deadline, now, now)).lastrowid
+
+    def get_task(self, task_id):
+        rows = self._query(f"SELECT {_TASK_COLUMNS} FROM Tasks WHERE task_id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def update_task(self, task_id, **fields):
+        unknown = set(fields) - set(UPDATABLE_TASK_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update task fields: {sorted(unknown)}")
+        assignments = "".join(f"{name} = ?, " for name in fields)
+        return self._write(f"UPDATE Tasks SET {assignments}updated_at = ? WHERE task_id = ?",
+                           (*fields.values(), self.clock(), task_id)).rowcount > 0
+
+    def delete_task(self, task_id):
+        # The application's cascade, so every table that references tasks is covered
+        if self._connection is None:
+            return delete_tasks([task_id]) > 0
+        with self._lock:
+            return delete_tasks([task_id], connection=self._connection) > 0
+
+    def list_tasks(self, status=None, owner=None, tag=None):
+        query = f"SELECT {_TASK_COLUMNS} FROM Tasks t WHERE 1 = 1"
+        params = []
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        if tag is not None:
+            query += """ AND task_id IN (
+                SELECT CAST(tt.task_id AS INTEGER) FROM TaskTags tt JOIN Tags g ON g.tag_id = tt.tag_id
+                WHERE g.name = ?)"""
+            params.append(tag)
+        return self._query(query + " ORDER BY task_id", params)
+
+    def list_overdue_tasks(self, now):
+        return self._query(f"""
+            SELECT {_TASK_COLUMNS} FROM Tasks
+            WHERE deadline IS NOT NULL AND deadline < ? AND LOWER(status) NOT IN ({_CLOSED_LOWER})
+            ORDER BY deadline, task_id
+        """, (now,))
+
+    def add_response(self, task_id, user_id, action, comments=None):
+        return self._write("""
+            INSERT INTO TaskResponses (task_id, user_id, action, response_time, comments)
+            VALUES (?, ?, ?, ?, ?)
+        """, (str(task_id), user_id, action, self.clock(), comments)).lastrowid
+
+    def list_responses(self, task_id):
+        return self._query("""
+            SELECT response_id, CAST(task_id AS INTEGER) AS task_id, user_id, action, response_time, comments
+            FROM TaskResponses WHERE task_id = ? ORDER BY response_id
+        """, (str(task_id),))
+
+    # Tags
+
+    def add_tag(self, name):
+        try:
+            return self._write("INSERT INTO Tags (name) VALUES (?)", (name,)).lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Tag '{name}' already exists.")
+
+    def get_tag_id(self, name):
+        rows = self._query("SELECT tag_id FROM Tags WHERE name = ?", (name,))
+        return rows[0]["tag_id"] if rows else None
+
+    def tag_task(self, task_id, tag_id):
+        with self._connect() as connection:
+            cursor = connection.cursor()
+            if not cursor.execute("SELECT 1 FROM Tasks WHERE task_id = ?", (task_id,)).fetchone():
+                raise ValueError(f"Task {task_id} not found.")
+            if not cursor.execute("SELECT 1 FROM Tags WHERE tag_id = ?", (tag_id,)).fetchone():
+                raise ValueError(f"Tag {tag_id} not found.")
+            if cursor.execute("SELECT 1 FROM TaskTags WHERE task_id = ? AND tag_id = ?",
+                              (str(task_id), tag_id)).fetchone():
+                return False
+            cursor.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES (?, ?)", (str(task_id), tag_id))
+            return True
+
+    def untag_task(self, task_id, tag_id):
+        return self._write("DELETE FROM TaskTags WHERE task_id = ? AND tag_id = ?",
+                           (str(task_id), tag_id)).rowcount > 0
+
+    def task_tags(self, task_id):
+        rows = self._query("""
+            SELECT g.name FROM TaskTags tt JOIN Tags g ON g.tag_id = tt.tag_id
+            WHERE tt.task_id = ? ORDER BY g.name
+        """, (str(task_id),))
+        return [row["name"] for row in rows]
+
+    # Users
+
+    def add_user(self, user_id, name, role):
+        role = validate_role(role)
+        try:
+            self._write("INSERT INTO Users (user_id, name, role, created_at) VALUES (?, ?, ?, ?)",
+                        (user_id, name, role, self.clock()))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"User {user_id} already exists.")
+
+    def get_user(self, user_id):
+        rows = self._query("SELECT user_id, name, role, created_at FROM Users WHERE user_id = ?", (user_id,))
+        return rows[0] if rows else None
+
+    def list_users(self, role=None):
+        if role is None:
+            return self._query("SELECT user_id, name, role, created_at FROM Users ORDER BY user_id")
+        return self._query("SELECT user_id, name, role, created_at FROM Users WHERE role = ? ORDER BY user_id",
+                           (role,))
+
+    # Notifications
+
+    def add_notification(self, task_id, recipient, message):
+        return self._write("""
+            INSERT INTO Notifications (task_id, recipient, message, timestamp)
+            VALUES (?, ?, ?, ?)
+        """, (None if task_id is None else str(task_id), recipient, message, self.clock())).lastrowid
+
+    def fetch_notifications(self, recipient, unread_only=False, before_id=None, limit=DEFAULT_PAGE_SIZE):
+        query = """
+            SELECT notification_id, CAST(task_id AS INTEGER) AS task_id, message, timestamp, read_at
+            FROM Notifications WHERE recipient = ?
+        """
+        params: list = [recipient]
+        if unread_only:
+            query += " AND read_at IS NULL"
+        if before_id is not None:
+            query += " AND notification_id < ?"
+            params.append(before_id)
+        params.append(limit)
+        return self._query(query + " ORDER BY notification_id DESC LIMIT ?", params)
+
+    def mark_notifications_read(self, recipient, notification_ids=None):
+        query = "UPDATE Notifications SET read_at = ? WHERE recipient = ? AND read_at IS NULL"
+        params: list = [self.clock(), recipient]
+        if notification_ids is not None:
+            query += f" AND notification_id IN ({', '.join('?' for _ in notification_ids)})"
+            params.extend(notification_ids)
+        return self._write(query, params).rowcount
+
+    # Recurring tasks
+
+    def add_recurring(self, template_task_id, interval, next_occurrence):
+        with self._connect() as connection:
+            cursor = connection.cursor()
+            if not cursor.execute("SELECT 1 FROM Tasks WHERE task_id = ?", (template_task_id,)).fetchone():
+                raise ValueError(f"Template task {template_task_id} not found.")
+            cursor.execute("""
+                INSERT INTO RecurringTasks (template_task_id, interval, next_occurrence)
+                VALUES (?, ?, ?)
+            """, (str(template_task_id), interval, next_occurrence))
+            return cursor.lastrowid
+
+    def get_recurring(self, recurring_task_id):
+        rows = self._query("""
+            SELECT recurring_task_id, CAST(template_task_id AS INTEGER) AS template_task_id, interval, next_occurrence
+            FROM RecurringTasks WHERE recurring_task_id = ?
+        """, (recurring_task_id,))
+        return rows[0] if rows else None
+
+    def due_recurring(self, now):
+        return self._query("""
+            SELECT recurring_task_id, CAST(template_task_id AS INTEGER) AS template_task_id, interval, next_occurrence
+            FROM RecurringTasks WHERE active = 1 AND next_occurrence <= ?
+            ORDER BY next_occurrence, recurring_task_id
+        """, (now,))
+
+    def reschedule_recurring(self, recurring_task_id, next_occurrence):
+        return self._write("UPDATE RecurringTasks SET next_occurrence = ? WHERE recurring_task_id = ?",
+                           (next_occurrence, recurring_task_id)).rowcount > 0
+
+    def delete_recurring(self, recurring_task_id):
+        with self._connect() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM RecurringOccurrences WHERE recurring_task_id = ?", (recurring_task_id,))
+            cursor.execute("DELETE FROM RecurringTasks WHERE recurring_task_id = ?", (recurring_task_id,))
+            return cursor.rowcount > 0
+
+    # Audit
+
+    def log_action(self, entity, entity_id, action, performed_by):
+        return self._write("""
+            INSERT INTO AuditLogs (entity, entity_id, action, timestamp, performed_by)
+            VALUES (?, ?, ?, ?, ?)
+        """, (entity, entity_id, action, self.clock(), performed_by)).lastrowid
+
+    def audit_entries(self, entity, entity_id):
+        return self._query("""
+            SELECT log_id, entity, entity_id, action, timestamp, performed_by
+            FROM AuditLogs WHERE entity = ? AND entity_id = ? ORDER BY log_id
+        """, (entity, entity_id))
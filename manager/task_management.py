@@ -1,44 +1,45 @@
 import sqlite3
-from manager.utils import DB_PATH, log_action
-from manager.operations.notifications import send_notification
-import re
-from datetime import datetime, timedelta
+from manager.utils import CLOSED_STATUSES, get_db_path, log_action
+from manager.operations.notifications import send_notification, send_notifications
+from manager.operations.task_parser import parse_task_message
+from manager.operations.users import user_directory
+from manager.operations.cascade import delete_tasks_where
+from manager.replica import read_connection, replica_write, replicate
+from manager.storage import SQLiteEngine, StorageEngine
+from datetime import datetime
 from collections import namedtuple
+from typing import Optional
+
+# SQL fragment listing the closed statuses lower-cased, for comparisons against LOWER(status);
+# commands store statuses as typed
+_CLOSED_LOWER = ", ".join(f"'{status.lower()}'" for status in CLOSED_STATUSES)
+
+# Default number of events per /history page
+HISTORY_PAGE_SIZE = 50
+
+# Sources merged into a task's history: (source, table, time column, id column, task filter).
+# Archived rows keep their ids, so both tiers of a source share one name.
+HISTORY_SOURCES = [
+    ("audit", "AuditLogs", "timestamp", "log_id", "entity = 'Tasks' AND entity_id = ?"),
+    ("notification", "Notifications", "timestamp", "notification_id", "task_id = ?"),
+    ("notification", "ArchivedNotifications", "timestamp", "notification_id", "task_id = ?"),
+    ("response", "TaskResponses", "response_time", "response_id", "task_id = ?"),
+    ("response", "ArchivedTaskResponses", "response_time", "response_id", "task_id = ?"),
+]
 
 def from_command(command: str) -> dict:
     """Extract task details from a natural language command."""
-    # Example parsing logic using regex
-    title_match = re.search(r"task to (.*?)(,| with)", command)
-    deadline_match = re.search(r"deadline (.*?)(\.|$)", command)
-    priority_match = re.search(r"priority (\d+)", command)
-    owner_match = re.search(r"assign it to (\w+)", command)
-
-    # Extracted data
-    title = title_match.group(1).strip() if title_match else "Untitled Task"
-    deadline_str = deadline_match.group(1).strip() if deadline_match else None
-    priority = int(priority_match.group(1)) if priority_match else 1
-    owner = owner_match.group(1).strip() if owner_match else "default_user"
-
-    # Convert deadline to datetime if applicable
-    deadline = None
-    if deadline_str:
-        if "tomorrow" in deadline_str:
-            deadline = datetime.now() + timedelta(days=1)
-        elif "today" in deadline_str:
-            deadline = datetime.now()
-        else:
-            try:
-                deadline = datetime.strptime(deadline_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                raise ValueError("Invalid deadline format. Use 'YYYY-MM-DD HH:MM:SS'.")
-
+    parsed = parse_task_message(command, default_owner="default_user")
     return {
-        "name": title,
-        "priority": priority,
-        "owner": owner,
-        "deadline": deadline.strftime("%Y-%m-%d %H:%M:%S") if deadline else None,
+        "name": parsed["title"],
+        "priority": parsed["priority"],
+        "owner": parsed["owner"],
+        "deadline": parsed["deadline"],
     }
 
+def _format_timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value
+
 # Task Class
 class Task:
     def __init__(self, task_id, name, priority, owner, status="Pending", deadline=None, created_at=None, updated_at=None):
@@ -48,7 +49,7 @@ class Task:
         self.owner = owner
         self.status = status
         self.deadline = deadline
-        self.created_at = created_at or datetime.datetime.now()
+        self.created_at = created_at or datetime.now()
         self.updated_at = updated_at or self.created_at
 
     @classmethod
@@ -60,9 +61,9 @@ class Task:
     def from_command(cls, command: dict):
         """Create a Task object from parsed command details."""
         return cls(
-            task_id = f"task_{int(datetime.now().timestamp())}",
+            task_id=None,  # Assigned by the database on save
             name=command["name"],
-            priority=command.get("priority", 1),
+            priority=command.get("priority", "low"),
             owner=command.get("owner", "user1"),
             deadline=command.get("deadline"),
         )
@@ -70,13 +71,14 @@ class Task:
     def is_overdue(self):
         """Check if the task is overdue."""
         if self.deadline:
-            deadline_dt = datetime.datetime.strptime(self.deadline, '%Y-%m-%d %H:%M:%S')
-            return datetime.datetime.now() > deadline_dt
+            deadline_dt = datetime.strptime(self.deadline, '%Y-%m-%d %H:%M:%S')
+            return datetime.now() > deadline_dt
         return False
 
+    @replica_write
     def save_to_db(self):
         """Save or update the task in the database."""
-        with sqlite3.connect(DB_PATH) as conn:
+        with sqlite3.connect(get_db_path()) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO Tasks (task_id, title, priority, owner, status, deadline, created_at, updated_at)
@@ -88,9 +90,13 @@ class Task:
                     status = excluded.status,
                     deadline = excluded.deadline,
                     updated_at = excluded.updated_at
-            """, (self.task_id, self.name, self.priority, self.owner, self.status, self.deadline, self.created_at, self.updated_at))
+            """, (self.task_id, self.name, self.priority, self.owner, self.status, self.deadline,
+                  _format_timestamp(self.created_at), _format_timestamp(self.updated_at)))
             conn.commit()
-        log_action('Tasks', self.task_id, 'save', self.owner)
+            if self.task_id is None:
+                self.task_id = cursor.lastrowid
+        log_action('Tasks', str(self.task_id), 'save', self.owner)
+        replicate("Tasks", "task_id", [self.task_id])
 
     def to_dict(self):
         """Convert the Task object to a dictionary."""
@@ -108,98 +114,368 @@ class Task:
 
 # TaskManager Class
 class TaskManager:
+    """Task operations behind the commands.
+
+    Creating, reading, updating and deleting single tasks, and listing current and
+    overdue tasks, goes through `storage`. The
+    default SQLiteEngine follows the application database and the read replica. With
+    any other engine, owners are checked against the engine's users. Bulk creation,
+    dependencies, the archive tier, search and history always use the application database.
+    """
+
+    def __init__(self, storage: Optional[StorageEngine] = None):
+        self.storage = storage or SQLiteEngine()
+
+    @property
+    def _on_application_database(self):
+        return isinstance(self.storage, SQLiteEngine) and self.storage.follows_application_database
+
+    def _user_exists(self, user_id):
+        # The user directory caches the application database's users
+        if self._on_application_database:
+            return user_directory.exists(user_id)
+        return self.storage.get_user(user_id) is not None
+
+    def _replicate_tasks(self, task_ids):
+        if self._on_application_database:
+            replicate("Tasks", "task_id", task_ids)
+
+    @replica_write
     def create_task(self, title, description, priority, owner, deadline):
-        with sqlite3.connect(DB_PATH) as connection:
+        if not self._user_exists(owner):
+            raise ValueError(f"User {owner} not found.")
+        task_id = self.storage.create_task(title, description, priority, owner, deadline)
+        self.storage.log_action('Tasks', str(task_id), 'create', 'system')
+        self._replicate_tasks([task_id])
+        return task_id
+
+    @replica_write
+    def create_tasks_bulk(self, tasks):
+        """Insert many (title, description, priority, owner, deadline) rows in one transaction.
+
+        Returns the new task ids in input order.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return []
+        unknown = user_directory.missing(task[3] for task in tasks)
+        if unknown:
+            raise ValueError(f"Unknown owners: {', '.join(unknown)}")
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
-            cursor.execute("""
+            # Holding the write lock keeps the AUTOINCREMENT ids of the batch contiguous
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany("""
                 INSERT INTO Tasks (title, description, priority, owner, deadline)
                 VALUES (?, ?, ?, ?, ?)
-            """, (title, description, priority, owner, deadline))
+            """, tasks)
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            task_ids = list(range(last_id - len(tasks) + 1, last_id + 1))
+            cursor.executemany("""
+                INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
+                VALUES ('Tasks', ?, 'create', 'system')
+            """, [(str(task_id),) for task_id in task_ids])
             connection.commit()
-            return cursor.lastrowid
+        replicate("Tasks", "task_id", task_ids)
+        return task_ids
 
+    @replica_write
     def update_task_status(self, task_id, status):
-        with sqlite3.connect(DB_PATH) as connection:
-            cursor = connection.cursor()
-            cursor.execute("SELECT task_id FROM Tasks WHERE task_id = ?", (task_id,))
-            task = cursor.fetchone()
-            if not task:
-                return f"Task {task_id} not found."
-        
-            cursor.execute("""
-                UPDATE Tasks
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE task_id = ?
-            """, (status, task_id))
-            connection.commit()
-            return f"Task {task_id} updated to status: {status}"
+        task = self.storage.get_task(int(task_id)) if str(task_id).isdigit() else None
+        if not task:
+            return f"Task {task_id} not found."
+        self.storage.update_task(task["task_id"], status=status)
+
+        # Dependents are only unblocked when the task goes from open to closed
+        closed = {closed_status.lower() for closed_status in CLOSED_STATUSES}
+        closing = status.lower() in closed and (task["status"] or "").lower() not in closed
+        unblocked = []
+        if closing and self._on_application_database:
+            with sqlite3.connect(get_db_path()) as connection:
+                unblocked = self._unblocked_by(connection.cursor(), task_id)
+
+        self.storage.log_action('Tasks', str(task_id), status.lower(), 'system')
+        if unblocked:
+            send_notifications((str(task[0]), task[1], f"Task {task[0]} '{task[2]}' is ready: task {task_id} is done.")
+                               for task in unblocked)
+        self._replicate_tasks([task["task_id"]])
+        if unblocked:
+            ready = ", ".join(f"task_{task[0]}" for task in unblocked)
+            return f"Task {task_id} updated to status: {status}. Unblocked: {ready}"
+        return f"Task {task_id} updated to status: {status}"
 
+    @staticmethod
+    def _unblocked_by(cursor, task_id):
+        """Dependents of a just-closed task that have no other open blocker left."""
+        cursor.execute(f"""
+            SELECT t.task_id, t.owner, t.title
+            FROM TaskDependencies d
+            JOIN Tasks t ON t.task_id = d.task_id
+            WHERE d.depends_on = ? AND LOWER(t.status) NOT IN ({_CLOSED_LOWER})
+              AND NOT EXISTS (
+                  SELECT 1 FROM TaskDependencies o
+                  JOIN Tasks b ON b.task_id = o.depends_on
+                  WHERE o.task_id = t.task_id AND LOWER(b.status) NOT IN ({_CLOSED_LOWER})
+              )
+        """, (task_id,))
+        return cursor.fetchall()
+
+    @replica_write
     def delegate_task(self, task_id, new_owner):
-        with sqlite3.connect(DB_PATH) as connection:
+        if not self._user_exists(new_owner):
+            return f"User {new_owner} not found."
+        if not str(task_id).isdigit() or not self.storage.update_task(int(task_id), owner=new_owner,
+                                                                       status='In Progress'):
+            return f"Task {task_id} not found."
+        self._replicate_tasks([int(task_id)])
+        return f"Task {task_id} delegated to {new_owner}."
+
+    def delete_task(self, task_id):
+        """Delete a task, hot or archived, and every row that references it."""
+        if not str(task_id).isdigit() or not self.storage.delete_task(int(task_id)):
+            return f"Task {task_id} not found."
+        return f"Task {task_id} deleted successfully."
+
+    def delete_tasks_where(self, include_archived=False, **filters):
+        """Delete every task matching the filters (status, owner, tag, before) with its dependent rows."""
+        return delete_tasks_where(include_archived=include_archived, **filters)
+
+    @replica_write
+    def add_dependency(self, task_id, depends_on):
+        """Record that `task_id` cannot start before `depends_on` is done."""
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
-            cursor.execute("SELECT task_id FROM Tasks WHERE task_id = ?", (task_id,))
-            task = cursor.fetchone()
-            if not task:
-                return f"Task {task_id} not found."
-        
+            # Take the write lock first so the cycle check and the insert see the same graph
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT task_id FROM Tasks WHERE task_id IN (?, ?)", (task_id, depends_on))
+            found = {row[0] for row in cursor.fetchall()}
+            for required in (task_id, depends_on):
+                if int(required) not in found:
+                    connection.rollback()
+                    return f"Task {required} not found."
+            if int(task_id) == int(depends_on):
+                connection.rollback()
+                return f"Task {task_id} cannot depend on itself."
+
+            # A cycle appears if `depends_on` already (transitively) depends on `task_id`
+            cursor.execute("""
+                WITH RECURSIVE upstream(id) AS (
+                    SELECT depends_on FROM TaskDependencies WHERE task_id = ?
+                    UNION
+                    SELECT d.depends_on FROM TaskDependencies d JOIN upstream u ON d.task_id = u.id
+                )
+                SELECT 1 FROM upstream WHERE id = ? LIMIT 1
+            """, (depends_on, task_id))
+            if cursor.fetchone():
+                connection.rollback()
+                return f"Cannot add dependency: task {depends_on} already depends on task {task_id}."
+
             cursor.execute("""
-                UPDATE Tasks
-                SET owner = ?, status = 'In Progress', updated_at = CURRENT_TIMESTAMP
-                WHERE task_id = ?
-            """, (new_owner, task_id))
+                INSERT OR IGNORE INTO TaskDependencies (task_id, depends_on)
+                VALUES (?, ?)
+            """, (task_id, depends_on))
             connection.commit()
-            return f"Task {task_id} delegated to {new_owner}."
+        log_action('Tasks', str(task_id), f'dependency_added:{depends_on}', 'system')
+        replicate("TaskDependencies", "task_id", [task_id])
+        return f"Task {task_id} now depends on task {depends_on}."
 
-    def delete_task(self, task_id):
-        with sqlite3.connect(DB_PATH) as connection:
+    @replica_write
+    def remove_dependency(self, task_id, depends_on):
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
-            cursor.execute("SELECT task_id FROM Tasks WHERE task_id = ?", (task_id,))
-            task = cursor.fetchone()
-            if not task:
-                return f"Task {task_id} not found."
-        
-            cursor.execute("""
-                DELETE FROM Tasks
-                WHERE task_id = ?
-            """, (task_id,))
+            cursor.execute("DELETE FROM TaskDependencies WHERE task_id = ? AND depends_on = ?", (task_id, depends_on))
             connection.commit()
-            return f"Task {task_id} deleted successfully."
+            if cursor.rowcount == 0:
+                return f"Task {task_id} does not depend on task {depends_on}."
+        log_action('Tasks', str(task_id), f'dependency_removed:{depends_on}', 'system')
+        replicate("TaskDependencies", "task_id", [task_id])
+        return f"Task {task_id} no longer depends on task {depends_on}."
+
+    def list_blockers(self, task_id, transitive=False, open_only=True):
+        """Tasks that `task_id` depends on, directly or through other tasks."""
+        return self._walk_dependencies(task_id, "task_id", "depends_on", transitive, open_only)
+
+    def list_blocked(self, task_id, transitive=False, open_only=True):
+        """Tasks that depend on `task_id`, directly or through other tasks."""
+        return self._walk_dependencies(task_id, "depends_on", "task_id", transitive, open_only)
 
-    def list_tasks(self):
-        with sqlite3.connect(DB_PATH) as connection:
+    def _walk_dependencies(self, task_id, from_column, to_column, transitive, open_only):
+        if transitive:
+            query = f"""
+                WITH RECURSIVE related(id) AS (
+                    SELECT {to_column} FROM TaskDependencies WHERE {from_column} = ?
+                    UNION
+                    SELECT d.{to_column} FROM TaskDependencies d JOIN related r ON d.{from_column} = r.id
+                )
+                SELECT t.task_id, t.title, t.owner, t.status, t.deadline
+                FROM related r JOIN Tasks t ON t.task_id = r.id
+                WHERE 1 = 1
+            """
+        else:
+            query = f"""
+                SELECT t.task_id, t.title, t.owner, t.status, t.deadline
+                FROM TaskDependencies d JOIN Tasks t ON t.task_id = d.{to_column}
+                WHERE d.{from_column} = ?
+            """
+        if open_only:
+            query += f" AND LOWER(t.status) NOT IN ({_CLOSED_LOWER})"
+        query += " ORDER BY t.deadline IS NULL, t.deadline, t.task_id"
+        with read_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute("""
-                SELECT task_id, title, priority, owner, status
-                FROM Tasks
+            cursor.execute(query, (task_id,))
+            return [
+                {"task_id": row[0], "title": row[1], "owner": row[2], "status": row[3], "deadline": row[4]}
+                for row in cursor.fetchall()
+            ]
+
+    def list_ready_tasks(self):
+        """Open tasks whose blockers are all done, earliest deadline first."""
+        with read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                SELECT t.task_id, t.title, t.owner, t.status, t.deadline
+                FROM Tasks t
+                WHERE LOWER(t.status) NOT IN ({_CLOSED_LOWER})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM TaskDependencies d
+                      JOIN Tasks b ON b.task_id = d.depends_on
+                      WHERE d.task_id = t.task_id AND LOWER(b.status) NOT IN ({_CLOSED_LOWER})
+                  )
+                ORDER BY t.deadline IS NULL, t.deadline, t.task_id
             """)
+            return [
+                {"task_id": row[0], "title": row[1], "owner": row[2], "status": row[3], "deadline": row[4]}
+                for row in cursor.fetchall()
+            ]
+
+    def critical_path(self, task_id=None):
+        """Longest chain of open tasks that must finish in order.
+
+        With a `task_id`, the chain ends at that task; otherwise it is the longest chain in
+        the whole open graph. Each step carries its `latest_finish`: its own deadline or an
+        earlier one inherited from a task further down the chain. Steps whose deadline is
+        later than that are flagged `at_risk`.
+        """
+        with read_connection() as connection:
+            cursor = connection.cursor()
+            if task_id is None:
+                cursor.execute(f"""
+                    SELECT d.task_id, d.depends_on FROM TaskDependencies d
+                    JOIN Tasks t ON t.task_id = d.task_id
+                    JOIN Tasks b ON b.task_id = d.depends_on
+                    WHERE LOWER(t.status) NOT IN ({_CLOSED_LOWER}) AND LOWER(b.status) NOT IN ({_CLOSED_LOWER})
+                """)
+            else:
+                cursor.execute(f"""
+                    WITH RECURSIVE upstream(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT d.depends_on FROM TaskDependencies d
+                        JOIN upstream u ON d.task_id = u.id
+                        JOIN Tasks b ON b.task_id = d.depends_on
+                        WHERE LOWER(b.status) NOT IN ({_CLOSED_LOWER})
+                    )
+                    SELECT d.task_id, d.depends_on FROM TaskDependencies d
+                    JOIN upstream u ON d.task_id = u.id
+                    JOIN Tasks b ON b.task_id = d.depends_on
+                    WHERE LOWER(b.status) NOT IN ({_CLOSED_LOWER})
+                """, (int(task_id),))
+            edges = cursor.fetchall()
+            nodes = {node for edge in edges for node in edge} | ({int(task_id)} if task_id is not None else set())
+            if not nodes:
+                return []
+            placeholders = ", ".join("?" for _ in nodes)
+            cursor.execute(f"SELECT task_id, title, owner, status, deadline FROM Tasks WHERE task_id IN ({placeholders})",
+                           list(nodes))
+            tasks = {row[0]: row for row in cursor.fetchall()}
+
+        blockers, dependents = {}, {}
+        for dependent, blocker in edges:
+            blockers.setdefault(dependent, []).append(blocker)
+            dependents.setdefault(blocker, []).append(dependent)
+
+        # Longest chain ending at each node, visiting blockers before their dependents;
+        # ties go to the blocker with the latest deadline
+        length, previous = {}, {}
+        waiting = {node: len(blockers.get(node, [])) for node in nodes}
+        queue = [node for node, count in waiting.items() if count == 0]
+        while queue:
+            node = queue.pop()
+            best = max(blockers.get(node, []), key=lambda b: (length[b], tasks[b][4] or ""), default=None)
+            length[node] = length[best] + 1 if best is not None else 1
+            previous[node] = best
+            for dependent in dependents.get(node, []):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    queue.append(dependent)
+
+        end = int(task_id) if task_id is not None else max(length, key=length.get)
+        path = []
+        while end is not None and end in tasks:
+            path.append(end)
+            end = previous.get(end)
+        path.reverse()
+
+        result, latest = [], None
+        for node in reversed(path):
+            deadline = tasks[node][4]
+            latest = min(filter(None, (deadline, latest)), default=None)
+            result.append({
+                "task_id": node, "title": tasks[node][1], "owner": tasks[node][2], "status": tasks[node][3],
+                "deadline": deadline, "latest_finish": latest,
+                "at_risk": latest is not None and (deadline is None or deadline > latest),
+            })
+        return list(reversed(result))
+
+    def list_tasks(self, include_archived=False):
+        if not include_archived:
+            return [self._format_task_line((task["task_id"], task["title"], task["priority"], task["owner"],
+                                            task["status"], 0))
+                    for task in self.storage.list_tasks()]
+        query = """
+            SELECT task_id, title, priority, owner, status, 0 FROM Tasks
+            UNION ALL SELECT task_id, title, priority, owner, status, 1 FROM ArchivedTasks ORDER BY 1
+        """
+        with read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query)
             tasks = cursor.fetchall()
-            if tasks:
-                return [
-                    f"task_{task[0]}: {task[1]} ({task[2].capitalize()} Priority, Owner: {task[3]}) - {task[4]}"
-                    for task in tasks
-                ]
-            return []
+            return [self._format_task_line(task) for task in tasks]
 
-    def list_overdue_tasks(self):
-        with sqlite3.connect(DB_PATH) as connection:
+    def search_tasks(self, term, include_archived=False):
+        pattern = f"%{term}%"
+        query = "SELECT task_id, title, priority, owner, status, 0 FROM Tasks WHERE title LIKE ? OR description LIKE ?"
+        params = [pattern, pattern]
+        if include_archived:
+            query += " UNION ALL SELECT task_id, title, priority, owner, status, 1 FROM ArchivedTasks WHERE title LIKE ? OR description LIKE ?"
+            params += [pattern, pattern]
+        with read_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute("""
-                SELECT task_id, title, owner, status, deadline
-                FROM Tasks
-                WHERE deadline < CURRENT_TIMESTAMP AND status != 'Completed'
-            """)
-            overdue_tasks = cursor.fetchall()
-            if overdue_tasks:
-                return [
-                    {"task_id": task[0], "title": task[1], "owner": task[2], "status": task[3], "deadline": task[4]}
-                    for task in overdue_tasks
-                ]
-            return []
+            cursor.execute(query + " ORDER BY 1", params)
+            return [self._format_task_line(task) for task in cursor.fetchall()]
+
+    @staticmethod
+    def _format_task_line(task):
+        line = f"task_{task[0]}: {task[1]} ({task[2].capitalize()} Priority, Owner: {task[3]}) - {task[4]}"
+        return line + " [archived]" if task[5] else line
+
+    def list_overdue_tasks(self):
+        return [
+            {"task_id": task["task_id"], "title": task["title"], "owner": task["owner"], "status": task["status"],
+             "deadline": task["deadline"]}
+            for task in self.storage.list_overdue_tasks(self.storage.clock())
+        ]
 
     def get_task(self, task_id):
-        with sqlite3.connect(DB_PATH) as connection:
+        """Return a task as a namedtuple, falling through to the archive."""
+        task = self.storage.get_task(int(task_id)) if str(task_id).isdigit() else None
+        if task:
+            return namedtuple("Task", task.keys())(**task)
+        if not self._on_application_database:
+            return None
+        with read_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute("SELECT * FROM Tasks WHERE task_id = ?", (task_id,))
+            cursor.execute("SELECT * FROM ArchivedTasks WHERE task_id = ?", (task_id,))
             row = cursor.fetchone()
             if row:
                 Task = namedtuple("Task", [desc[0] for desc in cursor.description])
@@ -207,24 +483,117 @@ class TaskManager:
             return None
 
     def get_task_details(self, task_id):
-        with sqlite3.connect(DB_PATH) as connection:
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT task_id, title, description, priority, owner, status, deadline, created_at, updated_at
-                FROM Tasks
-                WHERE task_id = ?
-            """, (task_id,))
-            task = cursor.fetchone()
-            if task:
-                return {
-                    "task_id": task[0],
-                    "title": task[1],
-                    "description": task[2] or "No description provided",
-                    "priority": task[3].capitalize(),
-                    "owner": task[4],
-                    "status": task[5],
-                    "deadline": task[6],
-                    "created_at": task[7],
-                    "updated_at": task[8]
-                }
-            return None
\ No newline at end of file
+        """Return task details, falling through to the archive for archived tasks."""
+        task = self.storage.get_task(int(task_id)) if str(task_id).isdigit() else None
+        archived = False
+        if not task and self._on_application_database:
+            with read_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""
+                    SELECT task_id, title, description, priority, owner, status, deadline, created_at, updated_at
+                    FROM ArchivedTasks
+                    WHERE task_id = ?
+                """, (task_id,))
+                row = cursor.fetchone()
+            if row:
+                task = dict(zip(("task_id", "title", "description", "priority", "owner", "status", "deadline",
+                                 "created_at", "updated_at"), row))
+                archived = True
+        if not task:
+            return None
+        return {
+            "task_id": task["task_id"],
+            "title": task["title"],
+            "description": task["description"] or "No description provided",
+            "priority": task["priority"].capitalize(),
+            "owner": task["owner"],
+            "status": task["status"],
+            "deadline": task["deadline"],
+            "created_at": task["created_at"],
+            "updated_at": task["updated_at"],
+            "archived": archived
+        }
+
+    @staticmethod
+    def _history_page_query(cursor):
+        """Build the timeline query: page keys from the (task_id, time) indexes, then the page's rows."""
+        parts = []
+        for source, table, time_column, id_column, task_filter in HISTORY_SOURCES:
+            # Everything strictly after the cursor in (time, source, id) descending order
+            if cursor is None:
+                keyset = ""
+            elif source < cursor[1]:
+                keyset = f"AND {time_column} <= :time"
+            elif source == cursor[1]:
+                keyset = f"AND ({time_column}, {id_column}) < (:time, :id)"
+            else:
+                keyset = f"AND {time_column} < :time"
+            parts.append(f"""
+                SELECT * FROM (
+                    SELECT {time_column} AS time, '{source}' AS source, {id_column} AS id
+                    FROM {table}
+                    WHERE {task_filter.replace('?', ':task_id')} {keyset}
+                    ORDER BY {time_column} DESC, {id_column} DESC
+                    LIMIT :limit
+                )""")
+        return f"""
+            WITH page AS (
+                {" UNION ALL ".join(parts)}
+                ORDER BY time DESC, source DESC, id DESC
+                LIMIT :limit
+            )
+            SELECT p.time, p.source, p.id,
+                   CASE p.source WHEN 'audit' THEN a.performed_by
+                                 WHEN 'notification' THEN COALESCE(n.recipient, an.recipient)
+                                 ELSE COALESCE(r.user_id, ar.user_id) END,
+                   CASE p.source WHEN 'audit' THEN a.action
+                                 WHEN 'notification' THEN 'notified'
+                                 ELSE COALESCE(r.action, ar.action) END,
+                   CASE p.source WHEN 'notification' THEN COALESCE(n.message, an.message)
+                                 WHEN 'response' THEN COALESCE(r.comments, ar.comments) END
+            FROM page p
+            LEFT JOIN AuditLogs a ON p.source = 'audit' AND a.log_id = p.id
+            LEFT JOIN Notifications n ON p.source = 'notification' AND n.notification_id = p.id
+            LEFT JOIN ArchivedNotifications an ON p.source = 'notification' AND an.notification_id = p.id
+            LEFT JOIN TaskResponses r ON p.source = 'response' AND r.response_id = p.id
+            LEFT JOIN ArchivedTaskResponses ar ON p.source = 'response' AND ar.response_id = p.id
+            ORDER BY p.time DESC, p.source DESC, p.id DESC
+        """
+
+    def task_history(self, task_id, cursor=None, limit=HISTORY_PAGE_SIZE):
+        """Return one page of a task's responses, audit entries and notifications, newest first.
+
+        `cursor` is the "time|source|id" string returned with the previous page; the
+        returned cursor is None on the last page.
+        """
+        position = None
+        if cursor:
+            try:
+                time, source, event_id = cursor.rsplit("|", 2)
+                position = (time, source, int(event_id))
+            except ValueError:
+                raise ValueError(f"Invalid history cursor: {cursor}")
+        params = {"task_id": str(task_id), "limit": limit + 1}
+        if position:
+            params.update(time=position[0], id=position[2])
+        # Read from the file: audit entries and responses are not applied to the read replica
+        with sqlite3.connect(get_db_path()) as connection:
+            rows = connection.execute(self._history_page_query(position), params).fetchall()
+        events = [
+            {"time": row[0], "source": row[1], "id": row[2], "actor": row[3], "action": row[4], "detail": row[5]}
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = events[-1]
+            next_cursor = f"{last['time']}|{last['source']}|{last['id']}"
+        return events, next_cursor
+
+    def iter_task_history(self, task_id, page_size=HISTORY_PAGE_SIZE):
+        """Yield a task's whole history, newest first, one page at a time."""
+        cursor = None
+        while True:
+            events, cursor = self.task_history(task_id, cursor, page_size)
+            yield from events
+            if cursor is None:
+                break
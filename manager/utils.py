@@ -1,7 +1,9 @@
 import sqlite3
 import logging
+import contextvars
+from contextlib import contextmanager
 from enum import Enum
-from typing import List, Tuple, Callable
+from typing import Iterator, List, Tuple, Callable
 import re
 import datetime
 from datetime import timedelta
@@ -10,6 +12,22 @@ from datetime import timedelta
 DB_PATH = "nesha_task_manager.db"
 SYSTEM_USER_ID = "system"
 
+# Database used in the current thread or task; DB_PATH unless inside `use_database`
+_db_path: contextvars.ContextVar = contextvars.ContextVar("gary_db_path", default=DB_PATH)
+
+def get_db_path() -> str:
+    """Path of the database that the current context reads and writes."""
+    return _db_path.get()
+
+@contextmanager
+def use_database(path: str) -> Iterator[None]:
+    """Point every database access made inside the block, in this thread only, at `path`."""
+    token = _db_path.set(path)
+    try:
+        yield
+    finally:
+        _db_path.reset(token)
+
 class DatabaseError(Exception):
     """Custom exception for database operations."""
     pass
@@ -27,9 +45,12 @@ class TaskStatus(Enum):
     COMPLETED = "Completed"
     VERIFIED = "Verified"
 
+# Statuses of tasks that no longer need work
+CLOSED_STATUSES = (TaskStatus.COMPLETED.value, TaskStatus.VERIFIED.value)
+
 def check_existing_tables() -> List[Tuple[str]]:
     """Check for existing tables in the database."""
-    with sqlite3.connect(DB_PATH) as connection:
+    with sqlite3.connect(get_db_path()) as connection:
         cursor = connection.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
         return cursor.fetchall()
@@ -37,7 +58,7 @@ def check_existing_tables() -> List[Tuple[str]]:
 def log_action(entity: str, entity_id: str, action: str, performed_by: str) -> None:
     """Log database changes to AuditLogs."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 INSERT INTO AuditLogs (entity, entity_id, action, performed_by)
@@ -51,7 +72,7 @@ def log_action(entity: str, entity_id: str, action: str, performed_by: str) -> N
 def assign_tag_to_task(task_id: str, tag_id: int):
     """Assign a tag to a task."""
     try:
-        with sqlite3.connect(DB_PATH) as connection:
+        with sqlite3.connect(get_db_path()) as connection:
             cursor = connection.cursor()
             cursor.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES (?, ?)", (task_id, tag_id))
             connection.commit()
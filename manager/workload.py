@@ -0,0 +1,298 @@
+"""Capture the `process_command` stream and replay it against a copy of the database.
+
+Capture is enabled with `enable_capture(path)` or the GARY_CAPTURE_LOG environment
+variable. Replay from the command line:
+
+    python -m manager.workload replay capture.jsonl.gz --db nesha_task_manager.db --speed 4 --workers 8
+
+By default writes replay one at a time in capture order, which keeps results
+comparable with the capture but means lock errors and retries stay near zero. Pass
+--concurrent-writes to spread every command over the workers and measure write
+contention; results may then diverge from the capture.
+"""
+import argparse
+import atexit
+import contextvars
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from manager.utils import DB_PATH, use_database
+
+CAPTURE_ENV_VAR = "GARY_CAPTURE_LOG"
+# Recorded results are truncated to keep the log compact
+RESULT_PREVIEW_CHARS = 200
+# Records buffered before the capture log is flushed
+FLUSH_EVERY = 100
+LOCK_ERROR = "database is locked"
+# Commands that only read the database. A run of them between two writes is replayed
+# concurrently; every other command runs alone, in capture order.
+READ_COMMANDS = frozenset({
+    "/blockers", "/blocking", "/ready_tasks", "/critical_path", "/list_tasks", "/search_tasks",
+    "/overdue_tasks", "/task_details", "/notifications", "/recurring_tasks", "/history", "/replica_status",
+    "/metrics",
+})
+
+_recorder = None
+# Set in replay workers so that replayed commands are not captured again
+_replaying: contextvars.ContextVar = contextvars.ContextVar("gary_replaying", default=False)
+
+def _open_log(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+class WorkloadRecorder:
+    """Append-only JSON-lines log of processed commands (gzip-compressed for *.gz paths)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = _open_log(path, "a")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def record(self, started_at: float, command: str, result: str, duration: float) -> None:
+        entry = {
+            "t": round(started_at, 6),
+            "c": command,
+            "d": round(duration * 1000, 3),
+            "r": result[:RESULT_PREVIEW_CHARS],
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._pending += 1
+            if self._pending >= FLUSH_EVERY:
+                self._handle.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+def enable_capture(path: str) -> WorkloadRecorder:
+    """Start recording every processed command to `path`."""
+    global _recorder
+    disable_capture()
+    _recorder = WorkloadRecorder(path)
+    logging.info(f"Capturing command workload to {path}")
+    return _recorder
+
+def disable_capture() -> None:
+    """Stop recording and close the capture log."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+def active_recorder() -> Optional[WorkloadRecorder]:
+    return None if _replaying.get() else _recorder
+
+def capture_from_env() -> None:
+    """Enable capture when GARY_CAPTURE_LOG is set."""
+    path = os.environ.get(CAPTURE_ENV_VAR)
+    if path and _recorder is None:
+        enable_capture(path)
+
+atexit.register(disable_capture)
+
+def load_workload(path: str) -> List[dict]:
+    """Read a capture log, ordered by start time."""
+    with _open_log(path, "r") as handle:
+        entries = [json.loads(line) for line in handle if line.strip()]
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+def copy_database(source: str, workdir: str) -> str:
+    """Copy `source` into `workdir` under the name the application opens, using the backup API."""
+    target = os.path.join(workdir, os.path.basename(DB_PATH))
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+    return target
+
+def command_type(command: str) -> str:
+    return command.split(" ", 1)[0] if command.startswith("/") else "(unknown)"
+
+def is_read_command(command: str) -> bool:
+    # /check_integrity only writes when asked to repair
+    return command_type(command) in READ_COMMANDS or command.strip() == "/check_integrity"
+
+def plan_batches(entries: List[dict]) -> List[List[dict]]:
+    """Split entries, in order, into runs of read commands and single write commands."""
+    batches: List[List[dict]] = []
+    previous_read = False
+    for entry in entries:
+        read = is_read_command(entry["c"])
+        if read and previous_read:
+            batches[-1].append(entry)
+        else:
+            batches.append([entry])
+        previous_read = read
+    return batches
+
+def _replay_partition(entries: List[dict], base: float, start_at: float, speed: float,
+                      max_retries: int, db_path: str) -> List[tuple]:
+    """Replay entries in order against `db_path`; returns (type, latency, lock_errors, retries,
+    failed, diverged) per entry."""
+    token = _replaying.set(True)
+    try:
+        with use_database(db_path):
+            return _replay_entries(entries, base, start_at, speed, max_retries)
+    finally:
+        _replaying.reset(token)
+
+def _replay_entries(entries: List[dict], base: float, start_at: float, speed: float,
+                    max_retries: int) -> List[tuple]:
+    from manager.commands import process_command
+
+    results = []
+    time.sleep(max(0.0, start_at - time.time()))
+    for entry in entries:
+        if speed > 0:
+            delay = start_at + (entry["t"] - base) / speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        lock_errors = retries = 0
+        began = time.perf_counter()
+        while True:
+            try:
+                result = process_command(entry["c"])
+            except Exception as e:
+                result = f"Error processing command: {e}"
+            if LOCK_ERROR not in result or retries >= max_retries:
+                break
+            lock_errors += 1
+            retries += 1
+            time.sleep(0.01 * 2 ** retries)
+        latency = time.perf_counter() - began
+        if LOCK_ERROR in result:
+            lock_errors += 1
+        failed = result.startswith("Error")
+        diverged = "r" in entry and result[:RESULT_PREVIEW_CHARS] != entry["r"]
+        results.append((command_type(entry["c"]), latency, lock_errors, retries, failed, diverged))
+    return results
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    """Aggregate replay samples into throughput and per-command latency percentiles (ms)."""
+    by_type: Dict[str, List[tuple]] = defaultdict(list)
+    for sample in samples:
+        by_type[sample[0]].append(sample)
+
+    def stats(group: List[tuple]) -> dict:
+        latencies = sorted(sample[1] * 1000 for sample in group)
+        return {
+            "count": len(group),
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p90_ms": round(_percentile(latencies, 90), 3),
+            "p99_ms": round(_percentile(latencies, 99), 3),
+            "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+            "lock_errors": sum(sample[2] for sample in group),
+            "retries": sum(sample[3] for sample in group),
+            "errors": sum(1 for sample in group if sample[4]),
+            "diverged": sum(1 for sample in group if sample[5]),
+        }
+
+    return {
+        "commands": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "total": stats(samples),
+        "by_command": {name: stats(group) for name, group in sorted(by_type.items())},
+    }
+
+def replay(log_path: str, db_path: str, speed: float = 1.0, workers: int = 4,
+           use_processes: bool = False, max_retries: int = 3,
+           workdir: Optional[str] = None, concurrent_writes: bool = False) -> dict:
+    """Replay a capture log against a copy of `db_path` and return a report.
+
+    `speed` scales the recorded inter-arrival times (2.0 = twice as fast); 0 replays
+    as fast as possible. Writes run one at a time in capture order, so later commands
+    see the same ids and state as when they were captured; the read commands between
+    two writes are spread over `workers` threads, or processes with `use_processes`.
+    With `concurrent_writes`, every command is spread over the workers, so writes
+    contend for the lock as they would under load but may apply in another order.
+    """
+    entries = load_workload(log_path)
+    if not entries:
+        return summarize([], 0.0)
+
+    owns_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="gary-replay-")
+    os.makedirs(workdir, exist_ok=True)
+    target = copy_database(db_path, workdir)
+    base = entries[0]["t"]
+    start_at = time.time() + 0.5  # Give every worker time to start
+    # Workers inherit the environment; they must not reopen the capture log
+    capture_log = os.environ.pop(CAPTURE_ENV_VAR, None)
+    samples: List[tuple] = []
+    try:
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            for batch in [entries] if concurrent_writes else plan_batches(entries):
+                futures = [pool.submit(_replay_partition, batch[index::workers], base, start_at, speed,
+                                       max_retries, target)
+                           for index in range(min(workers, len(batch)))]
+                samples.extend(sample for future in futures for sample in future.result())
+        elapsed = time.time() - start_at
+    finally:
+        if capture_log is not None:
+            os.environ[CAPTURE_ENV_VAR] = capture_log
+        if owns_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = summarize(samples, elapsed)
+    report.update({"speed": speed, "workers": workers, "mode": "processes" if use_processes else "threads",
+                   "writes": "concurrent" if concurrent_writes else "serialized"})
+    return report
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['commands']} commands in {report['elapsed_s']}s "
+        f"({report['throughput_per_s']}/s, {report.get('workers')} {report.get('mode')}, speed {report.get('speed')}, "
+        f"{report.get('writes')} writes)",
+        f"{'command':<20}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{'locked':>8}{'retries':>8}{'errors':>8}",
+    ]
+    for name, stats in list(report["by_command"].items()) + [("TOTAL", report["total"])]:
+        lines.append(f"{name:<20}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p90_ms']:>10}"
+                     f"{stats['p99_ms']:>10}{stats['max_ms']:>10}{stats['lock_errors']:>8}"
+                     f"{stats['retries']:>8}{stats['errors']:>8}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a captured Gary command workload.")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    replay_parser = subparsers.add_parser("replay", help="Replay a capture log against a copy of a database")
+    replay_parser.add_argument("log", help="Capture log (JSON lines, optionally .gz)")
+    replay_parser.add_argument("--db", default=DB_PATH, help="Database to copy before replaying")
+    replay_parser.add_argument("--speed", default="1", help="Speed multiplier, or 'max'")
+    replay_parser.add_argument("--workers", type=int, default=4)
+    replay_parser.add_argument("--processes", action="store_true", help="Use processes instead of threads")
+    replay_parser.add_argument("--retries", type=int, default=3, help="Retries on 'database is locked'")
+    replay_parser.add_argument("--concurrent-writes", action="store_true",
+                               help="Run writes concurrently instead of one at a time in capture order")
+    replay_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    report = replay(args.log, os.path.abspath(args.db), speed=speed, workers=args.workers,
+                    use_processes=args.processes, max_retries=args.retries,
+                    concurrent_writes=args.concurrent_writes)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
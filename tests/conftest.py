@@ -0,0 +1,21 @@
+import sqlite3
+
+import pytest
+
+from manager.db.db_initialize import initialize_db
+from manager.utils import DB_PATH
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A freshly initialized database with the sample users and tags.
+
+    DB_PATH is relative, so each test runs in its own temporary directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    initialize_db()
+    return tmp_path / DB_PATH
+
+@pytest.fixture
+def connection(db):
+    with sqlite3.connect(db) as connection:
+        yield connection
@@ -0,0 +1,51 @@
+import csv
+
+import pytest
+
+from manager.operations.analytics import EXPORT_DIR_ENV_VAR, export_metrics_csv, get_metrics, refresh_metrics
+from manager.operations.cascade import delete_tasks
+from manager.task_management import TaskManager
+
+@pytest.fixture
+def export_dir(db, tmp_path, monkeypatch):
+    path = tmp_path / "exports"
+    monkeypatch.setenv(EXPORT_DIR_ENV_VAR, str(path))
+    return path
+
+@pytest.mark.parametrize("name", ["../escape.csv", "nested/../../escape.csv", "/tmp/escape.csv", ""])
+def test_export_rejects_names_outside_the_export_dir(export_dir, name):
+    with pytest.raises(ValueError, match="Invalid export file name"):
+        export_metrics_csv(name)
+    assert not export_dir.exists()
+
+@pytest.mark.parametrize("dimension, period", [("team", "weekly"), ("owner", "monthly")])
+def test_export_validates_arguments_before_writing(export_dir, dimension, period):
+    with pytest.raises(ValueError, match="Invalid"):
+        export_metrics_csv("metrics.csv", dimension, period)
+    assert not export_dir.exists()
+
+def test_export_writes_inside_the_export_dir(export_dir):
+    manager = TaskManager()
+    manager.update_task_status(manager.create_task("Ship", "", "high", "user1", None), "Completed")
+    refresh_metrics()
+
+    count, path = export_metrics_csv("reports/weekly.csv", "owner")
+
+    assert path == str(export_dir / "reports" / "weekly.csv")
+    with open(path, newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert count == len(rows) == 1
+    assert rows[0]["value"] == "user1" and rows[0]["throughput"] == "1"
+
+def test_deleted_task_transitions_are_retired(connection):
+    manager = TaskManager()
+    task_id = manager.create_task("Gone", "", "low", "user1", None)
+    manager.update_task_status(task_id, "Completed")
+    delete_tasks([task_id])
+
+    refresh_metrics()
+
+    counted = connection.execute("SELECT counted FROM TaskLifecycle WHERE task_id = ?", (task_id,)).fetchall()
+    assert counted in ([], [(1,)])
+    assert connection.execute("SELECT COUNT(*) FROM TaskLifecycle WHERE counted = 0").fetchone()[0] == 0
+    assert get_metrics() == []
@@ -0,0 +1,71 @@
+import pytest
+
+from manager.operations.archive import archive_closed_tasks
+from manager.task_management import TaskManager
+
+@pytest.fixture
+def tasks(connection):
+    """Task 1 closed long ago (lower-case status) with tags, responses and notifications; 2 depends on 1;
+    3 closed recently; 4 open and old."""
+    connection.executemany("""
+        INSERT INTO Tasks (title, description, priority, owner, status, updated_at)
+        VALUES (?, ?, 'low', 'user1', ?, ?)
+    """, [("Old report", "quarterly numbers", "completed", "2020-01-01 00:00:00"),
+          ("Follow-up", "", "Pending", "2020-01-01 00:00:00"),
+          ("Fresh report", "", "Verified", "2999-01-01 00:00:00"),
+          ("Open report", "", "Pending", "2020-01-01 00:00:00")])
+    connection.execute("INSERT INTO TaskDependencies (task_id, depends_on) VALUES (2, 1)")
+    connection.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES ('1', 1)")
+    connection.execute("INSERT INTO TaskResponses (task_id, user_id, action) VALUES ('1', 'user1', 'Accepted')")
+    connection.execute("INSERT INTO Notifications (task_id, recipient, message) VALUES ('1', 'user1', 'Done')")
+    connection.execute("INSERT INTO NotificationOutbox (task_id, recipient, message) VALUES ('1', 'user1', 'Ready')")
+    connection.commit()
+    return connection
+
+def _count(connection, table, task_id):
+    return connection.execute(f"SELECT COUNT(*) FROM {table} WHERE task_id = ?", (task_id,)).fetchone()[0]
+
+def test_archive_moves_old_closed_tasks_with_their_rows(tasks):
+    assert archive_closed_tasks(older_than_days=30, batch_size=1) == 1
+
+    assert tasks.execute("SELECT task_id FROM Tasks ORDER BY task_id").fetchall() == [(2,), (3,), (4,)]
+    assert tasks.execute("SELECT task_id, status FROM ArchivedTasks").fetchall() == [(1, "completed")]
+    for table in ("TaskTags", "TaskResponses", "Notifications"):
+        assert _count(tasks, table, "1") == 0
+        assert _count(tasks, f"Archived{table}", "1") == 1
+    assert tasks.execute("SELECT COUNT(*) FROM TaskDependencies").fetchone()[0] == 0
+    assert _count(tasks, "NotificationOutbox", "1") == 0
+    assert tasks.execute("SELECT entity_id FROM AuditLogs WHERE action = 'archived'").fetchall() == [("1",)]
+
+def test_archive_keeps_active_recurring_templates(tasks):
+    tasks.execute("""
+        INSERT INTO RecurringTasks (template_task_id, interval, next_occurrence, active)
+        VALUES ('1', 'FREQ=DAILY', '2030-01-01 09:00:00', 1)
+    """)
+    tasks.commit()
+
+    assert archive_closed_tasks(older_than_days=30) == 0
+    assert _count(tasks, "Tasks", 1) == 1
+
+def test_get_task_falls_back_to_the_archive(tasks):
+    archive_closed_tasks(older_than_days=30)
+    manager = TaskManager()
+
+    assert manager.get_task(1).title == "Old report"
+    details = manager.get_task_details(1)
+    assert details["archived"] is True
+    assert details["description"] == "quarterly numbers"
+    assert manager.get_task_details(2)["archived"] is False
+    assert manager.get_task(99) is None
+    assert manager.get_task_details(99) is None
+
+def test_list_and_search_include_archived_only_on_request(tasks):
+    archive_closed_tasks(older_than_days=30)
+    manager = TaskManager()
+
+    assert not any(line.startswith("task_1:") for line in manager.list_tasks())
+    assert manager.list_tasks(include_archived=True)[0] == \
+        "task_1: Old report (Low Priority, Owner: user1) - completed [archived]"
+    assert [line.split(":")[0] for line in manager.search_tasks("report")] == ["task_3", "task_4"]
+    assert [line.split(":")[0] for line in manager.search_tasks("report", include_archived=True)] == \
+        ["task_1", "task_3", "task_4"]
@@ -0,0 +1,73 @@
+import pytest
+
+from manager.commands import process_command
+from manager.operations.cascade import TASK_REFERENCES, delete_tasks, delete_tasks_where
+from manager.operations.recurring_tasks import schedule_recurring_task
+from manager.replica import disable_read_replica, enable_read_replica, read_connection
+
+@pytest.fixture
+def tasks(connection):
+    """Task 1 with a row in every table that references tasks; 2 depends on 1, 1 on 3; 4 is archived."""
+    connection.executemany("INSERT INTO Tasks (title, priority, owner, status) VALUES (?, 'low', 'user1', ?)",
+                           [("Target", "Completed"), ("Dependent", "Pending"), ("Blocker", "Completed")])
+    connection.execute("""
+        INSERT INTO ArchivedTasks (task_id, title, priority, owner, status, created_at, updated_at, archived_at)
+        VALUES (4, 'Archived', 'low', 'user1', 'Verified', '2024-01-01', '2024-01-02', '2024-02-01')
+    """)
+    connection.executemany("INSERT INTO TaskDependencies (task_id, depends_on) VALUES (?, ?)", [(2, 1), (1, 3)])
+    connection.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES ('1', 1)")
+    connection.execute("INSERT INTO ArchivedTaskTags (task_id, tag_id) VALUES ('4', 1)")
+    connection.execute("INSERT INTO TaskResponses (task_id, user_id, action) VALUES ('1', 'user1', 'Accepted')")
+    connection.execute("INSERT INTO Notifications (task_id, recipient, message) VALUES ('1', 'user1', 'Done')")
+    connection.execute("INSERT INTO NotificationOutbox (task_id, recipient, message) VALUES ('1', 'user1', 'Ready')")
+    connection.execute("INSERT INTO TaskLifecycle (task_id, completed_at) VALUES (1, '2025-01-01 10:00:00')")
+    connection.commit()
+    schedule_recurring_task("1", "FREQ=DAILY", "2030-01-01 09:00:00")
+    connection.execute("INSERT INTO RecurringOccurrences (recurring_task_id, occurrence) VALUES (1, '2030-01-01 09:00:00')")
+    connection.commit()
+    return connection
+
+def _references(connection, task_id):
+    counts = {}
+    for table, column, is_text in TASK_REFERENCES:
+        key = str(task_id) if is_text else task_id
+        counts[f"{table}.{column}"] = connection.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {column} = ?", (key,)).fetchone()[0]
+    counts["RecurringOccurrences"] = connection.execute("SELECT COUNT(*) FROM RecurringOccurrences").fetchone()[0]
+    for table in ("Tasks", "ArchivedTasks"):
+        counts[table] = connection.execute(f"SELECT COUNT(*) FROM {table} WHERE task_id = ?", (task_id,)).fetchone()[0]
+    return counts
+
+def test_delete_removes_every_reference(tasks):
+    assert sum(_references(tasks, 1).values()) == 10
+
+    assert delete_tasks([1, 4, 99]) == 2
+
+    assert not any(_references(tasks, 1).values())
+    assert not any(_references(tasks, 4).values())
+    assert tasks.execute("SELECT task_id FROM Tasks ORDER BY task_id").fetchall() == [(2,), (3,)]
+    assert tasks.execute("SELECT entity_id FROM AuditLogs WHERE action = 'deleted' ORDER BY entity_id").fetchall() == \
+        [("1",), ("4",)]
+
+def test_delete_where_runs_in_batches(tasks):
+    assert delete_tasks_where(status="Completed", batch_size=1) == 2
+
+    assert tasks.execute("SELECT task_id FROM Tasks").fetchall() == [(2,)]
+    assert tasks.execute("SELECT COUNT(*) FROM TaskDependencies").fetchone()[0] == 0
+
+def test_delete_command_reports_unknown_ids(tasks):
+    assert process_command("/delete_task abc") == "Task abc not found."
+    assert process_command("/delete_task 99") == "Task 99 not found."
+    assert process_command("/delete_task 1") == "Task 1 deleted successfully."
+
+def test_delete_is_applied_to_the_replica_at_once(tasks):
+    replica = enable_read_replica(refresh_interval=3600)
+    try:
+        delete_tasks([1])
+
+        with read_connection() as connection:
+            assert not any(_references(connection, 1).values())
+        assert replica.status()["writes_applied_since_sync"] == 1
+        assert not replica.status()["stale"]
+    finally:
+        disable_read_replica()
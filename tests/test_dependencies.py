@@ -0,0 +1,56 @@
+import pytest
+
+from manager.task_management import TaskManager
+
+@pytest.fixture
+def manager(db):
+    return TaskManager()
+
+@pytest.fixture
+def chain(manager):
+    """Three tasks where 3 depends on 2 and 2 depends on 1."""
+    ids = [manager.create_task(f"Step {n}", "", "medium", "user1", None) for n in (1, 2, 3)]
+    manager.add_dependency(ids[1], ids[0])
+    manager.add_dependency(ids[2], ids[1])
+    return ids
+
+def _queued(connection):
+    return connection.execute("SELECT task_id, recipient FROM NotificationOutbox ORDER BY outbox_id").fetchall()
+
+def test_direct_cycle_is_rejected(manager, chain):
+    assert manager.add_dependency(chain[0], chain[1]) == \
+        f"Cannot add dependency: task {chain[1]} already depends on task {chain[0]}."
+
+def test_transitive_cycle_is_rejected(manager, chain, connection):
+    assert manager.add_dependency(chain[0], chain[2]) == \
+        f"Cannot add dependency: task {chain[2]} already depends on task {chain[0]}."
+    assert connection.execute("SELECT COUNT(*) FROM TaskDependencies").fetchone()[0] == 2
+
+def test_self_dependency_is_rejected(manager, chain):
+    assert manager.add_dependency(chain[0], chain[0]) == f"Task {chain[0]} cannot depend on itself."
+
+def test_unknown_task_is_rejected(manager, chain):
+    assert manager.add_dependency(chain[0], 999) == "Task 999 not found."
+
+def test_completion_unblocks_dependents_case_insensitively(manager, chain, connection):
+    result = manager.update_task_status(chain[0], "completed")
+
+    assert result.endswith(f"Unblocked: task_{chain[1]}")
+    assert _queued(connection) == [(str(chain[1]), "user1")]
+
+def test_repeated_completion_does_not_notify_again(manager, chain, connection):
+    manager.update_task_status(chain[0], "Completed")
+    manager.update_task_status(chain[0], "Verified")
+    manager.update_task_status(chain[0], "Completed")
+
+    assert len(_queued(connection)) == 1
+
+def test_lowercase_closed_status_counts_as_done_everywhere(manager, chain):
+    manager.update_task_status(chain[0], "completed")
+
+    ready = [task["task_id"] for task in manager.list_ready_tasks()]
+    assert chain[0] not in ready
+    assert chain[1] in ready
+    assert manager.list_blockers(chain[1]) == []
+    assert [step["task_id"] for step in manager.critical_path()] == chain[1:]
+    assert [step["task_id"] for step in manager.critical_path(chain[2])] == chain[1:]
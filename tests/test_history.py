@@ -0,0 +1,51 @@
+import pytest
+
+from manager.task_management import TaskManager
+
+@pytest.fixture
+def manager(db):
+    return TaskManager()
+
+def test_created_tasks_have_a_create_entry(manager):
+    single = manager.create_task("Single", "", "low", "user1", None)
+    bulk = manager.create_tasks_bulk([("Bulk A", "", "low", "user1", None), ("Bulk B", "", "low", "user2", None)])
+
+    for task_id in [single, *bulk]:
+        events = list(manager.iter_task_history(task_id))
+        assert [(event["source"], event["action"]) for event in events] == [("audit", "create")]
+
+def test_pages_cover_the_history_once_in_order(manager, connection):
+    task_id = manager.create_task("Busy", "", "high", "user1", None)
+    for status in ("Accepted", "In Progress", "Completed"):
+        manager.update_task_status(task_id, status)
+    # Rows sharing one timestamp are ordered by source and id
+    connection.executemany("INSERT INTO TaskResponses (task_id, user_id, action, response_time) VALUES (?, ?, ?, ?)",
+                           [(str(task_id), "user2", f"note {n}", "2025-01-01 12:00:00") for n in range(4)])
+    connection.executemany("INSERT INTO Notifications (task_id, recipient, message, timestamp) VALUES (?, ?, ?, ?)",
+                           [(str(task_id), "user1", f"ping {n}", "2025-01-01 12:00:00") for n in range(3)])
+    connection.execute("""
+        INSERT INTO ArchivedNotifications (notification_id, task_id, recipient, message, timestamp)
+        VALUES (900, ?, 'user1', 'old ping', '2024-06-01 08:00:00')
+    """, (str(task_id),))
+    connection.commit()
+
+    everything, last_cursor = manager.task_history(task_id, limit=100)
+    assert last_cursor is None and len(everything) == 12
+
+    pages, cursor = [], None
+    while True:
+        events, cursor = manager.task_history(task_id, cursor, limit=5)
+        pages.append(events)
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert [event for page in pages for event in page] == everything
+    assert list(manager.iter_task_history(task_id, page_size=3)) == everything
+    keys = [(event["time"], event["source"], event["id"]) for event in everything]
+    assert keys == sorted(keys, reverse=True)
+    assert everything[-1]["detail"] and everything[-1]["source"] == "notification"
+
+def test_invalid_cursor_is_rejected(manager):
+    with pytest.raises(ValueError, match="Invalid history cursor"):
+        manager.task_history(1, "not-a-cursor")
@@ -0,0 +1,97 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from manager.ingestion import ingest_messages
+from manager.operations.task_parser import parse_task_message
+from manager.task_management import TaskManager
+
+def _titles(db, task_ids):
+    with sqlite3.connect(db) as connection:
+        rows = dict(connection.execute(
+            f"SELECT task_id, title FROM Tasks WHERE task_id IN ({', '.join('?' for _ in task_ids)})", task_ids))
+    return [rows.get(task_id) for task_id in task_ids]
+
+# A Wednesday
+NOW = datetime(2025, 1, 1, 10, 0)
+
+@pytest.mark.parametrize("message, title, deadline", [
+    ("task to review the report, deadline next Friday 5pm", "review the report", "2025-01-03 17:00:00"),
+    ("task to book room 5pm tomorrow", "book room", "2025-01-02 17:00:00"),
+    ("task to book room tomorrow at 9:30am", "book room", "2025-01-02 09:30:00"),
+    ("call the vendor in 3 days", "call the vendor", "2025-01-04 23:59:59"),
+    ("call the vendor in two hours", "call the vendor", "2025-01-01 12:00:00"),
+    ("task to send the invoice by friday", "send the invoice", "2025-01-03 23:59:59"),
+    ("this wednesday water the plants", "water the plants", "2025-01-01 23:59:59"),
+    ("next wednesday water the plants", "water the plants", "2025-01-08 23:59:59"),
+    ("standup 9:30am", "standup", "2025-01-02 09:30:00"),
+    ("lunch at noon", "lunch", "2025-01-01 12:00:00"),
+    ("pay rent 2025-02-01", "pay rent", "2025-02-01 23:59:59"),
+    ("reminder to call the bank 2025-03-04 08:15", "call the bank", "2025-03-04 08:15:00"),
+    ("task to plan the offsite", "plan the offsite", None),
+])
+def test_date_phrases(message, title, deadline):
+    parsed = parse_task_message(message, now=NOW)
+
+    assert (parsed["title"], parsed["deadline"]) == (title, deadline)
+
+@pytest.mark.parametrize("message, owner", [
+    ("task to fix owner field in form", "user1"),
+    ("task to fix the form, owner: user2", "user2"),
+    ("task to fix the form @user3", "user3"),
+    ("task to fix the form, assign it to user2", "user2"),
+])
+def test_owner_needs_an_explicit_marker(message, owner):
+    parsed = parse_task_message(message, now=NOW, default_owner="user1")
+
+    assert parsed["owner"] == owner
+    assert parsed["title"] == ("fix owner field in form" if owner == "user1" else "fix the form")
+
+def test_unknown_deadline_is_rejected():
+    with pytest.raises(ValueError, match="Invalid deadline"):
+        parse_task_message("task to renew the domain, deadline someday", now=NOW)
+
+def test_bulk_insert_returns_the_new_id_range(db):
+    manager = TaskManager()
+    first = manager.create_task("Existing", "", "low", "user1", None)
+    tasks = [(f"Bulk {n}", "", "medium", "user2", None) for n in range(5)]
+
+    task_ids = manager.create_tasks_bulk(tasks)
+
+    assert task_ids == list(range(first + 1, first + 6))
+    assert _titles(db, task_ids) == [task[0] for task in tasks]
+
+def test_concurrent_bulk_inserts_get_their_own_ids(db):
+    manager = TaskManager()
+    batches = [[(f"Batch {b} task {n}", "", "low", "user1", None) for n in range(200)] for b in range(4)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(manager.create_tasks_bulk, batches))
+
+    for batch, task_ids in zip(batches, results):
+        assert _titles(db, task_ids) == [task[0] for task in batch]
+    assert len({task_id for task_ids in results for task_id in task_ids}) == 800
+
+def test_bulk_insert_rejects_unknown_owners(db):
+    with pytest.raises(ValueError, match="Unknown owners: ghost"):
+        TaskManager().create_tasks_bulk([("Fine", "", "low", "user1", None), ("Lost", "", "low", "ghost", None)])
+    assert _titles(db, [1]) == [None]
+
+def test_ingest_messages_in_batches(db):
+    messages = [
+        "task to review the report, priority high, assign it to user2",
+        "",
+        "call the vendor @user3 in 3 days !urgent",
+        "task to water the plants @ghost",
+        "task to plan the offsite",
+        "task to renew the domain, deadline someday",
+    ]
+
+    report = ingest_messages(messages, default_owner="user1", batch_size=2)
+
+    assert report["created"] == 3
+    assert _titles(db, report["task_ids"]) == ["review the report", "call the vendor", "plan the offsite"]
+    assert [(entry["line"], entry["error"][:12]) for entry in report["rejected"]] == \
+        [(4, "User ghost n"), (6, "Invalid dead")]
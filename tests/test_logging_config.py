@@ -0,0 +1,38 @@
+import json
+import logging
+
+import pytest
+
+from manager.logging_config import setup_logging, shutdown_logging
+
+@pytest.fixture
+def log_file(tmp_path):
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    path = tmp_path / "app.log"
+    setup_logging(str(path), console=False, info_rate=None)
+    yield path
+    shutdown_logging()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def test_json_record_keeps_exception(log_file):
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logging.exception("Division failed for %s", "task_7")
+    shutdown_logging()
+
+    entry = json.loads(log_file.read_text().splitlines()[-1])
+    assert entry["msg"] == "Division failed for task_7"
+    assert entry["level"] == "ERROR"
+    assert "ZeroDivisionError" in entry["exc"]
+
+def test_json_record_without_exception(log_file):
+    logging.warning("Nothing to see")
+    shutdown_logging()
+
+    entry = json.loads(log_file.read_text().splitlines()[-1])
+    assert entry["msg"] == "Nothing to see"
+    assert "exc" not in entry
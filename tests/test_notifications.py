@@ -0,0 +1,167 @@
+import pytest
+
+from manager.commands import process_command
+from manager.operations import notification_dispatch
+from manager.operations.notification_dispatch import (
+    MAX_DELIVERY_ATTEMPTS, NotificationSink, claim_batch, coalesce, deliver_batch, dispatch_pending,
+    release_stale_claims,
+)
+from manager.operations.notifications import fetch_notifications, mark_notifications_read, send_notifications
+
+class RecordingSink(NotificationSink):
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, notification):
+        self.delivered.append(notification)
+
+class FailingSink(NotificationSink):
+    def deliver(self, notification):
+        raise RuntimeError("sink down")
+
+def _outbox(connection):
+    return connection.execute("""
+        SELECT outbox_id, status, attempts, claimed_by IS NOT NULL, next_attempt_at IS NOT NULL
+        FROM NotificationOutbox ORDER BY outbox_id
+    """).fetchall()
+
+def _make_due(connection):
+    connection.execute("UPDATE NotificationOutbox SET next_attempt_at = datetime('now', '-1 seconds')")
+    connection.commit()
+
+def test_sinks_must_implement_deliver():
+    with pytest.raises(TypeError):
+        NotificationSink()
+
+def test_claim_takes_pending_rows_once(db, connection):
+    send_notifications([("1", "user1", "a"), ("2", "user2", "b"), ("3", "user1", "c")])
+
+    first = claim_batch("worker-0", batch_size=2)
+    second = claim_batch("worker-1", batch_size=2)
+
+    assert [row[0] for row in first] == [1, 2]
+    assert [row[0] for row in second] == [3]
+    assert claim_batch("worker-2") == []
+    assert [row[1] for row in _outbox(connection)] == ["claimed"] * 3
+
+def test_bursts_for_one_recipient_are_coalesced_into_a_digest():
+    rows = [(1, "7", "user1", "first", 0), (2, "7", "user1", "second", 1), (3, "7", "user1", "third", 0),
+            (4, "8", "user2", "other", 0)]
+
+    digest, single = coalesce(rows, digest_threshold=3)
+
+    assert digest["recipient"] == "user1"
+    assert digest["task_id"] == "7"
+    assert digest["message"] == "3 updates:\n- first\n- second\n- third"
+    assert (digest["event_count"], digest["outbox_ids"], digest["attempts"]) == (3, [1, 2, 3], 1)
+    assert single == {"recipient": "user2", "task_id": "8", "message": "other", "event_count": 1,
+                      "outbox_ids": [4], "attempts": 0}
+
+def test_digest_of_several_tasks_has_no_task_id():
+    rows = [(1, "7", "user1", "a", 0), (2, "8", "user1", "b", 0)]
+
+    assert coalesce(rows, digest_threshold=2)[0]["task_id"] is None
+
+def test_delivery_records_notifications_and_empties_the_outbox(db, connection):
+    send_notifications([("1", "user1", "a"), ("1", "user1", "b"), ("1", "user1", "c"), ("2", "user2", "d")])
+    sink = RecordingSink()
+
+    assert dispatch_pending([sink]) == 4
+
+    assert [n["event_count"] for n in sink.delivered] == [3, 1]
+    assert _outbox(connection) == []
+    assert connection.execute("""
+        SELECT recipient, event_count, delivered_at IS NOT NULL FROM Notifications ORDER BY notification_id
+    """).fetchall() == [("user1", 3, 1), ("user2", 1, 1)]
+
+def test_failed_delivery_is_retried_after_a_backoff(db, connection):
+    send_notifications([("1", "user1", "a")])
+
+    assert deliver_batch(claim_batch("worker-0"), [FailingSink()]) == 0
+
+    assert _outbox(connection) == [(1, "pending", 1, 0, 1)]
+    # Not claimable until the retry delay has passed
+    assert claim_batch("worker-0") == []
+    delay = connection.execute("""
+        SELECT CAST(strftime('%s', next_attempt_at) - strftime('%s', 'now') AS INTEGER) FROM NotificationOutbox
+    """).fetchone()[0]
+    assert notification_dispatch.RETRY_BACKOFF_SECONDS - 5 <= delay <= notification_dispatch.RETRY_BACKOFF_SECONDS * 2
+
+    _make_due(connection)
+    sink = RecordingSink()
+    assert dispatch_pending([sink]) == 1
+    assert [n["message"] for n in sink.delivered] == ["a"]
+
+def test_backoff_doubles_with_each_attempt(db, connection, monkeypatch):
+    monkeypatch.setattr(notification_dispatch, "RETRY_BACKOFF_SECONDS", 100)
+    send_notifications([("1", "user1", "a")])
+    delays = []
+    for _ in range(3):
+        _make_due(connection)
+        deliver_batch(claim_batch("worker-0"), [FailingSink()])
+        delays.append(connection.execute("""
+            SELECT strftime('%s', next_attempt_at) - strftime('%s', 'now') FROM NotificationOutbox
+        """).fetchone()[0])
+
+    assert [round(delay, -2) for delay in delays] == [100, 200, 400]
+
+def test_delivery_is_marked_failed_after_the_last_attempt(db, connection):
+    send_notifications([("1", "user1", "a")])
+    connection.execute("UPDATE NotificationOutbox SET attempts = ?", (MAX_DELIVERY_ATTEMPTS - 1,))
+    connection.commit()
+
+    deliver_batch(claim_batch("worker-0"), [FailingSink()])
+
+    assert _outbox(connection)[0][:3] == (1, "failed", MAX_DELIVERY_ATTEMPTS)
+    _make_due(connection)
+    assert claim_batch("worker-0") == []
+
+def test_stale_claims_are_released(db, connection):
+    send_notifications([("1", "user1", "a"), ("2", "user1", "b")])
+    claim_batch("worker-0")
+    connection.execute("UPDATE NotificationOutbox SET claimed_at = datetime('now', '-1 hours') WHERE outbox_id = 1")
+    connection.commit()
+
+    assert release_stale_claims(timeout_seconds=300) == 1
+
+    assert [row[:4] for row in _outbox(connection)] == [(1, "pending", 0, 0), (2, "claimed", 0, 1)]
+
+@pytest.fixture
+def delivered(db, connection):
+    """Five notifications for user1, ids 1 to 5, and one for user2."""
+    connection.executemany("INSERT INTO Notifications (task_id, recipient, message) VALUES (?, ?, ?)",
+                           [(str(n), "user1", f"message {n}") for n in range(1, 6)] + [("6", "user2", "other")])
+    connection.commit()
+    return connection
+
+def test_fetch_pages_by_keyset(delivered):
+    page = fetch_notifications("user1", limit=2)
+    assert [n["notification_id"] for n in page] == [5, 4]
+
+    page = fetch_notifications("user1", before_id=page[-1]["notification_id"], limit=2)
+    assert [n["notification_id"] for n in page] == [3, 2]
+
+    page = fetch_notifications("user1", before_id=page[-1]["notification_id"], limit=2)
+    assert [n["notification_id"] for n in page] == [1]
+
+def test_mark_read_filters_unread(delivered):
+    assert mark_notifications_read("user1", [2, 4, 6]) == 2
+    assert [n["notification_id"] for n in fetch_notifications("user1", unread_only=True)] == [5, 3, 1]
+
+    assert mark_notifications_read("user1") == 3
+    assert fetch_notifications("user1", unread_only=True) == []
+    assert mark_notifications_read("user1") == 0
+    assert fetch_notifications("user2", unread_only=True)[0]["read_at"] is None
+
+def test_command_offers_a_next_page_only_when_one_exists(delivered, monkeypatch):
+    monkeypatch.setattr("manager.commands.NOTIFICATION_PAGE_SIZE", 2)
+
+    first = process_command("/notifications user1").splitlines()
+    assert first[-1] == "Next page: /notifications user1 4"
+    assert process_command("/notifications user1 4").splitlines()[-1] == "Next page: /notifications user1 2"
+    last = process_command("/notifications user1 2").splitlines()
+    assert len(last) == 1 and last[0].startswith("#1 ")
+
+    # A full last page has no next page either
+    monkeypatch.setattr("manager.commands.NOTIFICATION_PAGE_SIZE", 5)
+    assert "Next page" not in process_command("/notifications user1")
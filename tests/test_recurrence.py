@@ -0,0 +1,74 @@
+import pytest
+
+from manager.operations.recurrence import expand_occurrences, next_occurrence, parse_rule
+from manager.operations.recurring_tasks import process_recurring_tasks, schedule_recurring_task
+from manager.replica import disable_read_replica, enable_read_replica, read_connection
+
+@pytest.mark.parametrize("rule, dtstart, expected", [
+    ("weekly", "2025-01-06 09:00:00",
+     ("2025-01-06 09:00:00", "2025-01-13 09:00:00", "2025-01-20 09:00:00")),
+    ("FREQ=MONTHLY;BYDAY=2TU", "2025-01-01 09:00:00",
+     ("2025-01-14 09:00:00", "2025-02-11 09:00:00", "2025-03-11 09:00:00")),
+    ("FREQ=MONTHLY;BYMONTHDAY=-1", "2025-01-01 09:00:00",
+     ("2025-01-31 09:00:00", "2025-02-28 09:00:00", "2025-03-31 09:00:00")),
+    # Friday, then the following Monday and Tuesday
+    ("0 9 * * 1-5", "2025-01-03 00:00:00",
+     ("2025-01-03 09:00:00", "2025-01-06 09:00:00", "2025-01-07 09:00:00")),
+    # 09:00 in Berlin is 08:00 UTC before the DST switch on 2025-03-30 and 07:00 UTC after
+    ("FREQ=DAILY;BYHOUR=9;TZID=Europe/Berlin", "2025-03-29 08:00:00",
+     ("2025-03-29 08:00:00", "2025-03-30 07:00:00", "2025-03-31 07:00:00")),
+])
+def test_expand_occurrences(rule, dtstart, expected):
+    assert expand_occurrences(rule, dtstart, "2024-12-31 00:00:00", 3) == expected
+
+def test_count_and_until_end_the_rule():
+    after = "2025-01-01 08:59:59"
+    assert len(expand_occurrences("FREQ=DAILY;COUNT=3", "2025-01-01 09:00:00", after, 10)) == 3
+    assert expand_occurrences("FREQ=DAILY;UNTIL=20250102", "2025-01-01 09:00:00", after, 10) == \
+        ("2025-01-01 09:00:00", "2025-01-02 09:00:00")
+    assert next_occurrence("FREQ=DAILY;COUNT=3", "2025-01-01 09:00:00", "2025-01-03 09:00:00", 3) is None
+
+def test_impossible_rule_has_no_occurrences():
+    assert expand_occurrences("FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=30", "2025-01-01 09:00:00",
+                              "2025-01-01 00:00:00", 5) == ()
+
+@pytest.mark.parametrize("rule", ["FREQ=HOURLY", "FREQ=WEEKLY;BYDAY=2MO", "61 * * * *", "FREQ=DAILY;FOO=1"])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+def test_exhausted_rule_is_kept_inactive(connection):
+    connection.execute("INSERT INTO Tasks (title, priority, owner) VALUES ('Standup', 'low', 'user1')")
+    connection.commit()
+    schedule_recurring_task("1", "FREQ=DAILY;COUNT=2", "2025-01-01 09:00:00")
+
+    process_recurring_tasks()
+    process_recurring_tasks()
+    process_recurring_tasks()
+
+    active, ended_at, count = connection.execute(
+        "SELECT active, ended_at, occurrence_count FROM RecurringTasks WHERE recurring_task_id = 1").fetchone()
+    assert (active, count) == (0, 2)
+    assert ended_at is not None
+    assert connection.execute("SELECT COUNT(*) FROM Tasks WHERE title = 'Standup'").fetchone()[0] == 3
+    assert connection.execute("SELECT action FROM AuditLogs WHERE entity = 'RecurringTasks' "
+                              "ORDER BY log_id DESC LIMIT 1").fetchone()[0] == "recurring_task_completed"
+
+def test_generated_tasks_are_audited_and_replicated(connection):
+    connection.execute("INSERT INTO Tasks (title, priority, owner) VALUES ('Standup', 'low', 'user1')")
+    connection.commit()
+    schedule_recurring_task("1", "FREQ=DAILY", "2025-01-01 09:00:00")
+    replica = enable_read_replica(refresh_interval=3600)
+    try:
+        process_recurring_tasks()
+
+        created = [row[0] for row in connection.execute("SELECT task_id FROM Tasks WHERE task_id > 1")]
+        assert len(created) == 1
+        assert connection.execute("SELECT entity_id FROM AuditLogs WHERE entity = 'Tasks' AND action = 'create'"
+                                  ).fetchall() == [(str(created[0]),)]
+        with read_connection() as replica_connection:
+            assert replica_connection.execute("SELECT COUNT(*) FROM Tasks").fetchone()[0] == 2
+            assert replica_connection.execute("SELECT occurrence_count FROM RecurringTasks").fetchone()[0] == 1
+        assert not replica.status()["stale"]
+    finally:
+        disable_read_replica()
@@ -0,0 +1,135 @@
+import sqlite3
+
+import pytest
+
+from manager.db.integrity import check_integrity
+from manager.operations.archive import archive_closed_tasks
+from manager.operations.notification_dispatch import claim_batch, dispatch_pending, release_stale_claims
+from manager.operations.notifications import fetch_notifications, send_notifications
+from manager.operations.recurring_tasks import process_recurring_tasks, schedule_recurring_task
+from manager.replica import disable_read_replica, enable_read_replica, read_connection
+from manager.task_management import TaskManager
+from manager.utils import use_database
+
+@pytest.fixture
+def replica(db):
+    # The background refresher never fires during a test
+    replica = enable_read_replica(refresh_interval=3600)
+    yield replica
+    disable_read_replica()
+
+def _outside_write(db, title):
+    with sqlite3.connect(db) as connection:
+        connection.execute("INSERT INTO Tasks (title, priority, owner) VALUES (?, 'low', 'user1')", (title,))
+
+def _replica_titles():
+    with read_connection() as connection:
+        return [row[0] for row in connection.execute("SELECT title FROM Tasks ORDER BY task_id")]
+
+def test_local_write_is_applied(replica):
+    TaskManager().create_task("Local", "", "low", "user1", None)
+
+    assert _replica_titles() == ["Local"]
+    assert not replica.status()["stale"]
+
+def test_outside_write_is_reported_stale(db, replica):
+    _outside_write(db, "Outside")
+
+    assert replica.status()["stale"]
+    assert _replica_titles() == []
+
+def test_local_write_does_not_hide_earlier_outside_write(db, replica):
+    _outside_write(db, "Outside")
+    TaskManager().create_task("Local", "", "low", "user1", None)
+
+    assert _replica_titles() == ["Local"]
+    assert replica.status()["stale"]
+
+    replica.resync()
+    assert _replica_titles() == ["Outside", "Local"]
+    assert not replica.status()["stale"]
+
+def test_writes_after_resync_keep_the_copy_current(db, replica):
+    _outside_write(db, "Outside")
+    replica.resync()
+    manager = TaskManager()
+    task_id = manager.create_task("Local", "", "low", "user1", None)
+    manager.update_task_status(task_id, "Completed")
+
+    assert not replica.status()["stale"]
+    assert replica.status()["writes_applied_since_sync"] == 2
+
+def _replica_rows(query):
+    with read_connection() as connection:
+        return connection.execute(query).fetchall()
+
+def test_recurring_generation_is_applied(db, replica):
+    _outside_write(db, "Standup")
+    schedule_recurring_task("1", "FREQ=DAILY", "2025-01-01 09:00:00")
+    replica.resync()
+
+    process_recurring_tasks()
+
+    assert _replica_titles() == ["Standup", "Standup"]
+    assert not replica.status()["stale"]
+
+def test_notification_delivery_is_applied(db, replica):
+    send_notifications([("1", "user1", "Ready"), ("2", "user1", "Late")])
+    replica.resync()
+
+    assert dispatch_pending() == 2
+
+    assert fetch_notifications("user1")[0]["message"] == "Late"
+    assert _replica_rows("SELECT COUNT(*) FROM NotificationOutbox") == [(0,)]
+    assert not replica.status()["stale"]
+
+def test_released_claims_are_applied(db, replica, connection):
+    send_notifications([("1", "user1", "Ready")])
+    claim_batch("worker-0")
+    connection.execute("UPDATE NotificationOutbox SET claimed_at = datetime('now', '-1 hours')")
+    connection.commit()
+    replica.resync()
+
+    assert release_stale_claims() == 1
+
+    assert _replica_rows("SELECT status, claimed_by FROM NotificationOutbox") == [("pending", None)]
+    assert not replica.status()["stale"]
+
+def test_archive_is_applied(db, replica, connection):
+    connection.execute("""
+        INSERT INTO Tasks (title, priority, owner, status, updated_at)
+        VALUES ('Old', 'low', 'user1', 'Completed', '2020-01-01 00:00:00')
+    """)
+    connection.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES ('1', 1)")
+    connection.commit()
+    replica.resync()
+
+    assert archive_closed_tasks() == 1
+
+    assert _replica_titles() == []
+    assert _replica_rows("SELECT task_id, title FROM ArchivedTasks") == [(1, "Old")]
+    assert _replica_rows("SELECT task_id FROM ArchivedTaskTags") == [("1",)]
+    assert _replica_rows("SELECT COUNT(*) FROM TaskTags") == [(0,)]
+    assert not replica.status()["stale"]
+
+def test_integrity_repair_reloads_the_copy(db, replica, connection):
+    connection.execute("INSERT INTO TaskTags (task_id, tag_id) VALUES ('99', 1)")
+    connection.commit()
+    replica.resync()
+
+    check_integrity(repair=True, checks=["TaskTags.task_id"])
+
+    assert _replica_rows("SELECT COUNT(*) FROM TaskTags") == [(0,)]
+    assert not replica.status()["stale"]
+
+def test_other_databases_bypass_the_replica(db, replica, tmp_path):
+    other = str(tmp_path / "other.db")
+    with sqlite3.connect(db) as source, sqlite3.connect(other) as target:
+        source.backup(target)
+    _outside_write(other, "Elsewhere")
+
+    with use_database(other):
+        assert _replica_titles() == ["Elsewhere"]
+        TaskManager().create_task("Also elsewhere", "", "low", "user1", None)
+    assert _replica_titles() == []
+    assert not replica.status()["stale"]
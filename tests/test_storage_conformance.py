@@ -0,0 +1,233 @@
+import sqlite3
+
+import pytest
+
+from manager.storage import MemoryEngine, SQLiteEngine
+from manager.storage.base import FakeClock
+from manager.task_management import TaskManager
+
+@pytest.fixture(params=["memory", "sqlite"])
+def engine(request, tmp_path):
+    """A fresh engine of each kind, driven by a clock that advances one second per reading."""
+    if request.param == "memory":
+        engine = MemoryEngine(clock=FakeClock())
+    else:
+        engine = SQLiteEngine(str(tmp_path / "engine.db"), create_schema=True, clock=FakeClock())
+    yield engine
+    engine.close()
+
+def _ids(rows, key="task_id"):
+    return [row[key] for row in rows]
+
+def test_tasks(engine):
+    first = engine.create_task("Write report", "Quarterly", "high", "user1", "2025-02-01 17:00:00")
+    second = engine.create_task("Review", None, "low", "user2")
+    assert second > first
+    task = engine.get_task(first)
+    assert [task[field] for field in ("title", "description", "priority", "owner", "status", "deadline")] == \
+        ["Write report", "Quarterly", "high", "user1", "Pending", "2025-02-01 17:00:00"]
+    assert task["created_at"] == task["updated_at"]
+
+    assert engine.update_task(first, status="In Progress", priority="medium") is True
+    updated = engine.get_task(first)
+    assert (updated["status"], updated["priority"]) == ("In Progress", "medium")
+    assert updated["updated_at"] > task["updated_at"]
+    assert updated["created_at"] == task["created_at"]
+    assert engine.update_task(999, status="Completed") is False
+    with pytest.raises(ValueError):  # update unknown field
+        engine.update_task(first, created_at="2000-01-01 00:00:00")
+
+    assert engine.delete_task(second) is True
+    assert engine.get_task(second) is None
+    assert engine.delete_task(second) is False
+    # Ids are not reused
+    assert engine.create_task("Again", None, "low", "user2") > second
+
+def test_task_queries(engine):
+    tag_id = engine.add_tag("urgent")
+    a = engine.create_task("a", None, "high", "user1", "2025-01-03 00:00:00")
+    b = engine.create_task("b", None, "low", "user2", "2025-01-02 00:00:00")
+    c = engine.create_task("c", None, "low", "user1", "2025-01-02 00:00:00", status="Completed")
+    d = engine.create_task("d", None, "low", "user1")
+    e = engine.create_task("e", None, "low", "user1", "2025-01-09 00:00:00")
+    engine.tag_task(a, tag_id)
+    engine.tag_task(d, tag_id)
+
+    assert _ids(engine.list_tasks()) == [a, b, c, d, e]
+    assert _ids(engine.list_tasks(owner="user1")) == [a, c, d, e]
+    assert _ids(engine.list_tasks(status="Pending", owner="user1")) == [a, d, e]
+    assert _ids(engine.list_tasks(tag="urgent")) == [a, d]
+    assert _ids(engine.list_tasks(tag="urgent", status="Completed")) == []
+    assert _ids(engine.list_tasks(tag="missing")) == []
+
+    assert _ids(engine.list_overdue_tasks("2025-01-05 00:00:00")) == [b, a]
+    assert _ids(engine.list_overdue_tasks("2025-01-03 00:00:00")) == [b]
+    engine.update_task(b, deadline="2025-01-10 00:00:00")
+    engine.update_task(c, status="Pending")
+    assert _ids(engine.list_overdue_tasks("2025-01-05 00:00:00")) == [c, a]
+    # Statuses are stored as typed; closed ones match in any case
+    engine.update_task(c, status="completed")
+    assert _ids(engine.list_overdue_tasks("2025-01-05 00:00:00")) == [a]
+
+    first = engine.add_response(a, "user1", "accepted")
+    engine.add_response(b, "user2", "declined", "busy")
+    engine.add_response(a, "user1", "completed", "done")
+    responses = engine.list_responses(a)
+    assert [(r["response_id"], r["task_id"], r["action"], r["comments"]) for r in responses] == \
+        [(first, a, "accepted", None), (first + 2, a, "completed", "done")]
+
+def test_tags(engine):
+    task = engine.create_task("t", None, "low", "user1")
+    urgent, home = engine.add_tag("urgent"), engine.add_tag("home")
+    with pytest.raises(ValueError):  # duplicate tag
+        engine.add_tag("urgent")
+    assert engine.get_tag_id("home") == home
+    assert engine.get_tag_id("missing") is None
+
+    assert engine.tag_task(task, urgent) is True
+    assert engine.tag_task(task, urgent) is False
+    assert engine.tag_task(task, home) is True
+    assert engine.task_tags(task) == ["home", "urgent"]
+    with pytest.raises(ValueError):  # tag missing task
+        engine.tag_task(999, urgent)
+    with pytest.raises(ValueError):  # tag with missing tag
+        engine.tag_task(task, 999)
+
+    assert engine.untag_task(task, urgent) is True
+    assert engine.untag_task(task, urgent) is False
+    assert engine.task_tags(task) == ["home"]
+
+def test_users(engine):
+    engine.add_user("user2", "Bob", "User")
+    engine.add_user("user1", "Alice", "Manager")
+    engine.add_user("user3", "Cy", "User")
+    with pytest.raises(ValueError):  # duplicate user
+        engine.add_user("user1", "Again", "User")
+    with pytest.raises(ValueError):  # invalid role
+        engine.add_user("user4", "Dee", "owner")
+    user = engine.get_user("user1")
+    assert (user["user_id"], user["name"], user["role"]) == ("user1", "Alice", "Manager")
+    assert engine.get_user("missing") is None
+    assert [u["user_id"] for u in engine.list_users()] == ["user1", "user2", "user3"]
+    assert [u["user_id"] for u in engine.list_users("User")] == ["user2", "user3"]
+
+def test_notifications(engine):
+    task = engine.create_task("t", None, "low", "user1")
+    ids = [engine.add_notification(task, "user1", f"message {n}") for n in range(5)]
+    other = engine.add_notification(None, "user2", "broadcast")
+
+    page = engine.fetch_notifications("user1", limit=2)
+    assert _ids(page, "notification_id") == [ids[4], ids[3]]
+    assert page[0]["task_id"] == task
+    older = engine.fetch_notifications("user1", before_id=ids[3], limit=10)
+    assert _ids(older, "notification_id") == [ids[2], ids[1], ids[0]]
+    assert engine.fetch_notifications("user2")[0]["task_id"] is None
+
+    assert engine.mark_notifications_read("user1", [ids[1], ids[3], other]) == 2
+    assert engine.mark_notifications_read("user1", [ids[1]]) == 0
+    unread = engine.fetch_notifications("user1", unread_only=True)
+    assert _ids(unread, "notification_id") == [ids[4], ids[2], ids[0]]
+    assert unread[0]["read_at"] is None
+    page = engine.fetch_notifications("user1", unread_only=True, before_id=ids[4], limit=1)
+    assert _ids(page, "notification_id") == [ids[2]]
+    assert engine.mark_notifications_read("user1") == 3
+    assert engine.fetch_notifications("user2", unread_only=True)[0]["notification_id"] == other
+
+def test_recurring(engine):
+    template = engine.create_task("standup", None, "low", "user1")
+    late = engine.add_recurring(template, "daily", "2025-01-02 09:00:00")
+    early = engine.add_recurring(template, "weekly", "2025-01-01 09:00:00")
+    later = engine.add_recurring(template, "monthly", "2025-02-01 09:00:00")
+    with pytest.raises(ValueError):  # missing template
+        engine.add_recurring(999, "daily", "2025-01-01 09:00:00")
+    assert engine.get_recurring(early)["interval"] == "weekly"
+    assert engine.get_recurring(early)["template_task_id"] == template
+
+    # Due is inclusive, ordered by next occurrence, and repeatable
+    assert _ids(engine.due_recurring("2025-01-02 09:00:00"), "recurring_task_id") == [early, late]
+    assert _ids(engine.due_recurring("2025-01-02 09:00:00"), "recurring_task_id") == [early, late]
+    assert engine.reschedule_recurring(early, "2025-01-08 09:00:00") is True
+    assert engine.reschedule_recurring(late, "2025-01-02 09:00:00") is True
+    assert _ids(engine.due_recurring("2025-01-05 00:00:00"), "recurring_task_id") == [late]
+    assert engine.reschedule_recurring(999, "2025-01-08 09:00:00") is False
+
+    assert engine.delete_recurring(late) is True
+    assert engine.delete_recurring(late) is False
+    assert engine.get_recurring(late) is None
+    assert _ids(engine.due_recurring("2025-03-01 00:00:00"), "recurring_task_id") == [early, later]
+
+def test_delete_cascade(engine):
+    tag_id = engine.add_tag("urgent")
+    task = engine.create_task("t", None, "low", "user1", "2025-01-01 00:00:00")
+    keep = engine.create_task("keep", None, "low", "user1")
+    engine.tag_task(task, tag_id)
+    engine.tag_task(keep, tag_id)
+    engine.add_response(task, "user1", "accepted")
+    engine.add_notification(task, "user1", "assigned")
+    kept_notification = engine.add_notification(keep, "user1", "assigned")
+    rule = engine.add_recurring(task, "daily", "2025-01-01 09:00:00")
+
+    assert engine.delete_task(task) is True
+    assert engine.task_tags(task) == []
+    assert _ids(engine.list_tasks(tag="urgent")) == [keep]
+    assert engine.list_responses(task) == []
+    assert _ids(engine.fetch_notifications("user1"), "notification_id") == [kept_notification]
+    assert engine.get_recurring(rule) is None
+    assert engine.due_recurring("2025-12-31 00:00:00") == []
+    assert engine.list_overdue_tasks("2025-12-31 00:00:00") == []
+
+def test_audit(engine):
+    first = engine.log_action("Tasks", "1", "created", "user1")
+    engine.log_action("Tasks", "2", "created", "user1")
+    second = engine.log_action("Tasks", "1", "updated", "user2")
+    entries = engine.audit_entries("Tasks", "1")
+    assert [(e["log_id"], e["action"], e["performed_by"]) for e in entries] == \
+        [(first, "created", "user1"), (second, "updated", "user2")]
+    assert entries[0]["timestamp"] < entries[1]["timestamp"]
+    assert engine.audit_entries("Users", "1") == []
+
+def test_sqlite_delete_leaves_no_dependent_rows(tmp_path):
+    engine = SQLiteEngine(str(tmp_path / "engine.db"), create_schema=True, clock=FakeClock())
+    task, other = engine.create_task("t", None, "low", "user1"), engine.create_task("o", None, "low", "user1")
+    with sqlite3.connect(engine.db_path) as connection:
+        connection.executemany("INSERT INTO TaskDependencies (task_id, depends_on) VALUES (?, ?)",
+                               [(task, other), (other, task)])
+        connection.execute("INSERT INTO NotificationOutbox (task_id, recipient, message) VALUES (?, 'user1', 'm')",
+                           (str(task),))
+        connection.execute("INSERT INTO TaskLifecycle (task_id, completed_at) VALUES (?, '2025-01-01 10:00:00')",
+                           (task,))
+
+    assert engine.delete_task(task) is True
+
+    with sqlite3.connect(engine.db_path) as connection:
+        for table in ("TaskDependencies", "NotificationOutbox", "TaskLifecycle"):
+            assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone() == (0,)
+        assert connection.execute("SELECT action FROM AuditLogs WHERE entity_id = ?", (str(task),)).fetchall() == \
+            [("deleted",)]
+    engine.close()
+
+def test_task_manager_lists_overdue_tasks_through_its_engine(engine):
+    late = engine.create_task("Late", None, "low", "user1", "2024-12-01 00:00:00")
+    engine.create_task("Done", None, "low", "user1", "2024-12-01 00:00:00", status="verified")
+    engine.create_task("Later", None, "low", "user1", "2999-01-01 00:00:00")
+
+    assert TaskManager(engine).list_overdue_tasks() == [
+        {"task_id": late, "title": "Late", "owner": "user1", "status": "Pending", "deadline": "2024-12-01 00:00:00"}]
+
+def test_task_manager_runs_on_any_engine():
+    storage = MemoryEngine(clock=FakeClock())
+    storage.add_user("user1", "Alice", "Manager")
+    storage.add_user("user2", "Bob", "User")
+    manager = TaskManager(storage)
+
+    task_id = manager.create_task("Plan", "Offsite", "high", "user1", None)
+    with pytest.raises(ValueError, match="User ghost not found"):
+        manager.create_task("Lost", None, "low", "ghost", None)
+    assert manager.update_task_status(task_id, "Completed") == f"Task {task_id} updated to status: Completed"
+    assert manager.delegate_task(task_id, "user2") == f"Task {task_id} delegated to user2."
+    assert manager.list_tasks() == [f"task_{task_id}: Plan (High Priority, Owner: user2) - In Progress"]
+    assert manager.get_task_details(task_id)["description"] == "Offsite"
+    assert [e["action"] for e in storage.audit_entries("Tasks", str(task_id))] == ["create", "completed"]
+    assert manager.delete_task(task_id) == f"Task {task_id} deleted successfully."
+    assert manager.delete_task(task_id) == f"Task {task_id} not found."
+    assert manager.get_task(task_id) is None
@@ -0,0 +1,67 @@
+import sqlite3
+
+from manager.db.db_initialize import initialize_db
+from manager.operations.users import UserDirectory, add_user, provision_users, user_directory
+from manager.utils import use_database
+
+def _insert_user(db, user_id):
+    with sqlite3.connect(db) as connection:
+        connection.execute("INSERT INTO Users (user_id, name, role) VALUES (?, 'Outside', 'User')", (user_id,))
+
+def test_unknown_user_is_remembered_briefly(db):
+    directory = UserDirectory(str(db), negative_ttl=60)
+    assert not directory.exists("late")
+    _insert_user(db, "late")
+
+    assert not directory.exists("late")
+
+def test_unknown_user_is_looked_up_again_after_the_ttl(db):
+    directory = UserDirectory(str(db), negative_ttl=0)
+    assert not directory.exists("late")
+    _insert_user(db, "late")
+
+    assert directory.role_of("late") == "User"
+
+def test_added_user_clears_the_negative_entry(db):
+    assert not user_directory.exists("newcomer")
+    add_user("newcomer", "New Comer", "Expert")
+
+    assert user_directory.role_of("newcomer") == "Expert"
+
+def test_forced_initialize_invalidates_the_directory(db):
+    add_user("temporary", "Temporary", "User")
+    assert user_directory.exists("temporary")
+
+    initialize_db(force=True)
+
+    assert not user_directory.exists("temporary")
+    assert user_directory.exists("user1")
+
+def test_directory_follows_the_active_database(db, tmp_path):
+    other = str(tmp_path / "other.db")
+    with sqlite3.connect(db) as source, sqlite3.connect(other) as target:
+        source.backup(target)
+    add_user("main_only", "Main Only", "User")
+    assert user_directory.exists("main_only")
+
+    with use_database(other):
+        assert not user_directory.exists("main_only")
+        add_user("other_only", "Other Only", "User")
+        assert user_directory.exists("other_only")
+    assert not user_directory.exists("other_only")
+
+def test_provision_users_counts_created_skipped_and_rejected(db):
+    records = [
+        {"user_id": "p1", "name": "One", "role": "User"},
+        {"user_id": "p2", "name": "Two", "role": "Manager"},
+        {"user_id": "p1", "name": "One again", "role": "User"},
+        {"user_id": "user1", "name": "Existing", "role": "User"},
+        {"user_id": "p3", "name": "", "role": "User"},
+        {"user_id": "p4", "name": "Four", "role": "Owner"},
+    ]
+
+    report = provision_users(records, batch_size=2)
+
+    assert (report["created"], report["skipped"]) == (2, 2)
+    assert [entry["record"] for entry in report["rejected"]] == [5, 6]
+    assert user_directory.role_of("p2") == "Manager"
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+
+from manager import workload
+from manager.commands import process_command
+from manager.replica import disable_read_replica, enable_read_replica
+
+COMMANDS = [
+    "/add_task 'Design' 'Write the spec' high user1 '2030-01-01 10:00:00'",
+    "/add_task 'Build' 'Write the code' medium user2 '2030-01-02 10:00:00'",
+    "/add_dependency 2 1",
+    "/list_tasks",
+    "/blockers 2",
+    "/update_task 1 Completed",
+    "/blockers 2",
+    "/add_task 'Ship' 'Release it' low user3 '2030-01-03 10:00:00'",
+    "/update_task 3 Accepted",
+    "/search_tasks 'i'",
+    "/list_tasks",
+]
+
+def _capture(db, tmp_path):
+    """Snapshot the database, then run COMMANDS with capture on. Returns (snapshot, log)."""
+    snapshot, log = str(tmp_path / "before.db"), str(tmp_path / "capture.jsonl")
+    with sqlite3.connect(db) as source, sqlite3.connect(snapshot) as target:
+        source.backup(target)
+    workload.enable_capture(log)
+    try:
+        for command in COMMANDS:
+            process_command(command)
+    finally:
+        workload.disable_capture()
+    return snapshot, log
+
+def test_batches_keep_writes_in_order():
+    entries = [{"c": command} for command in COMMANDS]
+    batches = workload.plan_batches(entries)
+    assert [entry for batch in batches for entry in batch] == entries
+    assert [len(batch) for batch in batches] == [1, 1, 1, 2, 1, 1, 1, 1, 2]
+
+def test_replay_matches_capture(db, tmp_path):
+    snapshot, log = _capture(db, tmp_path)
+    cwd = os.getcwd()
+
+    report = workload.replay(log, snapshot, speed=0, workers=4, workdir=str(tmp_path / "replay"))
+
+    assert report["commands"] == len(COMMANDS)
+    assert report["total"]["errors"] == 0
+    assert report["total"]["diverged"] == 0
+    assert report["writes"] == "serialized"
+    assert os.getcwd() == cwd
+
+def test_replay_with_concurrent_writes_runs_every_command(db, tmp_path):
+    snapshot, log = _capture(db, tmp_path)
+
+    report = workload.replay(log, snapshot, speed=0, workers=4, workdir=str(tmp_path / "replay"),
+                             concurrent_writes=True)
+
+    assert report["commands"] == len(COMMANDS)
+    assert report["writes"] == "concurrent"
+    assert "concurrent writes" in workload.format_report(report)
+
+def test_replay_ignores_the_application_replica(db, tmp_path):
+    snapshot, log = _capture(db, tmp_path)
+    # Loaded after the capture, so it holds state the replayed copy does not have yet
+    enable_read_replica(refresh_interval=3600)
+    try:
+        report = workload.replay(log, snapshot, speed=0, workers=2, workdir=str(tmp_path / "replay"))
+    finally:
+        disable_read_replica()
+
+    assert report["total"]["diverged"] == 0
+
+def test_replay_is_not_captured_again(db, tmp_path, monkeypatch):
+    snapshot, log = _capture(db, tmp_path)
+    recapture = tmp_path / "recapture.jsonl"
+    monkeypatch.setenv(workload.CAPTURE_ENV_VAR, str(recapture))
+    workload.enable_capture(str(recapture))
+    try:
+        workload.replay(log, snapshot, speed=0, workers=2, workdir=str(tmp_path / "replay"))
+    finally:
+        workload.disable_capture()
+
+    assert recapture.read_text() == ""
+    assert os.environ[workload.CAPTURE_ENV_VAR] == str(recapture)